@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, ForeignKey, UniqueConstraint, Index
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, Boolean, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -45,5 +45,29 @@ class Expense(Base):
     # ----------------- Composite Indexes -----------------
     __table_args__ = (
         UniqueConstraint("business_id", "ref_no", name="uq_expense_business_ref"),
-        Index("idx_expense_business_date", "business_id", "expense_date"),
+        Index("idx_expense_business_date_id", "business_id", "expense_date", "id"),   # date ranges + keyset pages
     )
+
+
+class ExpenseRollup(Base):
+    """
+    Daily totals per account type of archived (active) expenses,
+    kept for the P&L of archived years (see app/core/archive.py).
+    """
+    __tablename__ = "expense_rollups"
+
+    __table_args__ = (
+        Index("idx_expense_rollups_business_day", "business_id", "day"),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    business_id = Column(
+        Integer,
+        ForeignKey("businesses.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    day = Column(Date, nullable=False)
+    account_type = Column(String, nullable=False)
+    amount = Column(Float, nullable=False, default=0)
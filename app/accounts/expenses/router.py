@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List,  Dict,  Optional
 
@@ -52,9 +52,34 @@ def create_expense(
 
 
 
+@router.post("/import", response_model=schemas.ExpenseImportResult)
+def import_expenses(
+    file: UploadFile = File(..., description="CSV or Excel sheet"),
+    business_id: Optional[int] = Form(None),  # super admin only
+    db: Session = Depends(get_db),
+    current_user: UserDisplaySchema = Depends(
+        role_required(["manager", "admin", "super_admin"])
+    )
+):
+    """
+    Bulk-import expenses from CSV/Excel.
+
+    - Columns: ref_no, account_type, amount, payment_method, expense_date,
+      vendor_id or vendor, optional bank_id or bank, description
+    - Valid rows are saved together; invalid rows are reported by row number
+    """
+    return service.import_expenses_from_file(
+        db=db,
+        file=file,
+        current_user=current_user,
+        business_id=business_id
+    )
+
+
+
 @router.get("/", response_model=schemas.ExpenseListResponse)
 def list_expenses(
-    skip: int = Query(0, ge=0, description="Pagination offset"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(100, ge=1, le=500, description="Max items per page"),
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD) - inclusive"),
@@ -74,11 +99,12 @@ def list_expenses(
     - Regular users → only expenses from their own business
     - Super admin → all expenses or filtered by ?business_id=
     - Returns enriched list + total expenses summary
+    - Newest first; follow `next_cursor` for older pages
     """
     return service.list_expenses(
         db=db,
         current_user=current_user,
-        skip=skip,
+        cursor=cursor,
         limit=limit,
         start_date=start_date,
         end_date=end_date,
@@ -58,11 +58,38 @@ class ExpenseOut(ExpenseBase):
         from_attributes = True
 
 
+class ExpenseAccountTotal(BaseModel):
+    account_type: str
+    total: float
+    count: int
+
+
 # ─── NEW: Proper response model for list ────────────────────────────────
 class ExpenseListResponse(BaseModel):
     total_expenses: float = Field(..., description="Sum of amounts in filtered results")
+    total_count: int = Field(0, description="Number of expenses matching the filters")
     count: int = Field(..., description="Number of expenses returned (after pagination)")
     expenses: List[ExpenseOut]
+    totals_by_account_type: List[ExpenseAccountTotal] = Field(
+        default_factory=list, description="Totals per account type over the filtered results"
+    )
+    next_cursor: Optional[str] = Field(None, description="Pass back as ?cursor= for the next page")
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# =========================
+# Bulk Import
+# =========================
+class ExpenseImportError(BaseModel):
+    row: int                       # spreadsheet row number (header = 1)
+    ref_no: Optional[str] = None
+    error: str
+
+
+class ExpenseImportResult(BaseModel):
+    message: str
+    created: int
+    failed: int
+    errors: List[ExpenseImportError] = Field(default_factory=list)
\ No newline at end of file
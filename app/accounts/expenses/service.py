@@ -14,11 +14,13 @@ from typing import Optional, Dict, Any
 from datetime import date
 from typing import Optional
 from . import models, schemas
+from app.core.pagination import keyset_paginate
 
 from app.users.permissions import role_required
 from app.users.schemas import UserDisplaySchema
 from app.vendor import models as vendor_models
 from app.bank import models as bank_models
+from app.users import models as user_models
 
 
 from zoneinfo import ZoneInfo
@@ -34,7 +36,7 @@ from sqlalchemy import func, desc, cast, Date
 
 
 from sqlalchemy.orm import joinedload
-from sqlalchemy import func, desc, cast, Date
+from sqlalchemy import func, desc, case, select
 from typing import Optional, Dict, Any
 
 
@@ -109,7 +111,8 @@ def serialize_expense(expense: models.Expense):
 # Create Expense
 # =========================
 from sqlalchemy.exc import IntegrityError
-from fastapi import HTTPException, status
+from fastapi import HTTPException, status, UploadFile
+from typing import List
 
 def create_expense(
     db: Session,
@@ -273,117 +276,208 @@ def create_expense(
 
 
 
-def list_expenses(
-    db: Session,
+def _lagos_day_start(day: date) -> datetime:
+    """
+    Lagos midnight of `day`, as the naive wall-clock value stored in
+    expense_date (a plain DateTime column holding Lagos local time).
+    """
+    return datetime.combine(day, time.min, tzinfo=LAGOS_TZ).replace(tzinfo=None)
+
+
+def _expense_filters(
     current_user: UserDisplaySchema,
-    skip: int = 0,
-    limit: int = 100,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     account_type: Optional[str] = None,
     business_id: Optional[int] = None
-) -> Dict[str, Any]:
+) -> list:
+    """Tenant isolation + filters shared by the page and the totals."""
+    filters = [models.Expense.is_active == True]
 
-    # ─── 1. Base query ───────────────────────────────────────────────
-    query = (
-        db.query(models.Expense)
-        .options(
-            joinedload(models.Expense.vendor),
-            joinedload(models.Expense.bank),
-            joinedload(models.Expense.creator)
-        )
-        .filter(models.Expense.is_active == True)
-    )
-
-    # ─── 2. Tenant isolation ─────────────────────────────────────────
-    roles = set(current_user.roles)
-
-    if "super_admin" in roles:
+    # ─── Tenant isolation ────────────────────────────────────────────
+    if "super_admin" in current_user.roles:
         if business_id:
-            query = query.filter(models.Expense.business_id == business_id)
+            filters.append(models.Expense.business_id == business_id)
     else:
         if not current_user.business_id:
             raise HTTPException(
                 status_code=403,
                 detail="User does not belong to a business"
             )
-        query = query.filter(models.Expense.business_id == current_user.business_id)
+        filters.append(models.Expense.business_id == current_user.business_id)
 
-    # ─── 3. Date filters ─────────────────────────────────────────────
+    # ─── Date range: half-open [start 00:00, end + 1 day 00:00) ──────
+    # Compared on the raw column → idx_expense_business_date_id is usable
     if start_date:
-        query = query.filter(cast(models.Expense.expense_date, Date) >= start_date)
+        filters.append(models.Expense.expense_date >= _lagos_day_start(start_date))
 
     if end_date:
-        query = query.filter(cast(models.Expense.expense_date, Date) <= end_date)
+        filters.append(models.Expense.expense_date < _lagos_day_start(end_date + timedelta(days=1)))
 
-    # ─── 4. Account type filter ──────────────────────────────────────
+    # ─── Account type ────────────────────────────────────────────────
     if account_type:
-        query = query.filter(
+        filters.append(
             func.lower(func.trim(models.Expense.account_type)) ==
             account_type.lower().strip()
         )
 
-    # ─── 5. Total expenses ───────────────────────────────────────────
-    total_query = db.query(func.coalesce(func.sum(models.Expense.amount), 0.0)) \
-        .filter(models.Expense.is_active == True)
+    return filters
 
-    if start_date:
-        total_query = total_query.filter(cast(models.Expense.expense_date, Date) >= start_date)
 
-    if end_date:
-        total_query = total_query.filter(cast(models.Expense.expense_date, Date) <= end_date)
+def _expense_totals_json(filters: list):
+    """
+    Scalar subquery over a grouped CTE: one JSON array of
+    {account_type, total, count} for every expense matching `filters`.
+    """
+    totals = (
+        select(
+            models.Expense.account_type.label("account_type"),
+            func.sum(models.Expense.amount).label("total"),
+            func.count().label("count")
+        )
+        .where(*filters)
+        .group_by(models.Expense.account_type)
+        .cte("expense_totals")
+    )
 
-    if "super_admin" in roles and business_id:
-        total_query = total_query.filter(models.Expense.business_id == business_id)
+    return (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    func.json_build_object(
+                        "account_type", totals.c.account_type,
+                        "total", totals.c.total,
+                        "count", totals.c.count
+                    )
+                ),
+                func.json_build_array()
+            )
+        )
+        .scalar_subquery()
+    )
 
-    elif "super_admin" not in roles:
-        total_query = total_query.filter(models.Expense.business_id == current_user.business_id)
 
-    total_expenses = total_query.scalar() or 0.0
+def list_expenses(
+    db: Session,
+    current_user: UserDisplaySchema,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    account_type: Optional[str] = None,
+    business_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Tenant-aware expense list + totals per account type, in one round trip:
+    the page rows carry the grouped totals (computed once by Postgres) on
+    their first row.
+
+    Newest first, keyset-paginated on (expense_date, id) → pass back `next_cursor`.
+    """
+    Expense = models.Expense
+    Vendor = vendor_models.Vendor
+    Bank = bank_models.Bank
+    User = user_models.User
+
+    filters = _expense_filters(
+        current_user=current_user,
+        start_date=start_date,
+        end_date=end_date,
+        account_type=account_type,
+        business_id=business_id
+    )
+
+    totals_json = _expense_totals_json(filters)
+    # Same order as the keyset below → row 1 of the window is the page's first row
+    ordering = (desc(Expense.expense_date), desc(Expense.id))
 
-    # ─── 6. Fetch results ───────────────────────────────────────────
-    expenses = (
-        query
-        .order_by(desc(models.Expense.expense_date), desc(models.Expense.created_at))
-        .offset(skip)
-        .limit(limit)
-        .all()
+    # ─── 1. Page + totals ────────────────────────────────────────────
+    query = (
+        db.query(
+            Expense.id,
+            Expense.business_id,
+            Expense.vendor_id,
+            Expense.ref_no,
+            Expense.account_type,
+            Expense.description,
+            Expense.amount,
+            Expense.payment_method,
+            Expense.bank_id,
+            Expense.expense_date,
+            Expense.status,
+            Expense.is_active,
+            Expense.created_at,
+            Expense.created_by,
+            Vendor.business_name.label("vendor_name"),
+            Bank.name.label("bank_name"),
+            User.username.label("created_by_username"),
+            case(
+                (func.row_number().over(order_by=ordering) == 1, totals_json),
+                else_=None
+            ).label("totals")
+        )
+        .outerjoin(Vendor, Vendor.id == Expense.vendor_id)
+        .outerjoin(Bank, Bank.id == Expense.bank_id)
+        .outerjoin(User, User.id == Expense.created_by)
+        .filter(*filters)
     )
 
-    # ─── 7. Enrich results ───────────────────────────────────────────
-    enriched_expenses = []
-
-    for exp in expenses:
-        enriched_expenses.append(
-            schemas.ExpenseOut(
-                id=exp.id,
-                business_id=exp.business_id,
-                vendor_id=exp.vendor_id,
-                ref_no=exp.ref_no,
-                account_type=exp.account_type,
-                description=exp.description,
-                amount=float(exp.amount),
-                payment_method=exp.payment_method,
-                bank_id=exp.bank_id,
-
-                # ✅ NEW FIELD YOU ADDED
-                vendor_name=exp.vendor.business_name if exp.vendor else None,
-
-                expense_date=exp.expense_date,
-                status=exp.status,
-                is_active=exp.is_active,
-                created_at=exp.created_at,
-                created_by=exp.created_by,
-                created_by_username=exp.creator.username if exp.creator else None,
-                bank_name=exp.bank.name if exp.bank else None
+    rows, next_cursor = keyset_paginate(
+        query, Expense.expense_date, Expense.id, cursor=cursor, limit=limit
+    )
+
+    # Totals ride on the first row of the page; a page past the end
+    # has no rows, so fetch them on their own
+    if rows:
+        totals = rows[0].totals
+    else:
+        totals = db.query(totals_json).scalar()
+
+    totals_by_account_type = sorted(
+        (
+            schemas.ExpenseAccountTotal(
+                account_type=t["account_type"],
+                total=float(t["total"] or 0),
+                count=t["count"]
             )
+            for t in totals or []
+        ),
+        key=lambda t: t.total,
+        reverse=True
+    )
+
+    # ─── 2. Enrich results ───────────────────────────────────────────
+    enriched_expenses = [
+        schemas.ExpenseOut(
+            id=exp.id,
+            business_id=exp.business_id,
+            vendor_id=exp.vendor_id,
+            ref_no=exp.ref_no,
+            account_type=exp.account_type,
+            description=exp.description,
+            amount=float(exp.amount),
+            payment_method=exp.payment_method,
+            bank_id=exp.bank_id,
+            vendor_name=exp.vendor_name,
+            expense_date=exp.expense_date,
+            status=exp.status,
+            is_active=exp.is_active,
+            created_at=exp.created_at,
+            created_by=exp.created_by,
+            created_by_username=exp.created_by_username,
+            bank_name=exp.bank_name
         )
+        for exp in rows
+    ]
 
-    # ─── 8. Response ────────────────────────────────────────────────
+    # ─── 3. Response ────────────────────────────────────────────────
     return {
-        "total_expenses": float(total_expenses),
+        "total_expenses": sum(t.total for t in totals_by_account_type),
+        "total_count": sum(t.count for t in totals_by_account_type),
         "count": len(enriched_expenses),
-        "expenses": enriched_expenses
+        "expenses": enriched_expenses,
+        "totals_by_account_type": totals_by_account_type,
+        "next_cursor": next_cursor
     }
 
 
@@ -614,4 +708,217 @@ def delete_expense(
         raise HTTPException(
             status_code=500,
             detail=f"Failed to deactivate expense: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+# =========================
+# Bulk Import (CSV / Excel)
+# =========================
+IMPORT_MAX_ROWS = 5000
+IMPORT_REQUIRED_COLUMNS = ["ref_no", "account_type", "amount", "payment_method", "expense_date"]
+
+
+def _cell(row: dict, column: str) -> Optional[str]:
+    value = str(row.get(column, "") or "").strip()
+    return value or None
+
+
+def import_expenses_from_file(
+    db: Session,
+    file: UploadFile,
+    current_user: UserDisplaySchema,
+    business_id: Optional[int] = None
+) -> schemas.ExpenseImportResult:
+    """
+    Import expenses from a CSV or Excel sheet.
+
+    Columns: ref_no, account_type, amount, payment_method, expense_date,
+    vendor_id or vendor (business name), optional bank_id or bank (name),
+    optional description.
+
+    - Vendors, banks and existing ref_nos are looked up once for the whole
+      file (IN queries), not per row
+    - Same rules as create_expense (cash vs bank, unique ref_no per business)
+    - Valid rows are inserted and committed together; every invalid row is
+      reported with its spreadsheet row number
+    """
+
+    # 1️⃣ Resolve business
+    if "super_admin" in current_user.roles:
+        if not business_id:
+            raise HTTPException(status_code=400, detail="business_id is required")
+    else:
+        if not current_user.business_id:
+            raise HTTPException(status_code=403, detail="User does not belong to any business")
+        business_id = current_user.business_id
+
+    # 2️⃣ Read sheet (pandas/openpyxl loaded only when importing)
+    import pandas as pd
+
+    filename = (file.filename or "").lower()
+    try:
+        if filename.endswith(".csv"):
+            df = pd.read_csv(file.file, dtype=str, keep_default_na=False)
+        else:
+            df = pd.read_excel(file.file, dtype=str, keep_default_na=False)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid CSV/Excel file")
+
+    df.columns = [str(c).strip().lower() for c in df.columns]
+
+    missing = [c for c in IMPORT_REQUIRED_COLUMNS if c not in df.columns]
+    if "vendor_id" not in df.columns and "vendor" not in df.columns:
+        missing.append("vendor_id or vendor")
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing column(s): {', '.join(missing)}")
+
+    if len(df) > IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"Too many rows (max {IMPORT_MAX_ROWS})")
+
+    rows = df.to_dict("records")
+
+    # 3️⃣ Set lookups: vendors, banks, existing ref_nos
+    vendors = db.query(vendor_models.Vendor.id, vendor_models.Vendor.business_name).filter(
+        vendor_models.Vendor.business_id == business_id
+    ).all()
+    vendor_ids = {v.id for v in vendors}
+    vendor_by_name = {(v.business_name or "").strip().lower(): v.id for v in vendors}
+
+    banks = db.query(bank_models.Bank.id, bank_models.Bank.name).filter(
+        bank_models.Bank.business_id == business_id
+    ).all()
+    bank_ids = {b.id for b in banks}
+    bank_by_name = {(b.name or "").strip().lower(): b.id for b in banks}
+
+    file_ref_nos = {_cell(r, "ref_no") for r in rows} - {None}
+    existing_ref_nos = {
+        ref for (ref,) in db.query(models.Expense.ref_no).filter(
+            models.Expense.business_id == business_id,
+            models.Expense.ref_no.in_(file_ref_nos)
+        ).all()
+    } if file_ref_nos else set()
+
+    # 4️⃣ Validate rows
+    errors: List[schemas.ExpenseImportError] = []
+    seen_ref_nos = set()
+    new_expenses = []
+
+    for position, row in enumerate(rows):
+        row_number = position + 2  # header is row 1
+        ref_no = _cell(row, "ref_no")
+
+        def fail(message: str):
+            errors.append(schemas.ExpenseImportError(row=row_number, ref_no=ref_no, error=message))
+
+        account_type = _cell(row, "account_type")
+        method = (_cell(row, "payment_method") or "").lower()
+
+        if not ref_no:
+            fail("ref_no is required")
+            continue
+        if ref_no in existing_ref_nos:
+            fail(f"Reference number '{ref_no}' already exists for this business.")
+            continue
+        if ref_no in seen_ref_nos:
+            fail(f"Reference number '{ref_no}' appears more than once in the file")
+            continue
+        if not account_type:
+            fail("account_type is required")
+            continue
+        if not method:
+            fail("payment_method is required")
+            continue
+
+        try:
+            amount = float(_cell(row, "amount") or "")
+        except ValueError:
+            fail("amount must be a number")
+            continue
+        if amount <= 0:
+            fail("amount must be greater than zero")
+            continue
+
+        try:
+            expense_date = pd.to_datetime(_cell(row, "expense_date")).to_pydatetime()
+        except Exception:
+            fail("expense_date is not a valid date")
+            continue
+        if expense_date.tzinfo is not None:
+            expense_date = expense_date.astimezone(LAGOS_TZ).replace(tzinfo=None)
+
+        # Vendor: id or business name
+        vendor_id = None
+        vendor_value = _cell(row, "vendor_id")
+        if vendor_value:
+            try:
+                vendor_id = int(float(vendor_value))
+            except ValueError:
+                vendor_id = None
+            if vendor_id not in vendor_ids:
+                fail(f"Vendor {vendor_value} not found or does not belong to this business")
+                continue
+        else:
+            vendor_name = _cell(row, "vendor")
+            vendor_id = vendor_by_name.get((vendor_name or "").lower())
+            if not vendor_id:
+                fail(f"Vendor '{vendor_name or ''}' not found or does not belong to this business")
+                continue
+
+        # Bank: id or name
+        bank_id = None
+        bank_value = _cell(row, "bank_id") or _cell(row, "bank")
+        if bank_value:
+            if _cell(row, "bank_id"):
+                try:
+                    bank_id = int(float(bank_value))
+                except ValueError:
+                    bank_id = None
+                if bank_id not in bank_ids:
+                    bank_id = None
+            else:
+                bank_id = bank_by_name.get(bank_value.lower())
+            if not bank_id:
+                fail(f"Bank {bank_value} not found or does not belong to this business")
+                continue
+
+        if method == "cash" and bank_id is not None:
+            fail("Bank must NOT be selected for cash payments")
+            continue
+        if method in ["transfer", "pos"] and not bank_id:
+            fail(f"Bank is required for {method} payments")
+            continue
+
+        seen_ref_nos.add(ref_no)
+        new_expenses.append(models.Expense(
+            business_id=business_id,
+            vendor_id=vendor_id,
+            ref_no=ref_no,
+            account_type=account_type,
+            description=_cell(row, "description"),
+            amount=amount,
+            payment_method=method,
+            bank_id=bank_id,
+            expense_date=expense_date,
+            status="paid" if method in ["cash", "pos", "transfer"] else "pending",
+            is_active=True,
+            created_by=current_user.id
+        ))
+
+    # 5️⃣ Insert valid rows in one batch
+    if new_expenses:
+        db.add_all(new_expenses)
+        try:
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Import failed, nothing was saved: {str(e.orig)}"
+            )
+
+    return schemas.ExpenseImportResult(
+        message="Import completed",
+        created=len(new_expenses),
+        failed=len(errors),
+        errors=errors
+    )
\ No newline at end of file
@@ -0,0 +1,246 @@
+# app/accounts/profit_loss/cache.py
+"""
+P&L caching.
+
+- `profit_loss_cache`: in-memory responses keyed by (business, start, end),
+  kept for PROFIT_LOSS_CACHE_SECONDS at most (other workers' writes)
+- Writes to sales, sale items, expenses and stock adjustments are picked up
+  at flush time (session event, like the tenant filter in app/database.py):
+    - cached periods overlapping the touched months are dropped once the
+      transaction commits (a rolled back write keeps them)
+    - monthly snapshots of touched closed months are deleted in the same
+      transaction, so they get recomputed on the next request
+- Product cost / category and category name changes reprice or regroup
+  every month (adjustment loss uses the current Product.cost_price, revenue
+  is grouped by category name): all cached periods and snapshots of that
+  business are dropped
+- Snapshot deletes and snapshot computation of a business serialize on a
+  transaction advisory lock (`lock_snapshots`): a snapshot computed before
+  a write commits can't be stored after that write deleted it
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, event, inspect, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.accounts.expenses import models as expense_models
+from app.accounts.profit_loss.models import ProfitLossSnapshot
+from app.sales import models as sales_models
+from app.stock.category import models as category_models
+from app.stock.inventory.adjustments import models as adjustments_models
+from app.stock.products import models as product_models
+
+from zoneinfo import ZoneInfo
+LAGOS_TZ = ZoneInfo("Africa/Lagos")
+
+
+PROFIT_LOSS_CACHE_SECONDS = int(os.getenv("PROFIT_LOSS_CACHE_SECONDS", 60))
+PROFIT_LOSS_CACHE_MAX_ENTRIES = int(os.getenv("PROFIT_LOSS_CACHE_MAX_ENTRIES", 1024))
+
+# First key of pg_advisory_xact_lock(namespace, business_id)
+SNAPSHOT_LOCK_NAMESPACE = 0x504C   # "PL"
+
+
+# ============================================================
+# 📅 Month helpers
+# ============================================================
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def month_end(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def current_month_start() -> date:
+    return month_start(datetime.now(LAGOS_TZ).date())
+
+
+def _lagos_date(value) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(LAGOS_TZ)
+        return value.date()
+    return value
+
+
+# ============================================================
+# 🗃️ Response cache
+# ============================================================
+CacheKey = Tuple[Optional[int], date, date]   # (business_id or None = all, start, end)
+
+
+class ProfitLossCache:
+
+    def __init__(self, ttl: int = PROFIT_LOSS_CACHE_SECONDS, max_entries: int = PROFIT_LOSS_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: CacheKey, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, business_id: Optional[int], first_day: date, last_day: date):
+        """Drop periods of this business (and all-business totals) overlapping the range."""
+        with self._lock:
+            for key in list(self._entries):
+                bid, start, end = key
+                if (bid is None or bid == business_id) and start <= last_day and end >= first_day:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+profit_loss_cache = ProfitLossCache()
+
+
+# ============================================================
+# 🔒 Snapshot lock
+# ============================================================
+def lock_snapshots(db, business_ids) -> None:
+    """
+    Transaction-level lock on the snapshots of these businesses (held until
+    commit/rollback). Taken by the invalidation below before deleting
+    snapshots and by the P&L service before computing missing ones.
+    """
+    for business_id in sorted(business_ids):   # fixed order → no deadlock between writers
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, :business_id)"),
+            {"namespace": SNAPSHOT_LOCK_NAMESPACE, "business_id": business_id},
+        )
+
+
+# ============================================================
+# 🔔 Invalidation on writes
+# ============================================================
+def _history_dates(instance, attribute: str) -> Set[date]:
+    """Current and previous value of a date column (an update can move a row between months)."""
+    history = inspect(instance).attrs[attribute].history
+    values = list(history.added or ()) + list(history.deleted or ()) + list(history.unchanged or ())
+    return {d for d in (_lagos_date(v) for v in values) if d is not None}
+
+
+def _changed(instance, *attributes: str) -> bool:
+    state = inspect(instance)
+    return any(state.attrs[attribute].history.has_changes() for attribute in attributes)
+
+
+# (business_id, first_day, last_day) ranges to drop from profit_loss_cache on commit
+_PENDING_INVALIDATIONS = "profit_loss_pending_invalidations"
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidations(session):
+    for business_id, first_day, last_day in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        profit_loss_cache.invalidate(business_id, first_day, last_day)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_invalidations(session, transaction):
+    # Outermost transaction over without after_commit → rolled back
+    if transaction.parent is None:
+        session.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_profit_loss(session, flush_context):
+    touched: Set[Tuple[int, date]] = set()
+    item_invoices = set()
+    repriced: Set[int] = set()   # businesses whose every month is affected
+    today = datetime.now(LAGOS_TZ).date()
+
+    for instance in list(session.dirty) + list(session.deleted):
+        if isinstance(instance, product_models.Product):
+            if instance in session.deleted or _changed(instance, "cost_price", "category_id"):
+                repriced.add(instance.business_id)
+
+        elif isinstance(instance, category_models.Category):
+            if instance in session.deleted or _changed(instance, "name"):
+                repriced.add(instance.business_id)
+
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(instance, sales_models.Sale):
+            days = _history_dates(instance, "sold_at") or {today}
+            touched.update((instance.business_id, month_start(d)) for d in days)
+
+        elif isinstance(instance, expense_models.Expense):
+            touched.update((instance.business_id, month_start(d)) for d in _history_dates(instance, "expense_date"))
+
+        elif isinstance(instance, adjustments_models.StockAdjustment):
+            days = _history_dates(instance, "adjusted_at") or {today}
+            touched.update((instance.business_id, month_start(d)) for d in days)
+
+        elif isinstance(instance, sales_models.SaleItem):
+            sale = inspect(instance).dict.get("sale")
+            if sale is not None:
+                days = _history_dates(sale, "sold_at") or {today}
+                touched.update((sale.business_id, month_start(d)) for d in days)
+            elif instance.sale_invoice_no is not None:
+                item_invoices.add(instance.sale_invoice_no)
+
+    connection = session.connection()
+
+    if item_invoices:
+        rows = connection.execute(
+            select(sales_models.Sale.business_id, sales_models.Sale.sold_at)
+            .where(sales_models.Sale.invoice_no.in_(item_invoices))
+        ).all()
+        touched.update((row.business_id, month_start(_lagos_date(row.sold_at) or today)) for row in rows)
+
+    repriced.discard(None)
+    touched = {(bid, month) for bid, month in touched if bid is not None and bid not in repriced}
+    if not touched and not repriced:
+        return
+
+    pending = session.info.setdefault(_PENDING_INVALIDATIONS, set())
+    pending.update((business_id, date.min, date.max) for business_id in repriced)
+    pending.update((business_id, month, month_end(month)) for business_id, month in touched)
+
+    # Snapshots only exist for closed months → nothing to delete for day-to-day writes
+    this_month = month_start(today)
+    closed = [(bid, month) for bid, month in touched if month < this_month]
+    if not closed and not repriced:
+        return
+
+    lock_snapshots(connection, repriced | {bid for bid, _ in closed})
+
+    if repriced:
+        connection.execute(
+            delete(ProfitLossSnapshot).where(ProfitLossSnapshot.business_id.in_(repriced))
+        )
+
+    if closed:
+        connection.execute(
+            delete(ProfitLossSnapshot).where(
+                or_(*[
+                    and_(ProfitLossSnapshot.business_id == bid, ProfitLossSnapshot.month == month)
+                    for bid, month in closed
+                ])
+            )
+        )
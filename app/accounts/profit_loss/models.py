@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, Date, DateTime, JSON, ForeignKey, UniqueConstraint
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from app.database import Base
+
+
+class ProfitLossSnapshot(Base):
+    """
+    Precomputed P&L figures of one closed month for one business.
+
+    `figures` holds the additive parts of the P&L (revenue per category,
+    cost of sales, adjustment loss, expenses per account type), so any
+    period can be answered by adding month snapshots + a live remainder.
+    Rows are deleted when a sale, expense or adjustment in that month changes.
+    """
+    __tablename__ = "profit_loss_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # 🔑 Multi-tenant link
+    business_id = Column(
+        Integer,
+        ForeignKey("businesses.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    month = Column(Date, nullable=False)   # first day of the month (Lagos)
+
+    figures = Column(JSON, nullable=False)
+
+    computed_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(ZoneInfo("Africa/Lagos"))
+    )
+
+    __table_args__ = (
+        UniqueConstraint("business_id", "month", name="uq_pl_snapshot_business_month"),
+    )
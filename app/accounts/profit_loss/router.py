@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Dict, Any
 
-from app.database import get_db
+from app.database import get_read_db
 from . import service
 
 
@@ -29,7 +29,7 @@ def get_profit_loss(
         None,
         description="Filter by specific business (super admin only)"
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: UserDisplaySchema = Depends(
         role_required(["manager", "admin", "super_admin"])
     )
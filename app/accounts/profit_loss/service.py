@@ -1,61 +1,88 @@
 # app/reports/profit_loss/service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, date, time
+from sqlalchemy import and_, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime, date, time, timedelta
 from fastapi import HTTPException
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from app.sales import models as sales_models
 from app.stock.products import models as product_models
 from app.accounts.expenses import models as expense_models
 from app.stock.category import models as category_models
+from app.database import SessionLocal
 from app.users.schemas import UserDisplaySchema
 from app.accounts.profit_loss.schemas import ProfitLossResponse
+from app.accounts.profit_loss.models import ProfitLossSnapshot
+from app.accounts.profit_loss.cache import (
+    profit_loss_cache,
+    current_month_start,
+    lock_snapshots,
+    month_end,
+)
 from app.stock.inventory.adjustments import models as adjustments_models
 
 from zoneinfo import ZoneInfo
 LAGOS_TZ = ZoneInfo("Africa/Lagos")
 
 
+# ============================================================
+# 🧮 Additive P&L figures
+# ============================================================
+# {"revenue": {category: amount}, "cost_of_sales": x,
+#  "stock_adjustment_loss": y, "expenses": {account_type: amount}}
+# Figures of disjoint periods add up, so a long period = month snapshots + live rest.
 
-def get_profit_and_loss(
-    db: Session,
-    current_user: UserDisplaySchema,
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    business_id: Optional[int] = None
-) -> ProfitLossResponse:
+def _empty_figures() -> dict:
+    return {"revenue": {}, "cost_of_sales": 0.0, "stock_adjustment_loss": 0.0, "expenses": {}}
 
-    today = datetime.utcnow()
 
-    if start_date is None:
-        start_date = date(today.year, today.month, 1)
-    if end_date is None:
-        end_date = date(today.year, today.month, today.day)
+def _add_figures(total: dict, part: dict) -> dict:
+    for category, amount in part["revenue"].items():
+        total["revenue"][category] = total["revenue"].get(category, 0.0) + amount
+    for account_type, amount in part["expenses"].items():
+        total["expenses"][account_type] = total["expenses"].get(account_type, 0.0) + amount
+    total["cost_of_sales"] += part["cost_of_sales"]
+    total["stock_adjustment_loss"] += part["stock_adjustment_loss"]
+    return total
+
 
+def _compute_figures(
+    db: Session,
+    business_id: Optional[int],
+    start_date: date,
+    end_date: date
+) -> dict:
+    """Live aggregation over [start_date 00:00, end_date + 1 day 00:00) Lagos time."""
     start_dt = datetime.combine(start_date, time.min, tzinfo=LAGOS_TZ)
-    end_dt   = datetime.combine(end_date, time.max, tzinfo=LAGOS_TZ)
+    end_dt = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=LAGOS_TZ)
+
+    # expense_date is a naive column holding Lagos wall-clock time
+    expense_start = start_dt.replace(tzinfo=None)
+    expense_end = end_dt.replace(tzinfo=None)
+
+    # sale_items carries sold_at too → its monthly partitions prune as well
+    # (NULL = items from before the column existed)
+    item_filter = or_(
+        sales_models.SaleItem.sold_at.is_(None),
+        and_(sales_models.SaleItem.sold_at >= start_dt, sales_models.SaleItem.sold_at < end_dt)
+    )
 
     sale_filter = []
     expense_filter = []
     adjustment_filter = []
+    sale_rollup_filter = []
+    expense_rollup_filter = []
 
-    # ───────────────── Tenant Filtering ─────────────────
-    if "super_admin" in current_user.roles:
-        if business_id is not None:
-            sale_filter.append(sales_models.Sale.business_id == business_id)
-            expense_filter.append(expense_models.Expense.business_id == business_id)
-            adjustment_filter.append(adjustments_models.StockAdjustment.business_id == business_id)
-    else:
-        if not current_user.business_id:
-            raise HTTPException(403, "Current user does not belong to any business")
-
-        sale_filter.append(sales_models.Sale.business_id == current_user.business_id)
-        expense_filter.append(expense_models.Expense.business_id == current_user.business_id)
-        adjustment_filter.append(adjustments_models.StockAdjustment.business_id == current_user.business_id)
+    if business_id is not None:
+        sale_filter.append(sales_models.Sale.business_id == business_id)
+        expense_filter.append(expense_models.Expense.business_id == business_id)
+        adjustment_filter.append(adjustments_models.StockAdjustment.business_id == business_id)
+        sale_rollup_filter.append(sales_models.SaleRollup.business_id == business_id)
+        expense_rollup_filter.append(expense_models.ExpenseRollup.business_id == business_id)
 
     # ───────────────── Revenue ─────────────────
-    revenue_query = (
+    revenue_rows = (
         db.query(
             category_models.Category.name.label("category"),
             func.sum(
@@ -67,18 +94,16 @@ def get_profit_and_loss(
         .join(category_models.Category, category_models.Category.id == product_models.Product.category_id)
         .filter(
             sales_models.Sale.sold_at >= start_dt,
-            sales_models.Sale.sold_at <= end_dt,
+            sales_models.Sale.sold_at < end_dt,
+            item_filter,
             *sale_filter
         )
         .group_by(category_models.Category.name)
+        .all()
     )
 
-    revenue_rows = revenue_query.all()
-    revenue = {row.category: float(row.revenue or 0) for row in revenue_rows}
-    total_revenue = sum(revenue.values())
-
     # ───────────────── Normal Cost of Sales (from sales) ─────────────────
-    cos_query = (
+    cos = (
         db.query(
             func.sum(
                 sales_models.SaleItem.quantity * sales_models.SaleItem.cost_price
@@ -87,16 +112,15 @@ def get_profit_and_loss(
         .join(sales_models.Sale, sales_models.Sale.invoice_no == sales_models.SaleItem.sale_invoice_no)
         .filter(
             sales_models.Sale.sold_at >= start_dt,
-            sales_models.Sale.sold_at <= end_dt,
+            sales_models.Sale.sold_at < end_dt,
+            item_filter,
             *sale_filter
         )
         .scalar()
     )
 
-    normal_cost_of_sales = float(cos_query or 0)
-
     # ───────────────── Stock Adjustment Loss ─────────────────
-    adjustment_loss_query = (
+    adjustment_loss = (
         db.query(
             func.sum(
                 func.abs(adjustments_models.StockAdjustment.quantity) *
@@ -110,46 +134,244 @@ def get_profit_and_loss(
         )
         .filter(
             adjustments_models.StockAdjustment.adjusted_at >= start_dt,
-            adjustments_models.StockAdjustment.adjusted_at <= end_dt,
+            adjustments_models.StockAdjustment.adjusted_at < end_dt,
             adjustments_models.StockAdjustment.quantity < 0,
             *adjustment_filter
         )
         .scalar()
     )
 
-
-    stock_adjustment_loss = float(adjustment_loss_query or 0)
-
-    # ───────────────── Final Cost of Sales ─────────────────
-    cost_of_sales = normal_cost_of_sales 
-
-    gross_profit = total_revenue - cost_of_sales - stock_adjustment_loss
-
     # ───────────────── Expenses ─────────────────
-    expense_query = (
+    expense_rows = (
         db.query(
             expense_models.Expense.account_type.label("account_type"),
             func.sum(expense_models.Expense.amount).label("total")
         )
         .filter(
-            expense_models.Expense.expense_date >= start_dt,
-            expense_models.Expense.expense_date <= end_dt,
+            expense_models.Expense.expense_date >= expense_start,
+            expense_models.Expense.expense_date < expense_end,
             expense_models.Expense.is_active == True,
             *expense_filter
         )
         .group_by(expense_models.Expense.account_type)
+        .all()
+    )
+
+    figures = {
+        "revenue": {row.category: float(row.revenue or 0) for row in revenue_rows},
+        "cost_of_sales": float(cos or 0),
+        "stock_adjustment_loss": float(adjustment_loss or 0),
+        "expenses": {row.account_type: float(row.total or 0) for row in expense_rows},
+    }
+
+    # ───────────────── Archived years (daily rollups, app/core/archive.py) ─────────────────
+    rolled_sales = (
+        db.query(
+            category_models.Category.name.label("category"),
+            func.sum(sales_models.SaleRollup.gross_sales).label("revenue"),
+            func.sum(sales_models.SaleRollup.cost).label("cos")
+        )
+        .select_from(sales_models.SaleRollup)
+        .outerjoin(product_models.Product, product_models.Product.id == sales_models.SaleRollup.product_id)
+        .outerjoin(category_models.Category, category_models.Category.id == product_models.Product.category_id)
+        .filter(
+            sales_models.SaleRollup.day >= start_date,
+            sales_models.SaleRollup.day <= end_date,
+            *sale_rollup_filter
+        )
+        .group_by(category_models.Category.name)
+        .all()
+    )
+
+    rolled_expenses = (
+        db.query(
+            expense_models.ExpenseRollup.account_type.label("account_type"),
+            func.sum(expense_models.ExpenseRollup.amount).label("total")
+        )
+        .filter(
+            expense_models.ExpenseRollup.day >= start_date,
+            expense_models.ExpenseRollup.day <= end_date,
+            *expense_rollup_filter
+        )
+        .group_by(expense_models.ExpenseRollup.account_type)
+        .all()
     )
 
-    expense_rows = expense_query.all()
-    expenses = {row.account_type: float(row.total or 0) for row in expense_rows}
+    # Same joins as the live queries: revenue needs product + category, cost of sales doesn't
+    _add_figures(figures, {
+        "revenue": {row.category: float(row.revenue or 0) for row in rolled_sales if row.category is not None},
+        "cost_of_sales": sum(float(row.cos or 0) for row in rolled_sales),
+        "stock_adjustment_loss": 0.0,
+        "expenses": {row.account_type: float(row.total or 0) for row in rolled_expenses},
+    })
+
+    return figures
+
+
+# ============================================================
+# 📸 Monthly snapshots (closed months)
+# ============================================================
+def _stored_figures(db: Session, business_id: int, months: List[date]) -> dict:
+    return {
+        row.month: row.figures
+        for row in db.query(ProfitLossSnapshot.month, ProfitLossSnapshot.figures).filter(
+            ProfitLossSnapshot.business_id == business_id,
+            ProfitLossSnapshot.month.in_(months)
+        ).all()
+    }
+
+
+def _month_figures(db: Session, business_id: int, months: List[date]) -> dict:
+    """
+    Figures of closed months ({month: figures}): stored snapshots are read in
+    one query, missing months are computed once and stored.
+    """
+    if not months:
+        return {}
+
+    found = _stored_figures(db, business_id, months)
+
+    missing = [month for month in months if month not in found]
+
+    # On a replica session: compute + store missing months on the primary
+    # (a snapshot taken from a lagging replica would outlive its invalidation)
+    if missing and db.info.get("read_only"):
+        primary = SessionLocal()
+        try:
+            found.update(_month_figures(primary, business_id, missing))
+        finally:
+            primary.close()
+        return found
+
+    if missing:
+        # Wait for uncommitted writes to these months (they hold the lock
+        # until commit) so the figures below include them; held until the
+        # commit below so a write can't delete a snapshot before it's stored
+        lock_snapshots(db, [business_id])
+        found.update(_stored_figures(db, business_id, missing))
+        missing = [month for month in missing if month not in found]
+
+        new_rows = []
+        for month in missing:
+            found[month] = _compute_figures(db, business_id, month, month_end(month))
+            new_rows.append({
+                "business_id": business_id,
+                "month": month,
+                "figures": found[month],
+                "computed_at": datetime.now(LAGOS_TZ),
+            })
+
+        if new_rows:
+            db.execute(
+                pg_insert(ProfitLossSnapshot)
+                .values(new_rows)
+                .on_conflict_do_nothing(constraint="uq_pl_snapshot_business_month")
+            )
+        db.commit()   # releases the lock
+
+    return found
+
+
+def _split_period(start_date: date, end_date: date, closed_before: date) -> List[Tuple[str, date, date]]:
+    """
+    Split [start_date, end_date] into ("snapshot", month, month_end) pieces for
+    whole closed months and ("live", start, end) pieces for everything else
+    (partial months at the edges, the current month).
+    """
+    segments: List[Tuple[str, date, date]] = []
+    day = start_date
+
+    while day <= end_date:
+        last_day = month_end(day)
+
+        if day.day == 1 and last_day <= end_date and day < closed_before:
+            segments.append(("snapshot", day, last_day))
+        else:
+            piece_end = min(last_day, end_date)
+            if segments and segments[-1][0] == "live" and segments[-1][2] + timedelta(days=1) == day:
+                segments[-1] = ("live", segments[-1][1], piece_end)
+            else:
+                segments.append(("live", day, piece_end))
+
+        day = last_day + timedelta(days=1)
+
+    return segments
+
+
+# ============================================================
+# 📊 Profit & Loss
+# ============================================================
+def get_profit_and_loss(
+    db: Session,
+    current_user: UserDisplaySchema,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    business_id: Optional[int] = None
+) -> ProfitLossResponse:
+    """
+    P&L for a period.
+
+    - Answered from the (business, period) cache when possible
+    - Per business, whole closed months come from monthly snapshots; only
+      partial months and the current month are aggregated live
+      (year-to-date = closed-month snapshots + the live current month)
+    - Super admin totals across all businesses are aggregated live
+    """
+    today = datetime.now(LAGOS_TZ).date()
+
+    if start_date is None:
+        start_date = date(today.year, today.month, 1)
+    if end_date is None:
+        end_date = today
+
+    # ───────────────── Tenant Filtering ─────────────────
+    if "super_admin" in current_user.roles:
+        target_business_id = business_id
+    else:
+        if not current_user.business_id:
+            raise HTTPException(403, "Current user does not belong to any business")
+        target_business_id = current_user.business_id
+
+    cache_key = (target_business_id, start_date, end_date)
+    cached = profit_loss_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # ───────────────── Figures ─────────────────
+    if target_business_id is None:
+        figures = _compute_figures(db, None, start_date, end_date)
+    else:
+        segments = _split_period(start_date, end_date, current_month_start())
+        snapshots = _month_figures(
+            db, target_business_id, [piece_start for kind, piece_start, _ in segments if kind == "snapshot"]
+        )
+
+        figures = _empty_figures()
+        for kind, piece_start, piece_end in segments:
+            if kind == "snapshot":
+                part = snapshots[piece_start]
+            else:
+                part = _compute_figures(db, target_business_id, piece_start, piece_end)
+            _add_figures(figures, part)
+
+    revenue = figures["revenue"]
+    total_revenue = sum(revenue.values())
+
+    # ───────────────── Final Cost of Sales ─────────────────
+    cost_of_sales = figures["cost_of_sales"]
+    stock_adjustment_loss = figures["stock_adjustment_loss"]
+
+    gross_profit = total_revenue - cost_of_sales - stock_adjustment_loss
+
+    expenses = figures["expenses"]
     total_expenses = sum(expenses.values())
 
     net_profit = gross_profit - total_expenses
 
-    return ProfitLossResponse(
+    response = ProfitLossResponse(
         period={
-            "start_date": start_dt,
-            "end_date": end_dt
+            "start_date": datetime.combine(start_date, time.min, tzinfo=LAGOS_TZ),
+            "end_date": datetime.combine(end_date, time.max, tzinfo=LAGOS_TZ)
         },
         revenue=revenue,
         total_revenue=total_revenue,
@@ -162,3 +384,6 @@ def get_profit_and_loss(
         # 🔥 OPTIONAL: show separately for transparency
         stock_adjustment_loss=stock_adjustment_loss
     )
+
+    profit_loss_cache.put(cache_key, response)
+    return response
@@ -68,23 +68,11 @@ class Business(Base):
         """
         Dynamically check if this business has an active, non-expired license.
         Returns False if no active license or expired.
+        Served from the in-memory license state (see app/license/state.py).
         """
-        from app.license.models import LicenseKey
-        
-        latest_license = (
-            db.query(LicenseKey)
-            .filter(
-                LicenseKey.business_id == self.id,
-                LicenseKey.is_active == True
-            )
-            .order_by(LicenseKey.expiration_date.desc())
-            .first()
-        )
-        
-        if not latest_license:
-            return False
-            
-        return latest_license.expiration_date >= datetime.utcnow()
+        from app.license.state import license_state
+
+        return license_state.is_active(db, self.id)
 
 # Ensure dependent models are imported AFTER Business is defined
 from app.bank.models import Bank
@@ -2,12 +2,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import func, and_, case
 from app.users.auth import get_current_user
 from app.users.schemas import UserDisplaySchema
 from app.license import models as license_models
+from app.license.state import license_state
 
 
 from app.database import get_db
@@ -100,13 +101,50 @@ def create_business(
 def list_businesses(
     active: Optional[bool] = Query(None),
     name: Optional[str] = Query(None),
+    sort_by: Literal["created_at", "name", "license_active", "expiration_date"] = Query("created_at"),
+    order: Literal["asc", "desc"] = Query("desc"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (omit for all)"),
     db: Session = Depends(get_db),
     current_user: UserDisplaySchema = Depends(role_required(["super_admin", "admin"]))
 ):
     roles = set(current_user.roles)
 
     if "super_admin" in roles:
-        query = db.query(models.Business)
+        LicenseKey = license_models.LicenseKey
+
+        # Latest license per business in one pass (DISTINCT ON business_id)
+        latest = (
+            db.query(
+                LicenseKey.business_id,
+                LicenseKey.is_active,
+                LicenseKey.expiration_date,
+            )
+            .distinct(LicenseKey.business_id)
+            .order_by(LicenseKey.business_id, LicenseKey.expiration_date.desc())
+            .subquery()
+        )
+
+        license_active = case(
+            (
+                and_(
+                    latest.c.is_active.is_(True),
+                    latest.c.expiration_date >= datetime.now(LAGOS_TZ),
+                ),
+                True,
+            ),
+            else_=False,
+        )
+
+        query = (
+            db.query(
+                models.Business,
+                license_active.label("license_active"),
+                latest.c.expiration_date,
+                func.count().over().label("total_count"),
+            )
+            .outerjoin(latest, latest.c.business_id == models.Business.id)
+        )
 
         if name:
             query = query.filter(
@@ -114,34 +152,36 @@ def list_businesses(
             )
 
         if active is not None:
-            subquery = (
-                db.query(license_models.LicenseKey.business_id)
-                .filter(
-                    license_models.LicenseKey.is_active == True,
-                    license_models.LicenseKey.expiration_date >= now_lagos
-                )
-                .subquery()
-            )
-            if active:
-                query = query.filter(models.Business.id.in_(subquery))
-            else:
-                query = query.filter(~models.Business.id.in_(subquery))
-
-        query = query.order_by(models.Business.created_at.desc())
-        businesses = query.all()
+            query = query.filter(license_active == active)
+
+        sort_column = {
+            "created_at": models.Business.created_at,
+            "name": models.Business.name,
+            "license_active": license_active,
+            "expiration_date": latest.c.expiration_date,
+        }[sort_by]
+        sort_column = sort_column.desc() if order == "desc" else sort_column.asc()
+
+        # id as tie-breaker keeps pages stable
+        query = query.order_by(sort_column.nulls_last(), models.Business.id.desc())
+
+        if skip:
+            query = query.offset(skip)
+        if limit:
+            query = query.limit(limit)
+
+        rows = query.all()
+
+        if rows:
+            total = rows[0].total_count
+        elif skip:
+            # Page past the end → window count unavailable, count separately
+            total = query.limit(None).offset(None).order_by(None).count()
+        else:
+            total = 0
 
         enriched = []
-        for biz in businesses:
-            latest_license = (
-                db.query(license_models.LicenseKey)
-                .filter(license_models.LicenseKey.business_id == biz.id)
-                .order_by(license_models.LicenseKey.expiration_date.desc())
-                .first()
-            )
-
-            is_active = (
-                latest_license.is_active and latest_license.expiration_date >= now_lagos
-            ) if latest_license else False
+        for biz, is_active, expiration_date, _ in rows:
 
             # Create fresh dict instead of mutating Pydantic object
             biz_dict = {
@@ -153,12 +193,12 @@ def list_businesses(
                 "owner_username": biz.owner_username,
                 "created_at": biz.created_at,
                 "license_active": is_active,
-                "expiration_date": latest_license.expiration_date if latest_license else None,
+                "expiration_date": expiration_date,
             }
 
             enriched.append(biz_dict)
 
-        return {"total": len(enriched), "businesses": enriched}
+        return {"total": total, "businesses": enriched}
 
     else:
         # Admin sees only their own business
@@ -169,16 +209,9 @@ def list_businesses(
         if not business:
             return {"total": 0, "businesses": []}
 
-        latest_license = (
-            db.query(license_models.LicenseKey)
-            .filter(license_models.LicenseKey.business_id == business.id)
-            .order_by(license_models.LicenseKey.expiration_date.desc())
-            .first()
-        )
+        latest_license = license_state.get(db, business.id)
 
-        is_active = (
-            latest_license.is_active and latest_license.expiration_date >= now_lagos
-        ) if latest_license else False
+        is_active = latest_license.is_valid() if latest_license else False
 
         if active is not None and is_active != active:
             return {"total": 0, "businesses": []}
@@ -192,7 +225,7 @@ def list_businesses(
             "owner_username": business.owner_username,
             "created_at": business.created_at,
             "license_active": is_active,
-            "expiration_date": latest_license.expiration_date if latest_license else None,
+            "expiration_date": latest_license.expires_at if latest_license else None,
         }
 
         return {"total": 1, "businesses": [biz_dict]}
@@ -359,5 +392,6 @@ def delete_business(
 
     db.delete(business)
     db.commit()
+    license_state.forget(business_id)
 
     return {"message": f"Business {business.name} deleted successfully"}
\ No newline at end of file
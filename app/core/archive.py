@@ -0,0 +1,203 @@
+# app/core/archive.py
+"""
+Cold-data archival of closed fiscal years.
+
+Moves old rows out of the hot tables into `<table>_archive` tables:
+
+    sales, sale_items, payments   → sales older than the cutoff, fully paid
+    expenses                      → expense_date older than the cutoff
+
+and leaves daily rollups behind (sale_rollups, expense_rollups), which the
+P&L (app/accounts/profit_loss/service.py) and sales analysis add to what is
+still in the hot tables. Rollup rows only ever cover archived rows, so the
+two never overlap.
+
+Sales with a balance due stay hot (outstanding sales, payments keep working).
+staff_sales_report and the sales list only show hot sales.
+
+    python -m app.core.archive                       # keep ARCHIVE_KEEP_YEARS closed years
+    python -m app.core.archive --before 2024-01-01 [--business-id 3] [--dry-run]
+
+Archive tables are plain tables with the hot columns (no keys/indexes
+besides a lookup index); dump + drop them with pg_dump when they are no
+longer needed online.
+"""
+import argparse
+import os
+from datetime import date, datetime, time
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from zoneinfo import ZoneInfo
+LAGOS_TZ = ZoneInfo("Africa/Lagos")
+
+
+# Closed fiscal years kept in the hot tables (besides the current one)
+ARCHIVE_KEEP_YEARS = int(os.getenv("ARCHIVE_KEEP_YEARS", 2))
+
+# archive table → index of its lookup columns
+ARCHIVE_TABLES = {
+    "sales": "business_id, sold_at",
+    "sale_items": "sale_invoice_no",
+    "payments": "sale_invoice_no",
+    "expenses": "business_id, expense_date",
+}
+
+
+def default_cutoff(keep_years: int = ARCHIVE_KEEP_YEARS) -> date:
+    """First day kept hot: 1 January, `keep_years` closed years back."""
+    return date(datetime.now(LAGOS_TZ).year - keep_years, 1, 1)
+
+
+# ============================================================
+# 🗄️ Archive tables
+# ============================================================
+def _columns(conn: Connection, table: str) -> Dict[str, str]:
+    rows = conn.execute(text("""
+        SELECT attname, format_type(atttypid, atttypmod) AS type
+        FROM pg_attribute
+        WHERE attrelid = CAST(:table AS regclass) AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+    """), {"table": table}).all()
+    return {row.attname: row.type for row in rows}
+
+
+def ensure_archive_table(conn: Connection, table: str) -> str:
+    """Create `<table>_archive` (or add columns the hot table gained since)."""
+    archive = f"{table}_archive"
+
+    exists = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": f"public.{archive}"}).scalar()
+    if not exists:
+        conn.execute(text(f"CREATE TABLE {archive} (LIKE {table})"))
+        conn.execute(text(f"ALTER TABLE {archive} ADD COLUMN archived_at TIMESTAMP WITH TIME ZONE DEFAULT now()"))
+        conn.execute(text(f"CREATE INDEX ix_{archive}_lookup ON {archive} ({ARCHIVE_TABLES[table]})"))
+        return archive
+
+    archived_columns = _columns(conn, archive)
+    for column, column_type in _columns(conn, table).items():
+        if column not in archived_columns:
+            conn.execute(text(f'ALTER TABLE {archive} ADD COLUMN "{column}" {column_type}'))
+
+    return archive
+
+
+def _copy(conn: Connection, table: str, where: str, params: dict) -> int:
+    archive = ensure_archive_table(conn, table)
+    columns = ", ".join(f'"{c}"' for c in _columns(conn, table))
+    return conn.execute(
+        text(f"INSERT INTO {archive} ({columns}) SELECT {columns} FROM {table} WHERE {where}"),
+        params
+    ).rowcount
+
+
+# ============================================================
+# 🚚 Archive run
+# ============================================================
+def archive_before(
+    conn: Connection,
+    cutoff: date,
+    business_id: Optional[int] = None,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Archive sales and expenses dated before `cutoff` (Lagos), leaving daily
+    rollups behind. Runs in the caller's transaction; returns row counts.
+    """
+    cutoff_dt = datetime.combine(cutoff, time.min, tzinfo=LAGOS_TZ)
+    params = {"cutoff": cutoff_dt, "expense_cutoff": cutoff_dt.replace(tzinfo=None), "business_id": business_id}
+    business_filter = "AND business_id = :business_id" if business_id is not None else ""
+    sale_filter = "AND s.business_id = :business_id" if business_id is not None else ""
+
+    # ─── Sales to move: old and fully paid ───
+    conn.execute(text(f"""
+        CREATE TEMP TABLE archive_invoices ON COMMIT DROP AS
+        SELECT s.invoice_no
+        FROM sales s
+        WHERE s.sold_at < :cutoff {sale_filter}
+          AND COALESCE(s.total_amount, 0) - COALESCE(
+                (SELECT sum(p.amount_paid) FROM payments p WHERE p.sale_invoice_no = s.invoice_no), 0
+              ) <= 0.005
+    """), params)
+    conn.execute(text("ALTER TABLE archive_invoices ADD PRIMARY KEY (invoice_no)"))
+    conn.execute(text("ANALYZE archive_invoices"))
+
+    counts = {
+        "sales": conn.execute(text("SELECT count(*) FROM archive_invoices")).scalar(),
+        "expenses": conn.execute(text(
+            f"SELECT count(*) FROM expenses WHERE expense_date < :expense_cutoff {business_filter}"
+        ), params).scalar(),
+    }
+    if dry_run:
+        conn.execute(text("DROP TABLE archive_invoices"))
+        return counts
+
+    archived = "sale_invoice_no IN (SELECT invoice_no FROM archive_invoices)"
+
+    # ─── Rollups (before the rows go) ───
+    conn.execute(text("""
+        INSERT INTO sale_rollups (business_id, day, product_id, quantity, gross_sales, discount, cost)
+        SELECT s.business_id,
+               CAST(timezone('Africa/Lagos', s.sold_at) AS date),
+               si.product_id,
+               COALESCE(sum(si.quantity), 0),
+               COALESCE(sum(si.quantity * si.selling_price), 0),
+               COALESCE(sum(si.discount), 0),
+               COALESCE(sum(si.quantity * si.cost_price), 0)
+        FROM sale_items si
+        JOIN sales s ON s.invoice_no = si.sale_invoice_no
+        WHERE s.invoice_no IN (SELECT invoice_no FROM archive_invoices)
+        GROUP BY 1, 2, 3
+    """))
+
+    conn.execute(text(f"""
+        INSERT INTO expense_rollups (business_id, day, account_type, amount)
+        SELECT business_id, CAST(expense_date AS date), account_type, COALESCE(sum(amount), 0)
+        FROM expenses
+        WHERE expense_date < :expense_cutoff AND is_active = true {business_filter}
+        GROUP BY 1, 2, 3
+    """), params)
+
+    # ─── Copy, then delete (children first: FKs / sales_children trigger) ───
+    counts["sale_items"] = _copy(conn, "sale_items", archived, {})
+    counts["payments"] = _copy(conn, "payments", archived, {})
+    _copy(conn, "sales", "invoice_no IN (SELECT invoice_no FROM archive_invoices)", {})
+    _copy(conn, "expenses", f"expense_date < :expense_cutoff {business_filter}", params)
+
+    conn.execute(text(f"DELETE FROM sale_items WHERE {archived}"))
+    conn.execute(text(f"DELETE FROM payments WHERE {archived}"))
+    conn.execute(text("DELETE FROM sale_receipts WHERE invoice_no IN (SELECT invoice_no FROM archive_invoices)"))
+    conn.execute(text("DELETE FROM sales WHERE invoice_no IN (SELECT invoice_no FROM archive_invoices)"))
+    conn.execute(text(f"DELETE FROM expenses WHERE expense_date < :expense_cutoff {business_filter}"), params)
+
+    return counts
+
+
+# ============================================================
+# 🛠️ CLI
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Archive closed fiscal years of sales and expenses")
+    parser.add_argument("--before", help="YYYY-MM-DD, first day kept hot (default: ARCHIVE_KEEP_YEARS)")
+    parser.add_argument("--keep-years", type=int, default=ARCHIVE_KEEP_YEARS)
+    parser.add_argument("--business-id", type=int)
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+    args = parser.parse_args()
+
+    cutoff = date.fromisoformat(args.before) if args.before else default_cutoff(args.keep_years)
+
+    import app.main  # noqa: F401  (registers every model)
+    from app.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)   # rollup tables on a not-yet-restarted deployment
+
+    with engine.begin() as conn:
+        counts = archive_before(conn, cutoff, args.business_id, args.dry_run)
+
+    action = "would archive" if args.dry_run else "archived"
+    print(f"📦 Before {cutoff}: {action} " + ", ".join(f"{n} {table}" for table, n in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import gzip
+import os
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional → gzip only
+    brotli = None
+
+
+# ============================================================
+# ⚙️ Config
+# ============================================================
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))   # bytes
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))                         # 1-9
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 5))                 # 0-11
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/manifest+json",
+    "image/svg+xml",
+    "text/",
+)
+
+# Sent as they are produced (no Content-Length): never buffered
+STREAMING_TYPES = (
+    "text/event-stream",
+    "text/csv",
+    "application/x-ndjson",
+)
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """Parse Accept-Encoding, dropping anything explicitly refused (q=0)."""
+    encodings = set()
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.add(name.strip())
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def is_streaming(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith(STREAMING_TYPES)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+# ============================================================
+# 🗜️ Precompressed build assets (.br / .gz next to the original)
+# ============================================================
+# Preference order when the client accepts several (see app/core/spa.py)
+PRECOMPRESSED_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+
+# ============================================================
+# 📦 Middleware
+# ============================================================
+class CompressionMiddleware:
+    """
+    Negotiated br/gzip compression for compressible responses larger than
+    COMPRESSION_MIN_SIZE. Responses that already carry a Content-Encoding
+    (e.g. precompressed assets), non-text payloads (backups, images) and
+    streamed responses (event streams, CSV exports without Content-Length)
+    pass through untouched.
+
+    Every compressible response gets `Vary: Accept-Encoding`, compressed or
+    not (identity for clients without gzip/br, or below the size threshold),
+    so shared caches keep one copy per encoding.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+
+        start_message = None
+        chunks = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type")
+                content_length = headers.get("content-length")
+
+                if (
+                    message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or not is_compressible(content_type)
+                    or (content_length is None and is_streaming(content_type))
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+
+                # Negotiable representation → caches must key on Accept-Encoding
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+
+                if encoding is None or (content_length is not None and int(content_length) < self.minimum_size):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start_message["headers"])
+
+            if len(body) >= self.minimum_size:
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+
+            headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,136 @@
+import base64
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+
+# ============================================================
+# 🔖 Opaque (sort_key, id) cursors
+# ============================================================
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    if isinstance(sort_value, datetime):
+        payload = {"t": "dt", "v": sort_value.isoformat(), "id": row_id}
+    elif isinstance(sort_value, date):
+        payload = {"t": "d", "v": sort_value.isoformat(), "id": row_id}
+    else:
+        payload = {"t": "v", "v": sort_value, "id": row_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = payload["v"]
+        if payload["t"] == "dt":
+            value = datetime.fromisoformat(value)
+        elif payload["t"] == "d":
+            value = date.fromisoformat(value)
+        return value, int(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# ============================================================
+# 📄 Keyset pagination
+# ============================================================
+def keyset_paginate(
+    query,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+    row_key: Optional[Callable[[Any], Tuple[Any, int]]] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Page `query` by (sort_column, id_column) instead of OFFSET.
+
+    The cursor carries the last row's (sort_key, id); the next page starts
+    strictly after it, so every page costs the same index range scan.
+    Returns (rows, next_cursor) — next_cursor is None on the last page.
+
+    `row_key` extracts (sort_key, id) from a result row; by default the
+    row attributes named after the two columns are used.
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        position = tuple_(sort_column, id_column)
+        after = tuple_(value, last_id)
+        query = query.filter(position < after if descending else position > after)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        if row_key is None:
+            last = rows[-1]
+            next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+        else:
+            next_cursor = encode_cursor(*row_key(rows[-1]))
+
+    return rows, next_cursor
+
+
+# ============================================================
+# 🔢 Total counts
+# ============================================================
+# ?count= on list endpoints:
+#   (omitted) → no total, nothing extra runs
+#   exact     → COUNT(*) over the filtered set
+#   estimate  → planner row estimate (EXPLAIN), constant cost at any size
+#   auto      → exact while the estimate is under COUNT_EXACT_THRESHOLD, else the estimate
+COUNT_MODE_PATTERN = "^(exact|estimate|auto)$"
+COUNT_MODE_DESCRIPTION = "Include total_count: exact, estimate (planner, fast) or auto"
+COUNT_EXACT_THRESHOLD = int(os.getenv("COUNT_EXACT_THRESHOLD", 10000))
+
+
+def estimate_count(db: Session, query) -> int:
+    """Planner's row estimate for `query` (EXPLAIN, nothing is scanned)."""
+    statement = query.order_by(None).statement
+    compiled = statement.compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True}
+    )
+    plan = db.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def exact_count(db: Session, query) -> int:
+    """COUNT(*) over the filtered rows (ordering and eager loads dropped)."""
+    return db.query(func.count()).select_from(query.order_by(None).subquery()).scalar()
+
+
+def count_rows(db: Session, query, mode: Optional[str]) -> Tuple[Optional[int], bool]:
+    """
+    Total rows matched by `query` (filters only — call it before paging).
+    Returns (total, is_estimate); (None, False) when no count was requested.
+    """
+    if not mode:
+        return None, False
+
+    if mode == "exact":
+        return exact_count(db, query), False
+
+    estimate = estimate_count(db, query)
+    if mode == "auto" and estimate < COUNT_EXACT_THRESHOLD:
+        return exact_count(db, query), False
+
+    return estimate, True
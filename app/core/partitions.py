@@ -0,0 +1,450 @@
+# app/core/partitions.py
+"""
+Monthly range partitioning of the big, date-filtered tables.
+
+    sales       → sold_at
+    sale_items  → sold_at (copied from the sale, see app/sales/models.py)
+    payments    → created_at
+
+Tables start out as plain tables (create_all). Converting them is an
+explicit, offline maintenance step:
+
+    python -m app.core.partitions migrate            # convert + move existing rows
+    python -m app.core.partitions ensure             # create upcoming months
+    python -m app.core.partitions detach --before 2024-01 [--drop]
+
+After `migrate`:
+- each table has one partition per Lagos calendar month (`sales_2026_10`)
+  plus a `<table>_default` partition for anything outside them
+- date filters on sold_at / created_at prune to the matching months
+- startup (prepare_partitioning) keeps PARTITION_MONTHS_AHEAD months of
+  partitions created in advance
+- old months can be detached (or dropped) without touching other rows
+
+Postgres requires the partition key in every unique index, so:
+- primary keys become (id, <key>); the ORM still identifies rows by id
+- unique indexes without the key (sales.invoice_no) become plain indexes;
+  invoice numbers still come from a single sequence
+- foreign keys pointing at sales.invoice_no are dropped; the
+  `sales_children` trigger takes over their ON DELETE CASCADE
+"""
+import argparse
+import os
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from zoneinfo import ZoneInfo
+LAGOS_TZ = ZoneInfo("Africa/Lagos")
+
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))
+
+# table → partition key (migration order: sales first, its incoming FKs go)
+PARTITIONED_TABLES: Dict[str, str] = {
+    "sales": "sold_at",
+    "sale_items": "sold_at",
+    "payments": "created_at",
+}
+
+# pg_advisory_xact_lock key: partition DDL runs one at a time (several
+# workers start together; create_partition checks, then creates)
+PARTITION_LOCK_KEY = 0x7061727469   # "parti"
+
+
+def lock_partitioning(conn: Connection):
+    """Hold the partitioning lock until the end of `conn`'s transaction."""
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+
+
+# ============================================================
+# 📅 Months
+# ============================================================
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_bounds(month: date):
+    start = datetime.combine(month, time.min, tzinfo=LAGOS_TZ)
+    end = datetime.combine(_add_months(month, 1), time.min, tzinfo=LAGOS_TZ)
+    return start, end
+
+
+def _current_month() -> date:
+    return datetime.now(LAGOS_TZ).date().replace(day=1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def _partition_month(table: str, name: str) -> Optional[date]:
+    suffix = name[len(table) + 1:]
+    try:
+        return datetime.strptime(suffix, "%Y_%m").date()
+    except ValueError:
+        return None   # the default partition
+
+
+# ============================================================
+# 🔍 Catalog
+# ============================================================
+def is_partitioned(conn: Connection, table: str) -> bool:
+    return bool(conn.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = :table AND c.relnamespace = 'public'::regnamespace
+        )
+    """), {"table": table}).scalar())
+
+
+def list_partitions(conn: Connection, table: str) -> List[str]:
+    return list(conn.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = :table AND parent.relnamespace = 'public'::regnamespace
+        ORDER BY child.relname
+    """), {"table": table}).scalars())
+
+
+def _table_exists(conn: Connection, table: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": f"public.{table}"}).scalar()
+
+
+# ============================================================
+# 🧱 Partitions
+# ============================================================
+def create_partition(conn: Connection, table: str, month: date) -> bool:
+    """
+    Create + attach the partition of `month` (no-op if it exists).
+
+    Built with LIKE + ATTACH rather than PARTITION OF, so rows of that month
+    already sitting in the default partition are moved into it first.
+    """
+    name = partition_name(table, month)
+    if _table_exists(conn, name):
+        return False
+
+    key = PARTITIONED_TABLES[table]
+    start, end = _month_bounds(month)
+
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+
+    default = f"{table}_default"
+    if _table_exists(conn, default):
+        conn.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {default} WHERE {key} >= :start AND {key} < :end RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """), {"start": start, "end": end})
+
+    conn.execute(text(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    return True
+
+
+def ensure_future_partitions(conn: Connection, months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Create this month's and the next `months_ahead` months' partitions of every partitioned table."""
+    created = []
+    this_month = _current_month()
+
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(conn, table):
+            continue
+        for offset in range(months_ahead + 1):
+            month = _add_months(this_month, offset)
+            if create_partition(conn, table, month):
+                created.append(partition_name(table, month))
+
+    return created
+
+
+def detach_partitions_before(conn: Connection, table: str, before: date, drop: bool = False) -> List[str]:
+    """
+    Detach (or drop) the monthly partitions of `table` older than `before`.
+    Detached partitions stay as standalone tables with the same name.
+    """
+    detached = []
+    for name in list_partitions(conn, table):
+        month = _partition_month(table, name)
+        if month is None or month >= before:
+            continue
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if drop:
+            conn.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    return detached
+
+
+# ============================================================
+# 🔗 Sales children (replaces the FKs on sales.invoice_no)
+# ============================================================
+SALES_CHILDREN_TRIGGER = """
+CREATE OR REPLACE FUNCTION sales_children() RETURNS trigger AS $$
+DECLARE
+    current_sold_at timestamptz;
+BEGIN
+    -- AFTER triggers run at statement end: a row moved to another
+    -- partition (sold_at changed) shows up here as a DELETE but still exists
+    SELECT sold_at INTO current_sold_at FROM sales WHERE invoice_no = OLD.invoice_no;
+
+    IF NOT FOUND THEN
+        DELETE FROM sale_items WHERE sale_invoice_no = OLD.invoice_no;
+        DELETE FROM payments WHERE sale_invoice_no = OLD.invoice_no;
+        DELETE FROM sale_receipts WHERE invoice_no = OLD.invoice_no;
+    ELSE
+        UPDATE sale_items SET sold_at = current_sold_at
+        WHERE sale_invoice_no = OLD.invoice_no AND sold_at IS DISTINCT FROM current_sold_at;
+    END IF;
+
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sales_children ON sales;
+
+CREATE TRIGGER sales_children
+AFTER DELETE OR UPDATE OF sold_at ON sales
+FOR EACH ROW EXECUTE FUNCTION sales_children();
+"""
+
+
+def install_sales_children_trigger(conn: Connection):
+    conn.exec_driver_sql(SALES_CHILDREN_TRIGGER)
+
+
+# ============================================================
+# 🚚 Migration (plain table → partitioned)
+# ============================================================
+def _columns_of_index(conn: Connection, index_oid) -> List[str]:
+    return list(conn.execute(text("""
+        SELECT a.attname
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indexrelid = :oid
+    """), {"oid": index_oid}).scalars())
+
+
+def migrate_table(conn: Connection, table: str, months_ahead: int = PARTITION_MONTHS_AHEAD) -> int:
+    """
+    Convert `table` into a monthly-partitioned table in place (same name,
+    same columns/defaults/indexes/outgoing FKs) and move its rows into the
+    month partitions. Returns the number of rows moved. Run inside one
+    transaction with the table locked (see migrate()).
+    """
+    key = PARTITIONED_TABLES[table]
+    legacy = f"{table}_unpartitioned"
+
+    # 1. Remember what has to be rebuilt on the new table
+    indexes = conn.execute(text("""
+        SELECT i.indexrelid, c.relname, pg_get_indexdef(i.indexrelid) AS definition,
+               i.indisunique, i.indisprimary
+        FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = CAST(:table AS regclass)
+    """), {"table": table}).all()
+
+    primary_key = []
+    rebuilt_indexes = []
+    for index in indexes:
+        columns = _columns_of_index(conn, index.indexrelid)
+        if index.indisprimary:
+            primary_key = columns
+            continue
+        definition = index.definition
+        if index.indisunique and key not in columns:
+            definition = definition.replace("CREATE UNIQUE INDEX", "CREATE INDEX", 1)
+        rebuilt_indexes.append(definition)
+
+    outgoing_fks = conn.execute(text("""
+        SELECT conname, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'
+    """), {"table": table}).all()
+
+    identity_columns = conn.execute(text("""
+        SELECT attname, pg_get_serial_sequence(:table, attname) AS sequence
+        FROM pg_attribute
+        WHERE attrelid = CAST(:table AS regclass) AND attnum > 0
+          AND NOT attisdropped AND attidentity <> ''
+    """), {"table": table}).all()
+
+    # Next value of each identity sequence: numbers already handed out
+    # (deleted or archived rows, e.g. invoice_no) must never come back
+    identity_next = {}
+    for column, sequence in identity_columns:
+        state = conn.execute(text(f"SELECT last_value, is_called FROM {sequence}")).one()
+        identity_next[column] = state.last_value + 1 if state.is_called else state.last_value
+
+    serial_sequences = conn.execute(text("""
+        SELECT attname, pg_get_serial_sequence(:table, attname) AS sequence
+        FROM pg_attribute
+        WHERE attrelid = CAST(:table AS regclass) AND attnum > 0
+          AND NOT attisdropped AND attidentity = ''
+          AND pg_get_serial_sequence(:table, attname) IS NOT NULL
+    """), {"table": table}).all()
+
+    # 2. FKs pointing at this table can't reference a partitioned table
+    #    without the key → drop them (sales_children covers the cascade)
+    incoming_fks = conn.execute(text("""
+        SELECT conrelid::regclass::text AS referencing, conname
+        FROM pg_constraint
+        WHERE confrelid = CAST(:table AS regclass) AND contype = 'f'
+    """), {"table": table}).all()
+    for fk in incoming_fks:
+        conn.execute(text(f'ALTER TABLE {fk.referencing} DROP CONSTRAINT "{fk.conname}"'))
+
+    # 3. Partition key must be filled before rows can be routed
+    if table == "sale_items":
+        conn.execute(text("""
+            UPDATE sale_items si SET sold_at = s.sold_at
+            FROM sales s
+            WHERE s.invoice_no = si.sale_invoice_no AND si.sold_at IS NULL
+        """))
+        conn.execute(text("DELETE FROM sale_items WHERE sold_at IS NULL"))   # orphans
+
+    # 4. New partitioned table + month partitions, then move the rows
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    conn.execute(text(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE ({key})"
+    ))
+    conn.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+    first = conn.execute(text(f"SELECT min({key}) FROM {legacy}")).scalar()
+    month = first.astimezone(LAGOS_TZ).date().replace(day=1) if first else _current_month()
+    last = _add_months(_current_month(), months_ahead)
+    while month <= last:
+        create_partition(conn, table, month)
+        month = _add_months(month, 1)
+
+    moved = conn.execute(text(f"INSERT INTO {table} SELECT * FROM {legacy}")).rowcount
+
+    # 5. Sequences: serials move to the new table, identities become sequences
+    #    (partitioned tables can't have identity columns before Postgres 17)
+    for column, sequence in serial_sequences:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.{column}"))
+
+    conn.execute(text(f"DROP TABLE {legacy}"))
+
+    for column, _ in identity_columns:
+        sequence = f"{table}_{column}_seq"
+        conn.execute(text(f"CREATE SEQUENCE {sequence} OWNED BY {table}.{column}"))
+        conn.execute(text(
+            f"SELECT setval('{sequence}', GREATEST(:next, COALESCE((SELECT max({column}) FROM {table}), 0) + 1), false)"
+        ), {"next": identity_next[column]})
+        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT nextval('{sequence}')"))
+
+    # 6. Keys, indexes, FKs (created on the parent → cascade to every partition)
+    conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(primary_key + [key])})"))
+    for definition in rebuilt_indexes:
+        conn.execute(text(definition))
+    for fk in outgoing_fks:
+        conn.execute(text(f'ALTER TABLE {table} ADD CONSTRAINT "{fk.conname}" {fk.definition}'))
+
+    conn.execute(text(f"ANALYZE {table}"))
+    return moved
+
+
+def migrate(engine, tables: Optional[List[str]] = None, months_ahead: int = PARTITION_MONTHS_AHEAD) -> Dict[str, int]:
+    """Convert the given (default: all) tables in one transaction. Blocks writes while it runs."""
+    tables = [t for t in PARTITIONED_TABLES if tables is None or t in tables]
+    moved = {}
+
+    with engine.begin() as conn:
+        lock_partitioning(conn)
+        conn.execute(text(f"LOCK TABLE {', '.join(tables)} IN ACCESS EXCLUSIVE MODE"))
+        for table in tables:
+            if is_partitioned(conn, table):
+                continue
+            moved[table] = migrate_table(conn, table, months_ahead)
+        install_sales_children_trigger(conn)
+
+    return moved
+
+
+# ============================================================
+# 🚀 Startup
+# ============================================================
+def prepare_partitioning(engine):
+    """
+    Run at startup:
+    - sale_items.sold_at exists (partition key copied from the sale)
+    - the sales_children trigger is installed (keeps sale_items.sold_at in step)
+    - upcoming monthly partitions exist for tables already partitioned
+
+    Workers starting together run this one after the other (advisory lock);
+    everything is checked after the lock is taken.
+    """
+    with engine.begin() as conn:
+        lock_partitioning(conn)
+
+        conn.execute(text("ALTER TABLE sale_items ADD COLUMN IF NOT EXISTS sold_at TIMESTAMP WITH TIME ZONE"))
+
+        installed = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'sales_children')"
+        )).scalar()
+        if not installed:
+            install_sales_children_trigger(conn)
+
+        created = ensure_future_partitions(conn)
+
+    if created:
+        print(f"🗂️ Created partitions: {', '.join(created)}")
+
+
+# ============================================================
+# 🛠️ CLI
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Monthly partitions of sales, sale_items and payments")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate_cmd = sub.add_parser("migrate", help="convert tables to partitioned tables (offline)")
+    migrate_cmd.add_argument("--tables", nargs="*", choices=list(PARTITIONED_TABLES))
+    migrate_cmd.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+
+    ensure_cmd = sub.add_parser("ensure", help="create upcoming monthly partitions")
+    ensure_cmd.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+
+    detach_cmd = sub.add_parser("detach", help="detach months older than --before")
+    detach_cmd.add_argument("--before", required=True, help="YYYY-MM (first month to keep)")
+    detach_cmd.add_argument("--tables", nargs="*", choices=list(PARTITIONED_TABLES))
+    detach_cmd.add_argument("--drop", action="store_true", help="drop instead of keeping the detached tables")
+
+    args = parser.parse_args()
+
+    import app.main  # noqa: F401  (registers every model)
+    from app.database import engine
+
+    if args.command == "migrate":
+        for table, rows in migrate(engine, args.tables, args.months_ahead).items():
+            print(f"{table}: {rows} rows moved into monthly partitions")
+
+    elif args.command == "ensure":
+        with engine.begin() as conn:
+            lock_partitioning(conn)
+            created = ensure_future_partitions(conn, args.months_ahead)
+        print(f"created: {', '.join(created) or 'nothing'}")
+
+    elif args.command == "detach":
+        before = datetime.strptime(args.before, "%Y-%m").date()
+        with engine.begin() as conn:
+            lock_partitioning(conn)
+            for table in args.tables or list(PARTITIONED_TABLES):
+                if not is_partitioned(conn, table):
+                    continue
+                names = detach_partitions_before(conn, table, before, drop=args.drop)
+                print(f"{table}: {'dropped' if args.drop else 'detached'} {', '.join(names) or 'nothing'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# app/core/queries.py
+"""
+Prebuilt selects for the hot lookups (sale checkout, purchase entry,
+barcode scans, inventory valuation, invoice loads).
+
+Each statement is built once at import with named bind parameters and run
+with `db.execute(stmt, params)`. Compared with a fresh `db.query(...)` chain
+per call this skips rebuilding the Query/criteria objects and recomputing
+the statement cache key from scratch; the compiled SQL comes straight from
+the engine's statement cache. The tenant filter (app.database) still
+applies, it is added to these like to any other ORM select (lambda_stmt
+elements would skip it, so these are plain selects).
+
+    python benchmarks/query_construction.py     # per-call overhead, old vs new
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session, noload
+
+from app.purchase.models import Purchase, PurchaseItem
+from app.sales.models import Sale
+from app.stock.inventory.models import Inventory
+from app.stock.products.models import Product
+
+
+# ============================================================
+# 📦 Products (by id / barcode / sku)
+# ============================================================
+def _product_by(column, active_only: bool):
+    stmt = select(Product).where(
+        column == bindparam("value"),
+        Product.business_id == bindparam("business_id"),
+    )
+    if active_only:
+        stmt = stmt.where(Product.is_active == True)
+    return stmt.limit(1)
+
+
+_PRODUCT_BY = {
+    (field, active_only): _product_by(column, active_only)
+    for field, column in (("id", Product.id), ("barcode", Product.barcode), ("sku", Product.sku))
+    for active_only in (True, False)
+}
+
+
+def product_by(db: Session, field: str, value, business_id: int, active_only: bool = True) -> Optional[Product]:
+    """First product of the business whose `field` (id / barcode / sku) equals `value`."""
+    stmt = _PRODUCT_BY[(field, active_only)]
+    return db.execute(stmt, {"value": value, "business_id": business_id}).scalars().first()
+
+
+def product_by_id(db: Session, product_id: int, business_id: int, active_only: bool = True) -> Optional[Product]:
+    return product_by(db, "id", product_id, business_id, active_only)
+
+
+def product_by_barcode(db: Session, barcode: str, business_id: int, active_only: bool = True) -> Optional[Product]:
+    return product_by(db, "barcode", barcode, business_id, active_only)
+
+
+def product_by_sku(db: Session, sku: str, business_id: int, active_only: bool = True) -> Optional[Product]:
+    return product_by(db, "sku", sku, business_id, active_only)
+
+
+# ============================================================
+# 📊 Inventory row of a product
+# ============================================================
+_INVENTORY_BY_PRODUCT = select(Inventory).where(Inventory.product_id == bindparam("product_id")).limit(1)
+
+_INVENTORY_BY_PRODUCT_IN_BUSINESS = _INVENTORY_BY_PRODUCT.where(Inventory.business_id == bindparam("business_id"))
+
+
+def inventory_by_product(db: Session, product_id: int, business_id: Optional[int] = None) -> Optional[Inventory]:
+    """Inventory row of a product (any business when `business_id` is None)."""
+    if business_id is None:
+        return db.execute(_INVENTORY_BY_PRODUCT, {"product_id": product_id}).scalars().first()
+
+    return db.execute(
+        _INVENTORY_BY_PRODUCT_IN_BUSINESS, {"product_id": product_id, "business_id": business_id}
+    ).scalars().first()
+
+
+# ============================================================
+# 💰 Latest purchase cost
+# ============================================================
+_LATEST_PURCHASE_COST = (
+    select(PurchaseItem.cost_price)
+    .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+    .where(
+        PurchaseItem.product_id == bindparam("product_id"),
+        Purchase.business_id == bindparam("business_id"),
+    )
+    .order_by(PurchaseItem.id.desc())
+    .limit(1)
+)
+
+# One row per (business, product): DISTINCT ON keeps the newest purchase item
+_LATEST_PURCHASE_COSTS = (
+    select(Purchase.business_id, PurchaseItem.product_id, PurchaseItem.cost_price)
+    .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+    .where(
+        PurchaseItem.product_id.in_(bindparam("product_ids", expanding=True)),
+        Purchase.business_id.in_(bindparam("business_ids", expanding=True)),
+    )
+    .distinct(Purchase.business_id, PurchaseItem.product_id)
+    .order_by(Purchase.business_id, PurchaseItem.product_id, PurchaseItem.id.desc())
+)
+
+
+def latest_purchase_cost(db: Session, product_id: int, business_id: int) -> float:
+    """Cost price of the product's most recent purchase in the business (0.0 if never bought)."""
+    cost = db.execute(
+        _LATEST_PURCHASE_COST, {"product_id": product_id, "business_id": business_id}
+    ).scalar()
+    return cost if cost is not None else 0.0
+
+
+def latest_purchase_costs(db: Session, keys: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], float]:
+    """
+    Latest purchase cost for many (business_id, product_id) pairs in one
+    query; pairs never purchased are missing from the result.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    rows = db.execute(_LATEST_PURCHASE_COSTS, {
+        "business_ids": sorted({business_id for business_id, _ in keys}),
+        "product_ids": sorted({product_id for _, product_id in keys}),
+    })
+    return {
+        (row.business_id, row.product_id): row.cost_price
+        for row in rows
+        if (row.business_id, row.product_id) in keys
+    }
+
+
+# ============================================================
+# 🧾 Sale by invoice
+# ============================================================
+_SALE_BY_INVOICE = select(Sale).where(Sale.invoice_no == bindparam("invoice_no")).limit(1)
+
+_SALE_BY_INVOICE_IN_BUSINESS = _SALE_BY_INVOICE.where(Sale.business_id == bindparam("business_id"))
+
+
+@lru_cache(maxsize=None)
+def _sale_for_update(in_business: bool, load_payments: bool):
+    # Sale writes: row lock on the sale (payments not loaded unless asked).
+    # populate_existing: a Sale already in the session (e.g. joinedload'ed
+    # via Payment.sale) is refreshed from the locked row, not left stale.
+    # Built on first use: loader options need every mapper configured.
+    stmt = _SALE_BY_INVOICE_IN_BUSINESS if in_business else _SALE_BY_INVOICE
+    if not load_payments:
+        stmt = stmt.options(noload(Sale.payments))
+    return stmt.with_for_update().execution_options(populate_existing=True)
+
+
+def sale_by_invoice(db: Session, invoice_no: int, business_id: Optional[int] = None) -> Optional[Sale]:
+    """Sale with this invoice number (any business when `business_id` is None)."""
+    if business_id is None:
+        return db.execute(_SALE_BY_INVOICE, {"invoice_no": invoice_no}).scalars().first()
+
+    return db.execute(
+        _SALE_BY_INVOICE_IN_BUSINESS, {"invoice_no": invoice_no, "business_id": business_id}
+    ).scalars().first()
+
+
+def sale_for_update(
+    db: Session,
+    invoice_no: int,
+    business_id: Optional[int] = None,
+    load_payments: bool = False
+) -> Optional[Sale]:
+    """
+    Like sale_by_invoice, with SELECT ... FOR UPDATE (the loaded Sale is
+    refreshed from the locked row). Every write to a sale, its items or its
+    payments takes this lock first; receipt rendering (app/sales/receipts.py)
+    relies on it. Payments stay unloaded unless `load_payments`.
+    """
+    if business_id is None:
+        return db.execute(
+            _sale_for_update(False, load_payments), {"invoice_no": invoice_no}
+        ).scalars().first()
+
+    return db.execute(
+        _sale_for_update(True, load_payments), {"invoice_no": invoice_no, "business_id": business_id}
+    ).scalars().first()
@@ -0,0 +1,35 @@
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _orjson_default(obj):
+    # orjson handles datetime/date/UUID/dataclasses natively; this covers the rest
+    if isinstance(obj, BaseModel):
+        # by_alias matches what FastAPI emits for response_model (e.g. PaymentOut.sale_invoice_no)
+        return obj.model_dump(by_alias=True)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    App-wide JSON response backed by orjson.
+
+    Can also be returned directly from an endpoint with Pydantic schemas the
+    service layer already built. FastAPI then skips re-validating them against
+    `response_model` (which still drives the OpenAPI docs) and they go
+    straight to orjson.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
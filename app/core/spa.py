@@ -0,0 +1,147 @@
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, JSONResponse, Response
+
+from app.core.compression import PRECOMPRESSED_SUFFIXES, accepted_encodings
+
+
+# Small files (index.html, manifest.json, icons) are kept in memory;
+# bigger bundles are streamed from disk with a pre-computed stat.
+SPA_MEMORY_CACHE_MAX = int(os.getenv("SPA_MEMORY_CACHE_MAX", 256 * 1024))
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# Build output directories: CRA static/, Vite assets/
+ASSET_PREFIXES = ("static/", "assets/")
+
+# CRA: static/js/main.3f2a9c1b.js  |  Vite: assets/index-BxY3_a9c.js
+HASHED_ASSET_RE = re.compile(
+    r"^(%s)/.+[.-][0-9A-Za-z_]{8,}\.(chunk\.)?[A-Za-z0-9]+$"
+    % "|".join(re.escape(prefix.rstrip("/")) for prefix in ASSET_PREFIXES)
+)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 §13.1.2): W/"x" matches "x"
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@dataclass
+class SpaFile:
+    path: str
+    stat: os.stat_result
+    etag: str
+    media_type: str
+    cache_control: str
+    body: Optional[bytes] = None
+    # encoding ("br"/"gzip") -> precompressed sibling
+    variants: Dict[str, "SpaFile"] = field(default_factory=dict)
+
+
+def _load(path: str, rel_path: str, media_type: str, cache_control: str, etag_suffix: str = "") -> SpaFile:
+    stat = os.stat(path)
+    etag = hashlib.md5(f"{rel_path}-{stat.st_mtime}-{stat.st_size}".encode()).hexdigest()
+    body = None
+    if stat.st_size <= SPA_MEMORY_CACHE_MAX:
+        with open(path, "rb") as f:
+            body = f.read()
+    return SpaFile(
+        path=path,
+        stat=stat,
+        etag=f'"{etag}{etag_suffix}"',
+        media_type=media_type,
+        cache_control=cache_control,
+        body=body,
+    )
+
+
+class SpaIndex:
+    """
+    In-memory index of the React build directory, built once at startup.
+
+    - Hashed assets → long-lived immutable caching
+    - Everything else (index.html, manifest.json, ...) → ETag + 304 revalidation
+    - .br/.gz siblings are picked when the client accepts them
+    - Unknown paths fall back to index.html (client-side routing), except
+      under the asset directories (ASSET_PREFIXES) where a missing file is
+      a real 404
+
+    Rebuilding the frontend requires a restart (or calling `load()` again).
+    """
+
+    def __init__(self, build_dir: str):
+        self.build_dir = build_dir
+        self.files: Dict[str, SpaFile] = {}
+
+    def load(self) -> "SpaIndex":
+        files: Dict[str, SpaFile] = {}
+        variant_suffixes = tuple(suffix for _, suffix in PRECOMPRESSED_SUFFIXES)
+
+        if os.path.isdir(self.build_dir):
+            for root, _dirs, names in os.walk(self.build_dir):
+                for name in names:
+                    if name.endswith(variant_suffixes):
+                        continue
+
+                    path = os.path.join(root, name)
+                    rel_path = os.path.relpath(path, self.build_dir).replace(os.sep, "/")
+                    media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                    cache_control = IMMUTABLE_CACHE if HASHED_ASSET_RE.match(rel_path) else REVALIDATE_CACHE
+
+                    entry = _load(path, rel_path, media_type, cache_control)
+                    for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+                        if os.path.isfile(path + suffix):
+                            entry.variants[encoding] = _load(
+                                path + suffix, rel_path, media_type, cache_control, f"-{encoding}"
+                            )
+                    files[rel_path] = entry
+
+        self.files = files
+        return self
+
+    @property
+    def has_index(self) -> bool:
+        return "index.html" in self.files
+
+    def response(self, full_path: str, request_headers: Headers) -> Response:
+        rel_path = full_path.lstrip("/")
+        entry = self.files.get(rel_path)
+
+        if entry is None:
+            if rel_path.startswith(ASSET_PREFIXES) or not self.has_index:
+                return JSONResponse(status_code=404, content={"detail": "Frontend not built or missing."})
+            entry = self.files["index.html"]
+
+        headers = {"Cache-Control": entry.cache_control}
+
+        if entry.variants:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding"))
+            for encoding, _ in PRECOMPRESSED_SUFFIXES:
+                if encoding in accepted and encoding in entry.variants:
+                    entry = entry.variants[encoding]
+                    headers["Content-Encoding"] = encoding
+                    break
+
+        headers["ETag"] = entry.etag
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, entry.etag):
+            headers.pop("Content-Encoding", None)
+            return Response(status_code=304, headers=headers)
+
+        if entry.body is not None:
+            return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+        return FileResponse(entry.path, media_type=entry.media_type, headers=headers, stat_result=entry.stat)
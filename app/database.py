@@ -1,11 +1,14 @@
 import os
+import threading
+import time
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Dict, Optional
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import Integer, bindparam, create_engine, event, text
 from sqlalchemy.orm import sessionmaker, declarative_base, Session, with_loader_criteria
-from contextvars import ContextVar
+
+from app.core.tenant import get_current_business, set_current_business  # noqa: F401  (re-exported)
 
 # ============================================================
 # 🔐 Load environment variables
@@ -23,6 +26,12 @@ print(f"🔄 Loaded environment from: {env_path}")
 SQLALCHEMY_DATABASE_URL = os.getenv("DB_URL3")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
 
+# Optional read-only replica for reports (unset → everything uses the primary)
+READ_REPLICA_URL = os.getenv("DB_READ_URL")
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", 1))
+REPLICA_CONNECT_TIMEOUT = int(os.getenv("REPLICA_CONNECT_TIMEOUT", 2))
+
 if not SQLALCHEMY_DATABASE_URL:
     raise ValueError("❌ DB_URL3 environment variable is not set!")
 
@@ -50,6 +59,19 @@ engine = create_engine(
     connect_args=connect_args,
 )
 
+read_engine = None
+if READ_REPLICA_URL:
+    print(f"🔍 Using read replica host: {READ_REPLICA_URL.split('@')[-1]}")
+    read_engine = create_engine(
+        READ_REPLICA_URL,
+        echo=False,
+        future=True,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        # An unreachable replica fails fast (lag probe, pre-ping) → primary
+        connect_args={**connect_args, "connect_timeout": REPLICA_CONNECT_TIMEOUT},
+    )
+
 # ============================================================
 # ⚙️ SessionLocal
 # ============================================================
@@ -59,51 +81,176 @@ SessionLocal = sessionmaker(
     autocommit=False,
 )
 
+# Sessions on the replica are flagged read_only (services that would write,
+# e.g. P&L snapshots, check db.info and use a primary session instead)
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    autoflush=False,
+    autocommit=False,
+    info={"read_only": True},
+)
+
 Base = declarative_base()
 
 # ============================================================
-# 🏢 Tenant context
+# 🗂️ Indexes added after a table was created
 # ============================================================
-_current_business_id: ContextVar[Optional[int]] = ContextVar(
-    "current_business_id", default=None
+# Indexes since replaced on the models by a wider one (same leading columns)
+REPLACED_INDEXES = (
+    "idx_sales_business_soldat",      # → idx_sales_business_soldat_id
+    "idx_expense_business_date",      # → idx_expense_business_date_id
 )
 
-def set_current_business(business_id: Optional[int]):
-    _current_business_id.set(business_id)
 
-def get_current_business() -> Optional[int]:
-    return _current_business_id.get()
+def create_missing_indexes():
+    """
+    create_all() skips tables that already exist, so indexes added to a model
+    later never reach existing databases. Create any that are missing, and
+    drop the ones they replaced (extra write cost, never picked).
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    with engine.begin() as conn:
+        for name in REPLACED_INDEXES:
+            conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
 
 # ============================================================
 # 🛡️ Tenant filter
 # ============================================================
+# The request's business (app.core.tenant, set by TenantMiddleware) is read
+# when the statement executes, through one bound parameter. The criteria are
+# therefore the same SQL for every tenant: built once per model, and scoped
+# statements are compiled once and then served from the statement cache.
+TENANT_BUSINESS_ID = bindparam("tenant_business_id", callable_=get_current_business, type_=Integer)
+
+_tenant_criteria: Dict[object, object] = {}
+
+
+def _build_tenant_criteria():
+    """Mapper → criteria option, for businesses (by id) and every model with a business_id."""
+    for mapper in Base.registry.mappers:
+        if mapper.local_table.name == "businesses":
+            _tenant_criteria[mapper] = with_loader_criteria(
+                mapper.class_,
+                lambda cls: cls.id == TENANT_BUSINESS_ID,
+                include_aliases=True,
+                track_closure_variables=False,
+            )
+        elif "business_id" in mapper.columns:
+            _tenant_criteria[mapper] = with_loader_criteria(
+                mapper.class_,
+                lambda cls: cls.business_id == TENANT_BUSINESS_ID,
+                include_aliases=True,
+                track_closure_variables=False,
+            )
+
+
 @event.listens_for(Session, "do_orm_execute")
 def _add_tenant_filter(execute_state):
-    business_id = get_current_business()
+    """
+    Scope ORM selects of a business user to their business.
 
-    # Super admin → no filter
-    if business_id is None:
+    - Super admin / no request (startup, background jobs) → no filter
+    - Only the statement's top-level entities are scoped; lazy and
+      attribute loads follow rows that were already scoped
+    - `.execution_options(all_tenants=True)` opts out (global lookups,
+      e.g. username uniqueness)
+    """
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or get_current_business() is None
+        or execute_state.execution_options.get("all_tenants")
+    ):
         return
 
-    if not execute_state.is_select:
-        return
+    if not _tenant_criteria:
+        _build_tenant_criteria()
+
+    options = [
+        _tenant_criteria[mapper]
+        for mapper in execute_state.all_mappers
+        if mapper in _tenant_criteria
+    ]
+    if options:
+        execute_state.statement = execute_state.statement.options(*options)
+
+# ============================================================
+# 📖 Read replica routing
+# ============================================================
+# Last write per business in this worker (monotonic time); None = any business
+_last_write_at: Dict[Optional[int], float] = {}
+_replica_lag = {"checked_at": float("-inf"), "seconds": float("inf")}
+_replica_lag_lock = threading.Lock()
+
+
+@event.listens_for(Session, "after_flush")
+def _remember_writes(session, flush_context):
+    now = time.monotonic()
+    # The request's business (set by TenantMiddleware) covers rows without
+    # a business_id of their own (sale items, payments)
+    businesses = {get_current_business(), None}
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        businesses.add(getattr(instance, "business_id", None))
+    for business_id in businesses:
+        _last_write_at[business_id] = now
+
+
+def replica_lag() -> float:
+    """
+    Replication lag of the replica in seconds (inf if unknown / unreachable),
+    checked at most every REPLICA_LAG_CHECK_SECONDS. One caller probes the
+    replica; the others don't wait for it and get the last known value.
+    """
+    if time.monotonic() - _replica_lag["checked_at"] < REPLICA_LAG_CHECK_SECONDS:
+        return _replica_lag["seconds"]
+
+    if not _replica_lag_lock.acquire(blocking=False):
+        return _replica_lag["seconds"]
 
     try:
-        from app.vendor import models as vendor_models
-        from app.business import models as business_models
-    except ImportError:
-        return
+        if time.monotonic() - _replica_lag["checked_at"] < REPLICA_LAG_CHECK_SECONDS:
+            return _replica_lag["seconds"]   # refreshed while we got here
 
-    tenant_models = [vendor_models.Vendor, business_models.Business]
+        try:
+            with read_engine.connect() as conn:
+                lag = conn.execute(text("""
+                    SELECT CASE
+                        WHEN NOT pg_is_in_recovery() THEN 0
+                        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+                    END
+                """)).scalar()
+            seconds = float(lag) if lag is not None else float("inf")
+        except Exception as e:
+            print(f"⚠️ Read replica unavailable, using primary: {e}")
+            seconds = float("inf")
 
-    for model in tenant_models:
-        execute_state.statement = execute_state.statement.options(
-            with_loader_criteria(
-                model,
-                lambda cls: cls.business_id == business_id,
-                include_aliases=True,
-            )
-        )
+        _replica_lag["seconds"] = seconds
+        _replica_lag["checked_at"] = time.monotonic()
+        return seconds
+    finally:
+        _replica_lag_lock.release()
+
+
+def use_replica(business_id: Optional[int]) -> bool:
+    """
+    Route a read to the replica unless:
+    - no replica is configured, or it lags more than REPLICA_MAX_LAG_SECONDS
+    - this business (any business, for super admins) wrote within the last
+      REPLICA_MAX_LAG_SECONDS in this worker (read-your-writes)
+    """
+    if read_engine is None:
+        return False
+
+    last_write = _last_write_at.get(business_id, float("-inf"))
+    if time.monotonic() - last_write < REPLICA_MAX_LAG_SECONDS:
+        return False
+
+    return replica_lag() <= REPLICA_MAX_LAG_SECONDS
 
 # ============================================================
 # 🔄 FastAPI dependency
@@ -114,3 +261,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session for read-only reports: the replica when it is fresh enough, else the primary."""
+    db = ReadSessionLocal() if use_replica(get_current_business()) else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -17,6 +17,7 @@ from app.core.timezone import now_wat, to_wat
 
 from app.database import get_db
 from app.license import schemas, services, models as license_models
+from app.license.state import license_state
 from app.business.models import Business
 from app.superadmin.passwords import verify_password
 from app.users.auth import get_current_user
@@ -31,7 +32,6 @@ logger.add("app.log", rotation="500 MB", level="DEBUG")
 
 # Env config
 ADMIN_LICENSE_PASSWORD_HASH = os.getenv("ADMIN_LICENSE_PASSWORD_HASH")
-LICENSE_FILE = "license_status.json"
 
 
 @router.post("/generate", response_model=schemas.LicenseResponse, status_code=201)
@@ -75,7 +75,7 @@ def generate_license_key(
     services.save_license_file({
         "valid": True,
         "expires_on": new_license.expiration_date,
-    })
+    }, business_id)
 
     return new_license
 
@@ -95,7 +95,7 @@ def verify_license(
     services.save_license_file({
         "valid": result["valid"],
         "expires_on": result.get("expires_on"),
-    })
+    }, business_id)
 
     if not result["valid"]:
         raise HTTPException(400, result["message"])
@@ -134,15 +134,7 @@ def check_license_status(
     # -----------------------------
     # GET LICENSE
     # -----------------------------
-    license_record = (
-        db.query(license_models.LicenseKey)
-        .filter(
-            license_models.LicenseKey.business_id == current_user.business_id,
-            license_models.LicenseKey.is_active == True,
-        )
-        .order_by(license_models.LicenseKey.expiration_date.desc())
-        .first()
-    )
+    license_record = license_state.get(db, current_user.business_id)
 
     if not license_record:
         return {
@@ -157,7 +149,7 @@ def check_license_status(
     # TIME (WAT SAFE)
     # -----------------------------
     now = now_wat()
-    expires_on = to_wat(license_record.expiration_date)
+    expires_on = to_wat(license_record.expires_at)
 
     # -----------------------------
     # EXPIRED
@@ -198,7 +190,7 @@ def check_license_status(
         "days_left": days_left
     }
 
-    services.save_license_file(data)
+    services.save_license_file(data, current_user.business_id)
 
     return data
 
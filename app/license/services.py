@@ -1,47 +1,27 @@
 # app/license/service.py
-import json
-import os
 from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
 from app.license import schemas, models
+from app.license.state import license_state
+from app.license.snapshots import license_snapshots
 from loguru import logger
 
 
 
-LICENSE_FILE = "license_status.json"
+def save_license_file(data: dict, business_id: Optional[int] = None):
+    """
+    Save license status to the local JSON file (offline fallback).
+    Write-behind: updates memory now, the file is written off the request thread.
+    """
+    license_snapshots.save(data, business_id)
 
 
-def save_license_file(data: dict):
-    """Save license status to local JSON file (offline fallback)."""
-    safe_data = {}
-    for k, v in data.items():
-        if isinstance(v, datetime):
-            safe_data[k] = v.isoformat()
-        else:
-            safe_data[k] = v
-
-    try:
-        with open(LICENSE_FILE, "w") as f:
-            json.dump(safe_data, f)
-    except Exception as e:
-        logger.error(f"Failed to save license file: {e}")
-
-
-def load_license_file():
-    """Load license status from local JSON file."""
-    if not os.path.exists(LICENSE_FILE):
-        return None
-    try:
-        with open(LICENSE_FILE, "r") as f:
-            data = json.load(f)
-        if "expires_on" in data and data["expires_on"]:
-            data["expires_on"] = datetime.fromisoformat(data["expires_on"])
-        return data
-    except Exception as e:
-        logger.error(f"Failed to load license file: {e}")
-        return None
+def load_license_file(business_id: Optional[int] = None):
+    """Load license status for a business (served from memory after first read)."""
+    return license_snapshots.load(business_id)
 
 
 def create_license_key(
@@ -60,6 +40,9 @@ def create_license_key(
     db.commit()
     db.refresh(new_license)
 
+    # Keep the in-memory license state in step with the DB
+    license_state.refresh_business(db, new_license.business_id)
+
     return schemas.LicenseResponse.from_orm(new_license)
 
 
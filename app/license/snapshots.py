@@ -0,0 +1,189 @@
+# app/license/snapshots.py
+"""
+Write-behind store for the offline license snapshot (license_status.json).
+
+- One snapshot per business, kept in memory
+- Request handlers only update memory; a background thread writes the file
+- Bursts of updates are coalesced into one write per LICENSE_FILE_FLUSH_SECONDS
+- Writes are atomic (temp file + os.replace), and merged with what other
+  workers already wrote (newest `updated_at` per business wins); the
+  read → merge → replace runs under an flock on `<file>.lock`, so two
+  workers flushing at once can't drop each other's businesses
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:   # Windows: no flock (single worker there)
+    fcntl = None
+
+
+LICENSE_FILE = os.getenv("LICENSE_FILE", "license_status.json")
+LICENSE_FILE_FLUSH_SECONDS = float(os.getenv("LICENSE_FILE_FLUSH_SECONDS", 2))
+
+GLOBAL_KEY = "global"   # snapshots not tied to a business
+
+
+def _key(business_id: Optional[int]) -> str:
+    return str(business_id) if business_id is not None else GLOBAL_KEY
+
+
+def _to_json_safe(data: dict) -> dict:
+    return {k: v.isoformat() if isinstance(v, datetime) else v for k, v in data.items()}
+
+
+def _from_json_safe(data: dict) -> dict:
+    data = dict(data)
+    if data.get("expires_on"):
+        data["expires_on"] = datetime.fromisoformat(data["expires_on"])
+    return data
+
+
+class LicenseSnapshotStore:
+
+    def __init__(self, path: str = LICENSE_FILE, flush_interval: float = LICENSE_FILE_FLUSH_SECONDS):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._snapshots: Dict[str, dict] = {}
+        self._dirty = False
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+    # ------------------- DISK -------------------
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive inter-process lock on the sidecar `<file>.lock`."""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_file(self) -> Dict[str, dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load license file: {e}")
+            return {}
+
+        if "businesses" not in data:
+            # Legacy single-snapshot file
+            return {GLOBAL_KEY: data}
+        return data["businesses"]
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                on_disk = self._read_file()
+                on_disk.update(self._snapshots)
+                self._snapshots = on_disk
+                self._loaded = True
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            ours = dict(self._snapshots)
+            self._dirty = False
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            with self._file_lock():
+                # Merge with whatever other workers wrote meanwhile
+                merged = self._read_file()
+                for key, snapshot in ours.items():
+                    current = merged.get(key)
+                    if not current or current.get("updated_at", 0) <= snapshot.get("updated_at", 0):
+                        merged[key] = snapshot
+
+                fd, tmp_path = tempfile.mkstemp(prefix=".license_status.", dir=directory)
+                with os.fdopen(fd, "w") as f:
+                    json.dump({"businesses": merged}, f)
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save license file: {e}")
+            with self._lock:
+                self._dirty = True
+            return
+
+        with self._lock:
+            for key, snapshot in merged.items():
+                mine = self._snapshots.get(key)
+                if not mine or mine.get("updated_at", 0) < snapshot.get("updated_at", 0):
+                    self._snapshots[key] = snapshot
+
+    # ------------------- WRITER THREAD -------------------
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            # Coalesce: anything saved during this window goes out in one write
+            self._stop.wait(self.flush_interval)
+            self.flush()
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            with self._lock:
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer = threading.Thread(
+                        target=self._run, name="license-snapshot-writer", daemon=True
+                    )
+                    self._writer.start()
+
+    def close(self):
+        """Stop the writer and flush pending snapshots (app shutdown)."""
+        self._stop.set()
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        self.flush()
+
+    # ------------------- PUBLIC API -------------------
+    def save(self, data: dict, business_id: Optional[int] = None):
+        self._ensure_loaded()
+        snapshot = _to_json_safe(data)
+        key = _key(business_id)
+
+        with self._lock:
+            current = self._snapshots.get(key)
+            if current and {k: v for k, v in current.items() if k != "updated_at"} == snapshot:
+                return  # unchanged → nothing to write
+            snapshot["updated_at"] = time.time()
+            self._snapshots[key] = snapshot
+            self._dirty = True
+
+        self._ensure_writer()
+        self._wake.set()
+
+    def load(self, business_id: Optional[int] = None) -> Optional[dict]:
+        self._ensure_loaded()
+        snapshot = self._snapshots.get(_key(business_id))
+        if snapshot is None:
+            return None
+        data = _from_json_safe(snapshot)
+        data.pop("updated_at", None)
+        return data
+
+
+license_snapshots = LicenseSnapshotStore()
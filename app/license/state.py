@@ -0,0 +1,139 @@
+# app/license/state.py
+"""
+In-memory license state per business.
+
+Holds the latest *active* license of every business (what login, /users/me,
+/license/check and Business.is_license_active used to query on every call):
+
+- Loaded in bulk at startup (one DISTINCT ON query)
+- Refreshed for a business whenever a license is created for it
+- Fully reloaded on a timer (LICENSE_CACHE_REFRESH_SECONDS) so licenses
+  issued through another worker show up without a restart
+- Validity is evaluated against `expires_at` on every read, so an entry
+  expires exactly at its expiration_date with no eviction needed
+
+A business with no valid license in the cache is re-checked against the DB
+at most once per LICENSE_CACHE_RECHECK_SECONDS, so a renewal made on another
+worker is picked up quickly without valid tenants ever touching the DB.
+"""
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.license.models import LicenseKey
+
+
+LICENSE_CACHE_REFRESH_SECONDS = int(os.getenv("LICENSE_CACHE_REFRESH_SECONDS", 300))
+LICENSE_CACHE_RECHECK_SECONDS = int(os.getenv("LICENSE_CACHE_RECHECK_SECONDS", 30))
+
+
+@dataclass(frozen=True)
+class LicenseState:
+    license_id: int
+    key: str
+    expires_at: datetime
+    is_active: bool = True
+
+    def is_valid(self, now: Optional[datetime] = None) -> bool:
+        return self.expires_at >= (now or datetime.now(timezone.utc))
+
+
+def _latest_active_query(db: Session):
+    return (
+        db.query(
+            LicenseKey.business_id,
+            LicenseKey.id,
+            LicenseKey.key,
+            LicenseKey.expiration_date,
+        )
+        .filter(LicenseKey.is_active == True)
+        .distinct(LicenseKey.business_id)
+        .order_by(LicenseKey.business_id, LicenseKey.expiration_date.desc())
+    )
+
+
+def _to_state(row) -> LicenseState:
+    return LicenseState(license_id=row.id, key=row.key, expires_at=row.expiration_date)
+
+
+class LicenseStateCache:
+
+    def __init__(self):
+        self._states: Dict[int, Optional[LicenseState]] = {}
+        self._checked_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    # ------------------- LOADING -------------------
+    def load_all(self, db: Session):
+        states = {row.business_id: _to_state(row) for row in _latest_active_query(db).all()}
+        with self._lock:
+            self._states = states
+            self._checked_at = {}
+            self.loaded = True
+        logger.info(f"License state cache loaded for {len(states)} business(es)")
+
+    def reload(self):
+        db = SessionLocal()
+        try:
+            self.load_all(db)
+        finally:
+            db.close()
+
+    def refresh_business(self, db: Session, business_id: int) -> Optional[LicenseState]:
+        row = _latest_active_query(db).filter(LicenseKey.business_id == business_id).first()
+        state = _to_state(row) if row else None
+        with self._lock:
+            self._states[business_id] = state
+            self._checked_at[business_id] = time.monotonic()
+        return state
+
+    def forget(self, business_id: int):
+        with self._lock:
+            self._states.pop(business_id, None)
+            self._checked_at.pop(business_id, None)
+
+    # ------------------- READS -------------------
+    def get(self, db: Session, business_id: int) -> Optional[LicenseState]:
+        """Latest active license of a business (valid or expired), or None."""
+        state = self._states.get(business_id)
+
+        if state is not None and state.is_valid():
+            return state
+
+        # Unknown, missing or expired → maybe renewed elsewhere; re-check, rate-limited
+        checked_at = self._checked_at.get(business_id)
+        if checked_at is None or time.monotonic() - checked_at >= LICENSE_CACHE_RECHECK_SECONDS:
+            return self.refresh_business(db, business_id)
+
+        return state
+
+    def peek(self, business_id: int) -> Optional[LicenseState]:
+        """Cache-only read (no DB fallback), for bulk listings."""
+        return self._states.get(business_id)
+
+    def is_active(self, db: Session, business_id: int) -> bool:
+        state = self.get(db, business_id)
+        return state is not None and state.is_valid()
+
+
+license_state = LicenseStateCache()
+
+
+async def run_refresh_loop(interval: int = LICENSE_CACHE_REFRESH_SECONDS):
+    """Background task: periodic full reload (started from the app lifespan)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(license_state.reload)
+        except Exception as e:
+            logger.error(f"License state refresh failed: {e}")
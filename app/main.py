@@ -1,9 +1,9 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.routing import APIRoute
-from app.database import engine, Base
+from app.database import engine, Base, create_missing_indexes
 
 from app.superadmin.router import router as superadmin_router
 from app.business.router import router as business_router
@@ -30,6 +30,13 @@ from backup.restore import router as restore_router  # <-- import restore router
 
 
 from app.core.tenant_middleware import TenantMiddleware
+from app.users.hashing import shutdown_executor as shutdown_hashing_executor
+from app.core.responses import FastJSONResponse
+from app.core.compression import CompressionMiddleware
+from app.core.partitions import prepare_partitioning
+from app.core.spa import SpaIndex
+from app.license.state import license_state, run_refresh_loop as run_license_refresh_loop
+from app.license.snapshots import license_snapshots
 
 app = FastAPI()
 
@@ -40,6 +47,7 @@ app.add_middleware(TenantMiddleware)
 
 
 import uvicorn
+import asyncio
 import os
 import sys
 import pytz
@@ -89,7 +97,17 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 async def lifespan(app: FastAPI):
     print("Application startup")
     Base.metadata.create_all(bind=engine)
+    create_missing_indexes()
+    prepare_partitioning(engine)
+
+    # License state: bulk load once, then refresh on a timer
+    license_state.reload()
+    license_refresh_task = asyncio.create_task(run_license_refresh_loop())
+
     yield
+    license_refresh_task.cancel()
+    license_snapshots.close()
+    shutdown_hashing_executor()
     print("Application shutdown")
 
 # Corrected single FastAPI instance
@@ -97,7 +115,8 @@ app = FastAPI(
     title="SHopMan App",
     description="An API for managing shop operations including Purchase, Sales, Stock, and Payments.",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Tenant middleware must be added BEFORE routers
@@ -115,6 +134,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# br/gzip for JSON + SPA assets (COMPRESSION_MIN_SIZE, GZIP_LEVEL, BROTLI_QUALITY)
+app.add_middleware(CompressionMiddleware)
+
 
 
 app.mount("/files", StaticFiles(directory="uploads"), name="files")
@@ -124,15 +146,14 @@ app.mount("/files", StaticFiles(directory="uploads"), name="files")
 react_build_dir = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..", "react-frontend", "build")
 )
-react_static_dir = os.path.join(react_build_dir, "static")
 
-# ✅ Only mount if directory exists
-# Serve entire React build dir
-if os.path.isdir(react_build_dir):
-    app.mount("/static", StaticFiles(directory=react_static_dir), name="static")
-    print(f"[INFO] Serving static files from {react_static_dir}")
+# Index the build once; serve_spa answers from memory (no per-request stat)
+spa_index = SpaIndex(react_build_dir).load()
+
+if spa_index.has_index:
+    print(f"[INFO] Serving {len(spa_index.files)} frontend files from {react_build_dir}")
 else:
-    print(f"[WARNING] React static directory not found: {react_static_dir} — skipping static mount")
+    print(f"[WARNING] React build not found: {react_build_dir} — frontend disabled")
 
 
 # Routers
@@ -174,15 +195,6 @@ def debug_ping():
     return {"status": "ok"}
 
 @app.get("/{full_path:path}")
-async def serve_spa(full_path: str):
-    index_file = os.path.join(react_build_dir, "index.html")
-    request_file = os.path.join(react_build_dir, full_path)
-
-    # If the file exists in build (manifest.json, favicon.ico, etc.), serve it
-    if os.path.isfile(request_file):
-        return FileResponse(request_file)
-
-    # Otherwise serve React index.html (SPA fallback)
-    if os.path.isfile(index_file):
-        return FileResponse(index_file)
-    return JSONResponse(status_code=404, content={"detail": "Frontend not built or missing."})
\ No newline at end of file
+async def serve_spa(full_path: str, request: Request):
+    # Build files (static/*, manifest.json, favicon.ico, ...) or index.html (SPA fallback)
+    return spa_index.response(full_path, request.headers)
\ No newline at end of file
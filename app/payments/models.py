@@ -101,4 +101,12 @@ class Payment(Base):
             "business_id",
             "status"
         ),
+
+        # Payment list (newest first, keyset on created_at + id)
+        Index(
+            "idx_payment_business_created",
+            "business_id",
+            "created_at",
+            "id"
+        ),
     )
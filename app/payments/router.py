@@ -11,6 +11,7 @@ from app.users.auth import get_current_user
 from app.users.schemas import UserDisplaySchema
 
 from app.users.permissions import role_required
+from app.core.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -52,11 +53,37 @@ def create_payment_for_sale(
     return created
 
 
+@router.post(
+    "/bulk",
+    response_model=schemas.PaymentBulkResponse,
+    status_code=status.HTTP_200_OK
+)
+def bulk_create_payments(
+    payload: schemas.PaymentBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: UserDisplaySchema = Depends(
+        role_required(["user", "manager", "admin", "super_admin"])
+    )
+):
+    """
+    Post many payments at once (e.g. end-of-day POS/transfer reconciliation).
+
+    - Same rules as single payments (tenant, bank, over-payment), per entry
+    - Valid entries are saved in one transaction; invalid ones are reported
+    - `results[i]` corresponds to `payments[i]` in the request
+    """
+    return FastJSONResponse(service.bulk_create_payments(
+        db=db,
+        entries=payload.payments,
+        current_user=current_user
+    ))
+
 
 
-@router.get("/", response_model=List[schemas.PaymentOut])
+
+@router.get("/", response_model=schemas.PaymentListResponse)
 def list_payments(
-    invoice_no: Optional[str] = Query(None, description="Filter by invoice number (partial match)"),
+    invoice_no: Optional[int] = Query(None, description="Filter by exact invoice number"),
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     status: Optional[str] = Query(None, description="Filter by status: pending, part_paid, completed"),
@@ -66,6 +93,8 @@ def list_payments(
         None,
         description="Filter by specific business (super admin only)"
     ),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user: UserDisplaySchema = Depends(
         role_required(["user", "manager", "admin", "super_admin"])
@@ -76,8 +105,11 @@ def list_payments(
     
     - Regular users → only payments from their own business
     - Super admin → all payments or filtered by ?business_id=
+    - Newest first; follow `next_cursor` for older pages
+    - `summary` totals cover all matching payments, per method and per bank
     """
-    return service.list_payments(
+    # Service already builds PaymentOut objects → skip response_model re-validation
+    return FastJSONResponse(service.list_payments(
         db=db,
         current_user=current_user,
         invoice_no=invoice_no,
@@ -86,8 +118,10 @@ def list_payments(
         status=status,
         bank_id=bank_id,
         payment_method=payment_method,
-        business_id=business_id
-    )
+        business_id=business_id,
+        cursor=cursor,
+        limit=limit
+    ))
 
 
 
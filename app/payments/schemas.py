@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import Field
 import pytz
@@ -47,6 +47,60 @@ class PaymentOut(PaymentBase):
         populate_by_name = True
 
 
+# -------------------------
+# List Response (page + totals)
+# -------------------------
+class PaymentMethodTotal(BaseModel):
+    payment_method: Optional[str] = None
+    total_amount: float
+    count: int
+
+
+class PaymentBankTotal(BaseModel):
+    bank_id: Optional[int] = None     # None → payments without a bank (cash)
+    bank_name: Optional[str] = None
+    total_amount: float
+    count: int
+
+
+class PaymentSummary(BaseModel):
+    total_amount: float
+    count: int
+    by_method: List[PaymentMethodTotal] = Field(default_factory=list)
+    by_bank: List[PaymentBankTotal] = Field(default_factory=list)
+
+
+class PaymentListResponse(BaseModel):
+    payments: List[PaymentOut]
+    summary: PaymentSummary
+    next_cursor: Optional[str] = None   # pass back as ?cursor= for the next page
+
+
+# -------------------------
+# Bulk Posting (end-of-day reconciliation)
+# -------------------------
+class PaymentBulkEntry(PaymentBase):
+    invoice_no: int
+
+
+class PaymentBulkCreate(BaseModel):
+    payments: List[PaymentBulkEntry] = Field(..., min_length=1, max_length=1000)
+
+
+class PaymentBulkResult(BaseModel):
+    index: int                          # position in the request list
+    invoice_no: int
+    success: bool
+    payment: Optional[PaymentOut] = None
+    error: Optional[str] = None
+
+
+class PaymentBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[PaymentBulkResult]
+
+
 
 # -------------------------
 # Update Payment Schema
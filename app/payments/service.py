@@ -1,11 +1,12 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, noload
 from fastapi import HTTPException
 
-from sqlalchemy import cast, String
+from sqlalchemy import tuple_
 import pytz
 
 from . import models, schemas
 from app.sales import models as sales_models
+from app.core import queries
 from app.bank import models as bank_models
 from app.users import models as user_models
 import uuid
@@ -14,7 +15,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy import text
 
 
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
 from typing import Optional, List
 
 from datetime import date
@@ -26,10 +27,36 @@ from app.users.auth import get_current_user
 from app.users.schemas import UserDisplaySchema
 
 from app.users.permissions import role_required
+from app.core.pagination import keyset_paginate
 
 
 
 
+# -------------------------
+# Sale lock + paid total
+# -------------------------
+def _lock_sale(db: Session, invoice_no: int, business_id: Optional[int] = None):
+    """
+    Load the sale with SELECT ... FOR UPDATE.
+
+    Every payment write for the same invoice queues on this row lock, so the
+    paid total read afterwards already includes any payment committed by a
+    concurrent request → two cashiers can't both pass the overpayment check.
+    The lock is released by the commit/rollback that ends the request.
+    """
+    return queries.sale_for_update(db, invoice_no, business_id)
+
+
+def _paid_total(db: Session, invoice_no: int, exclude_payment_id: Optional[int] = None) -> float:
+    """SUM of payments on a sale, read in SQL (call after _lock_sale)."""
+    query = db.query(func.coalesce(func.sum(models.Payment.amount_paid), 0)).filter(
+        models.Payment.sale_invoice_no == invoice_no
+    )
+    if exclude_payment_id is not None:
+        query = query.filter(models.Payment.id != exclude_payment_id)
+    return float(query.scalar() or 0)
+
+
 # -------------------------
 # Create Payment
 # -------------------------
@@ -45,30 +72,27 @@ def create_payment(
     Create a payment record with full tenant isolation.
     Validates sale, prevents overpayment, generates reference, updates status.
     """
-    # 1. Fetch sale + enforce tenant isolation
-    sale_query = db.query(sales_models.Sale)
-
+    # 1. Fetch + lock sale, enforce tenant isolation
+    business_filter = None
     if "super_admin" not in current_user.roles:
         if not current_user.business_id:
             raise HTTPException(
                 status_code=403,
                 detail="Current user does not belong to any business"
             )
-        sale_query = sale_query.filter(
-            sales_models.Sale.business_id == current_user.business_id
-        )
+        business_filter = current_user.business_id
 
-    sale = sale_query.filter(
-        sales_models.Sale.invoice_no == invoice_no
-    ).first()
+    sale = _lock_sale(db, invoice_no, business_filter)
 
     if not sale:
+        db.rollback()
         return None
 
     target_business_id = sale.business_id
 
     # 2. Validate payment method & bank
     if payment.payment_method != "cash" and not payment.bank_id:
+        db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Bank account is required for non-cash payments (transfer/pos)"
@@ -82,23 +106,26 @@ def create_payment(
             bank_models.Bank.business_id == target_business_id
         ).first()
         if not bank:
+            db.rollback()
             raise HTTPException(
                 status_code=404,
                 detail=f"Bank ID {payment.bank_id} not found or does not belong to this business"
             )
         bank_name = bank.name  # safe – we already loaded it
 
-    # 3. Calculate current paid amount & remaining balance
-    current_paid = sum(float(p.amount_paid or 0) for p in sale.payments)
+    # 3. Calculate current paid amount & remaining balance (under the sale lock)
+    current_paid = _paid_total(db, invoice_no)
     remaining_balance = float(sale.total_amount or 0) - current_paid
 
     if payment.amount_paid <= 0:
+        db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Payment amount must be greater than zero"
         )
 
     if payment.amount_paid > remaining_balance + 0.01:  # small tolerance for float
+        db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Payment ({payment.amount_paid}) exceeds remaining balance ({remaining_balance:.2f})"
@@ -179,77 +206,346 @@ from zoneinfo import ZoneInfo
 
 LAGOS_TZ = ZoneInfo("Africa/Lagos")
 
-def list_payments(
+
+# -------------------------
+# Bulk Create Payments
+# -------------------------
+def bulk_create_payments(
     db: Session,
+    entries: List[schemas.PaymentBulkEntry],
+    current_user: UserDisplaySchema
+) -> schemas.PaymentBulkResponse:
+    """
+    Post many payments in one transaction (end-of-day reconciliation).
+
+    - Sales are loaded and locked (FOR UPDATE) with one IN query, paid totals
+      with one GROUP BY, banks with one IN query
+    - Entries are validated in request order against a running paid total,
+      so several entries for the same invoice can't overpay it together
+    - Valid entries are inserted and committed once; invalid ones are
+      reported per entry and don't block the rest
+    """
+    Sale = sales_models.Sale
+    Payment = models.Payment
+    Bank = bank_models.Bank
+
+    business_filter = None
+    if "super_admin" not in current_user.roles:
+        if not current_user.business_id:
+            raise HTTPException(
+                status_code=403,
+                detail="Current user does not belong to any business"
+            )
+        business_filter = current_user.business_id
+
+    invoice_nos = sorted({e.invoice_no for e in entries})
+    bank_ids = {e.bank_id for e in entries if e.bank_id}
+
+    # 1. Sales (locked in invoice order → no deadlock between batches)
+    sale_query = (
+        db.query(Sale)
+        .options(noload(Sale.payments))
+        .filter(Sale.invoice_no.in_(invoice_nos))
+    )
+    if business_filter is not None:
+        sale_query = sale_query.filter(Sale.business_id == business_filter)
+    sales = {
+        s.invoice_no: s
+        for s in sale_query.order_by(Sale.invoice_no).with_for_update().all()
+    }
+
+    # 2. Paid totals per sale
+    paid = {
+        invoice_no: float(total or 0)
+        for invoice_no, total in (
+            db.query(Payment.sale_invoice_no, func.sum(Payment.amount_paid))
+            .filter(Payment.sale_invoice_no.in_(list(sales)))
+            .group_by(Payment.sale_invoice_no)
+            .all()
+        )
+    } if sales else {}
+
+    # 3. Banks
+    banks = {
+        b.id: b
+        for b in db.query(Bank).filter(Bank.id.in_(bank_ids)).all()
+    } if bank_ids else {}
+
+    # 4. Validate in order
+    results: List[schemas.PaymentBulkResult] = []
+    pending = []  # (result index, payment, sale, bank_name)
+
+    for index, entry in enumerate(entries):
+        sale = sales.get(entry.invoice_no)
+        bank = banks.get(entry.bank_id) if entry.bank_id else None
+        error = None
+
+        if not sale:
+            error = f"Sale with invoice_no {entry.invoice_no} not found or does not belong to your business"
+        elif entry.amount_paid <= 0:
+            error = "Payment amount must be greater than zero"
+        elif entry.payment_method != "cash" and not entry.bank_id:
+            error = "Bank account is required for non-cash payments (transfer/pos)"
+        elif entry.bank_id and (not bank or bank.business_id != sale.business_id):
+            error = f"Bank ID {entry.bank_id} not found or does not belong to this business"
+        else:
+            current_paid = paid.get(entry.invoice_no, 0.0)
+            remaining_balance = float(sale.total_amount or 0) - current_paid
+            if entry.amount_paid > remaining_balance + 0.01:  # small tolerance for float
+                error = f"Payment ({entry.amount_paid}) exceeds remaining balance ({remaining_balance:.2f})"
+
+        if error:
+            results.append(schemas.PaymentBulkResult(
+                index=index, invoice_no=entry.invoice_no, success=False, error=error
+            ))
+            continue
+
+        new_balance_due = remaining_balance - entry.amount_paid
+        if new_balance_due <= 0:
+            new_status = "completed"
+        elif current_paid == 0:
+            new_status = "pending"
+        else:
+            new_status = "part_paid"
+        paid[entry.invoice_no] = current_paid + entry.amount_paid
+
+        payment = Payment(
+            business_id=sale.business_id,
+            sale_invoice_no=entry.invoice_no,
+            amount_paid=entry.amount_paid,
+            payment_method=entry.payment_method,
+            bank_id=entry.bank_id,
+            reference_no=str(uuid.uuid4()),
+            payment_date=entry.payment_date or datetime.now(LAGOS_TZ),
+            created_by=current_user.id,
+            balance_due=new_balance_due,
+            status=new_status
+        )
+        results.append(schemas.PaymentBulkResult(
+            index=index, invoice_no=entry.invoice_no, success=True
+        ))
+        pending.append((len(results) - 1, payment, sale, bank.name if bank else None))
+
+    # 5. One insert round + one commit
+    if not pending:
+        db.rollback()  # release the sale locks
+    else:
+        db.add_all([p for _, p, _, _ in pending])
+        try:
+            db.flush()
+            for result_index, p, sale, bank_name in pending:
+                results[result_index].payment = schemas.PaymentOut(
+                    id=p.id,
+                    invoice_no=p.sale_invoice_no,
+                    amount_paid=p.amount_paid,
+                    payment_method=p.payment_method,
+                    bank_id=p.bank_id,
+                    reference_no=p.reference_no,
+                    payment_date=p.payment_date,
+                    created_by=p.created_by,
+                    created_at=p.created_at,
+                    balance_due=p.balance_due,
+                    status=p.status,
+                    customer_name=sale.customer_name or "Walk-in",
+                    total_amount=float(sale.total_amount or 0),
+                    bank_name=bank_name,
+                    created_by_name=current_user.username if current_user else None
+                )
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Database constraint error: {str(e.orig)}"
+            )
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to record payments: {str(e)}"
+            )
+
+    return schemas.PaymentBulkResponse(
+        created=len(pending),
+        failed=len(results) - len(pending),
+        results=results
+    )
+
+def _payment_filters(
     current_user: UserDisplaySchema,
-    invoice_no: Optional[str] = None,
+    invoice_no: Optional[int] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     status: Optional[str] = None,
     bank_id: Optional[int] = None,
     payment_method: Optional[str] = None,
     business_id: Optional[int] = None
-) -> List[schemas.PaymentOut]:
-    """
-    Tenant-aware list of payments with timezone-aware filtering.
-    Enriches each payment with bank_name, created_by_name, customer_name, total_amount.
-    """
-
-    # ─── 1. Base query with eager loading ─────────────────────────────
-    query = (
-        db.query(models.Payment)
-        .options(
-            joinedload(models.Payment.sale),
-            joinedload(models.Payment.user),
-            joinedload(models.Payment.bank)
-        )
-    )
+) -> list:
+    """Tenant isolation + filters shared by the page and the totals query."""
+    filters = []
 
-    # ─── 2. Tenant isolation ──────────────────────────────────────────
+    # ─── Tenant isolation ─────────────────────────────────────────────
     if "super_admin" in current_user.roles:
         if business_id is not None:
-            query = query.filter(models.Payment.business_id == business_id)
+            filters.append(models.Payment.business_id == business_id)
     else:
         if not current_user.business_id:
             raise HTTPException(
                 status_code=403,
                 detail="Current user does not belong to any business"
             )
-        query = query.filter(models.Payment.business_id == current_user.business_id)
+        filters.append(models.Payment.business_id == current_user.business_id)
 
-    # ─── 3. Apply filters ─────────────────────────────────────────────
-    if invoice_no:
-        query = query.filter(
-            cast(models.Payment.sale_invoice_no, String).ilike(f"%{invoice_no}%")
-        )
+    # ─── Filters (exact invoice → idx_payment_business_invoice) ───────
+    if invoice_no is not None:
+        filters.append(models.Payment.sale_invoice_no == invoice_no)
 
+    # Half-open Lagos-day range: [start 00:00, end + 1 day 00:00)
     if start_date:
         start_dt = datetime.combine(start_date, time.min, tzinfo=LAGOS_TZ)
-        query = query.filter(models.Payment.created_at >= start_dt)
+        filters.append(models.Payment.created_at >= start_dt)
 
     if end_date:
-        end_dt = datetime.combine(end_date, time.max, tzinfo=LAGOS_TZ)
-        query = query.filter(models.Payment.created_at <= end_dt)
+        end_dt = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=LAGOS_TZ)
+        filters.append(models.Payment.created_at < end_dt)
 
     if status:
-        query = query.filter(models.Payment.status == status.lower())
+        filters.append(models.Payment.status == status.lower())
 
     if bank_id:
-        query = query.filter(models.Payment.bank_id == bank_id)
+        filters.append(models.Payment.bank_id == bank_id)
 
     if payment_method:
-        query = query.filter(
-            models.Payment.payment_method.ilike(f"%{payment_method.lower()}%")
+        filters.append(models.Payment.payment_method.ilike(f"%{payment_method.lower()}%"))
+
+    return filters
+
+
+def _payment_summary(db: Session, filters: list) -> schemas.PaymentSummary:
+    """
+    Totals over the whole filtered set (not just the page) in one query:
+    GROUPING SETS returns the per-method, per-bank and grand-total rows together.
+    """
+    Payment = models.Payment
+    Bank = bank_models.Bank
+
+    rows = (
+        db.query(
+            Payment.payment_method,
+            Payment.bank_id,
+            func.max(Bank.name).label("bank_name"),
+            func.coalesce(func.sum(Payment.amount_paid), 0).label("total_amount"),
+            func.count(Payment.id).label("count"),
+            func.grouping(Payment.payment_method).label("g_method"),
+            func.grouping(Payment.bank_id).label("g_bank"),
+        )
+        .outerjoin(Bank, Bank.id == Payment.bank_id)
+        .filter(*filters)
+        .group_by(
+            func.grouping_sets(
+                tuple_(Payment.payment_method),
+                tuple_(Payment.bank_id),
+                tuple_(),
+            )
         )
+        .all()
+    )
 
-    # ─── 4. Execute query (ordering optional) ────────────────────────
-    payments = query.offset(0).limit(1000).all()  # you can add pagination if needed
+    summary = schemas.PaymentSummary(total_amount=0.0, count=0)
+
+    for r in rows:
+        if r.g_method and r.g_bank:
+            summary.total_amount = float(r.total_amount or 0)
+            summary.count = r.count
+        elif r.g_bank:
+            summary.by_method.append(schemas.PaymentMethodTotal(
+                payment_method=r.payment_method,
+                total_amount=float(r.total_amount or 0),
+                count=r.count
+            ))
+        else:
+            summary.by_bank.append(schemas.PaymentBankTotal(
+                bank_id=r.bank_id,
+                bank_name=r.bank_name,
+                total_amount=float(r.total_amount or 0),
+                count=r.count
+            ))
+
+    summary.by_method.sort(key=lambda t: t.total_amount, reverse=True)
+    summary.by_bank.sort(key=lambda t: t.total_amount, reverse=True)
+    return summary
 
-    # ─── 5. Enrich response objects ───────────────────────────────────
-    result: List[schemas.PaymentOut] = []
 
-    for p in payments:
-        enriched = schemas.PaymentOut(
+def list_payments(
+    db: Session,
+    current_user: UserDisplaySchema,
+    invoice_no: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    bank_id: Optional[int] = None,
+    payment_method: Optional[str] = None,
+    business_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> schemas.PaymentListResponse:
+    """
+    Tenant-aware list of payments with timezone-aware filtering.
+
+    - Newest first, keyset-paginated on (created_at, id) → pass back `next_cursor`
+    - Enriches each payment with bank_name, created_by_name, customer_name, total_amount
+      through plain outer joins (one row per payment, only the needed columns)
+    - `summary` covers every payment matching the filters, per method and per bank
+    """
+    Payment = models.Payment
+    Sale = sales_models.Sale
+    Bank = bank_models.Bank
+    User = user_models.User
+
+    filters = _payment_filters(
+        current_user=current_user,
+        invoice_no=invoice_no,
+        start_date=start_date,
+        end_date=end_date,
+        status=status,
+        bank_id=bank_id,
+        payment_method=payment_method,
+        business_id=business_id
+    )
+
+    # ─── 1. Page query: payment columns + enrichment in one pass ──────
+    query = (
+        db.query(
+            Payment.id,
+            Payment.sale_invoice_no,
+            Payment.amount_paid,
+            Payment.payment_method,
+            Payment.bank_id,
+            Payment.reference_no,
+            Payment.payment_date,
+            Payment.created_by,
+            Payment.created_at,
+            Payment.balance_due,
+            Payment.status,
+            Bank.name.label("bank_name"),
+            User.username.label("created_by_name"),
+            Sale.total_amount.label("sale_total"),
+            Sale.customer_name.label("customer_name"),
+            Sale.id.label("sale_id"),
+        )
+        .outerjoin(Sale, Sale.invoice_no == Payment.sale_invoice_no)
+        .outerjoin(Bank, Bank.id == Payment.bank_id)
+        .outerjoin(User, User.id == Payment.created_by)
+        .filter(*filters)
+    )
+
+    rows, next_cursor = keyset_paginate(
+        query, Payment.created_at, Payment.id, cursor=cursor, limit=limit
+    )
+
+    # ─── 2. Build response objects ────────────────────────────────────
+    payments = [
+        schemas.PaymentOut(
             id=p.id,
             invoice_no=p.sale_invoice_no,
             amount_paid=float(p.amount_paid or 0),
@@ -261,16 +557,22 @@ def list_payments(
             created_at=p.created_at.astimezone(LAGOS_TZ) if p.created_at else None,  # Lagos timezone
             balance_due=float(p.balance_due or 0),
             status=p.status,
-
-            # Enriched fields – safe because of joinedload
-            bank_name=p.bank.name if p.bank else None,
-            created_by_name=p.user.username if p.user else None,
-            total_amount=float(p.sale.total_amount or 0) if p.sale else None,
-            customer_name=p.sale.customer_name or "Walk-in" if p.sale else None
+            bank_name=p.bank_name,
+            created_by_name=p.created_by_name,
+            total_amount=float(p.sale_total or 0) if p.sale_id else None,
+            customer_name=p.customer_name or "Walk-in" if p.sale_id else None
         )
-        result.append(enriched)
+        for p in rows
+    ]
+
+    # ─── 3. Totals (whole filtered set) ───────────────────────────────
+    summary = _payment_summary(db, filters)
 
-    return result
+    return schemas.PaymentListResponse(
+        payments=payments,
+        summary=summary,
+        next_cursor=next_cursor
+    )
 
 
 
@@ -285,7 +587,7 @@ def list_payments_by_sale(
     Returns enriched PaymentOut objects or None if sale not found/unauthorized.
     """
     # 1. Fetch sale + enforce tenant isolation
-    sale_query = db.query(sales_models.Sale)
+    business_id = None
 
     if "super_admin" not in current_user.roles:
         if not current_user.business_id:
@@ -293,13 +595,9 @@ def list_payments_by_sale(
                 status_code=403,
                 detail="Current user does not belong to any business"
             )
-        sale_query = sale_query.filter(
-            sales_models.Sale.business_id == current_user.business_id
-        )
+        business_id = current_user.business_id
 
-    sale = sale_query.filter(
-        sales_models.Sale.invoice_no == invoice_no
-    ).first()
+    sale = queries.sale_by_invoice(db, invoice_no, business_id)
 
     if not sale:
         return None
@@ -391,8 +689,9 @@ def update_payment(
     if not payment:
         return None
 
-    sale = payment.sale
+    sale = _lock_sale(db, payment.sale_invoice_no)
     if not sale:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Linked sale not found")
 
     # 2. Apply updates
@@ -409,6 +708,7 @@ def update_payment(
                 bank_models.Bank.business_id == payment.business_id
             ).first()
             if not bank:
+                db.rollback()
                 raise HTTPException(
                     status_code=404,
                     detail=f"Bank {update_data['bank_id']} not found or does not belong to this business"
@@ -417,15 +717,16 @@ def update_payment(
     if "payment_date" in update_data:
         payment.payment_date = update_data["payment_date"]
 
-    # 3. Recalculate balance & status
-    other_payments = [p for p in sale.payments if p.id != payment_id]
-    total_paid = sum(float(p.amount_paid or 0) for p in other_payments) + payment.amount_paid
+    # 3. Recalculate balance & status (under the sale lock)
+    total_paid = _paid_total(db, payment.sale_invoice_no, exclude_payment_id=payment_id) + payment.amount_paid
     new_balance_due = float(sale.total_amount or 0) - total_paid
 
     if payment.amount_paid <= 0:
+        db.rollback()
         raise HTTPException(status_code=400, detail="Payment amount must be greater than zero")
 
     if total_paid > sale.total_amount + 0.01:  # small float tolerance
+        db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Updated payments ({total_paid:.2f}) exceed sale total ({sale.total_amount:.2f})"
@@ -476,10 +777,8 @@ def delete_payment(
     Restores the paid amount to the sale's balance and updates status.
     Returns True if deleted, False if not found/unauthorized.
     """
-    # 1. Fetch payment with tenant isolation + eager load sale
-    payment_query = db.query(models.Payment).options(
-        joinedload(models.Payment.sale)
-    )
+    # 1. Fetch payment with tenant isolation
+    payment_query = db.query(models.Payment)
 
     if "super_admin" not in current_user.roles:
         if not current_user.business_id:
@@ -498,13 +797,14 @@ def delete_payment(
     if not payment:
         return False
 
-    sale = payment.sale
+    sale = _lock_sale(db, payment.sale_invoice_no)
     if not sale:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Linked sale not found")
 
-    # 2. Restore the paid amount to sale balance
+    # 2. Restore the paid amount to sale balance (under the sale lock)
     restored_amount = float(payment.amount_paid or 0)
-    new_total_paid = sum(float(p.amount_paid or 0) for p in sale.payments if p.id != payment_id)
+    new_total_paid = _paid_total(db, payment.sale_invoice_no, exclude_payment_id=payment_id)
     new_balance_due = float(sale.total_amount or 0) - new_total_paid
 
     # 3. Update sale status based on new total paid
@@ -52,6 +52,7 @@ class Purchase(Base):
     __table_args__ = (
         Index("idx_purchase_business_invoice", "business_id", "invoice_no"),
         Index("idx_purchase_business_created", "business_id", "created_at"),
+        Index("idx_purchase_business_date_id", "business_id", "purchase_date", "id"),   # keyset pages
         Index("idx_purchase_business_vendor", "business_id", "vendor_id"),
     
 
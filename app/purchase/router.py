@@ -4,6 +4,7 @@ from typing import List, Optional
 
 
 from app.database import get_db
+from app.core.pagination import COUNT_MODE_PATTERN, COUNT_MODE_DESCRIPTION
 from app.purchase import schemas, service
 from app.stock.inventory import service as inventory_service
 from app.vendor import models as vendor_models
@@ -63,21 +64,22 @@ def create_purchase(
 
 @router.get("/", response_model=schemas.PurchaseListResponse)
 def list_purchases_route(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=500),
     invoice_no: Optional[str] = Query(None),
     product_id: Optional[int] = Query(None),
     vendor_id: Optional[int] = Query(None),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     business_id: Optional[int] = Query(None),
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN, description=COUNT_MODE_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user),
 ):
-    purchases, gross_total = purchase_service.list_purchases(
+    purchases, gross_total, next_cursor, total_count, total_count_estimated = purchase_service.list_purchases(
         db=db,
         current_user=current_user,
-        skip=skip,
+        cursor=cursor,
         limit=limit,
         invoice_no=invoice_no,
         product_id=product_id,
@@ -85,6 +87,7 @@ def list_purchases_route(
         start_date=start_date,
         end_date=end_date,
         business_id=business_id,
+        count=count,
     )
 
     result = []
@@ -124,7 +127,10 @@ def list_purchases_route(
 
     return {
         "purchases": result,
-        "gross_total": gross_total
+        "gross_total": gross_total,
+        "next_cursor": next_cursor,
+        "total_count": total_count,
+        "total_count_estimated": total_count_estimated
     }
 
     
@@ -70,3 +70,6 @@ class PurchaseOut(PurchaseBase):
 class PurchaseListResponse(BaseModel):
     purchases: List[PurchaseOut]
     gross_total: float
+    next_cursor: Optional[str] = None   # pass back as ?cursor= for the next page
+    total_count: Optional[int] = None   # only with ?count=
+    total_count_estimated: bool = False
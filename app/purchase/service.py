@@ -8,7 +8,9 @@ from app.stock.inventory import service as inventory_service
 from datetime import datetime
 from app.vendor import models as  vendor_models
 
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
+from app.core import queries
+from app.core.pagination import keyset_paginate, count_rows
 
 from datetime import datetime, timedelta
 from sqlalchemy import func
@@ -73,22 +75,13 @@ def create_purchase(db, purchase, current_user):
             product = None
 
             if item.product_id:
-                product = db.query(product_models.Product).filter(
-                    product_models.Product.id == item.product_id,
-                    product_models.Product.business_id == business_id
-                ).first()
+                product = queries.product_by_id(db, item.product_id, business_id, active_only=False)
 
             elif item.barcode:
-                product = db.query(product_models.Product).filter(
-                    product_models.Product.barcode == item.barcode,
-                    product_models.Product.business_id == business_id
-                ).first()
+                product = queries.product_by_barcode(db, item.barcode, business_id, active_only=False)
 
             elif item.sku:
-                product = db.query(product_models.Product).filter(
-                    product_models.Product.sku == item.sku,
-                    product_models.Product.business_id == business_id
-                ).first()
+                product = queries.product_by_sku(db, item.sku, business_id, active_only=False)
 
             if not product:
                 raise HTTPException(
@@ -192,7 +185,7 @@ def create_purchase(db, purchase, current_user):
 def list_purchases(
     db: Session,
     current_user,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
     invoice_no: Optional[str] = None,
     product_id: Optional[int] = None,
@@ -200,10 +193,11 @@ def list_purchases(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     business_id: Optional[int] = None,
+    count: Optional[str] = None,
 ):
     # -------------------- BASE QUERY --------------------
     query = db.query(purchase_models.Purchase).options(
-        joinedload(purchase_models.Purchase.items)
+        selectinload(purchase_models.Purchase.items)
         .joinedload(purchase_models.PurchaseItem.product),   # ✅ preload product (barcode, sku)
         joinedload(purchase_models.Purchase.vendor)
     )
@@ -245,11 +239,11 @@ def list_purchases(
 
     # -------------------- PRODUCT FILTER --------------------
     if product_id:
-        query = query.join(
-            purchase_models.Purchase.items
-        ).filter(
-            purchase_models.PurchaseItem.product_id == product_id
-        ).distinct()  # ✅ prevents duplicate purchases
+        query = query.filter(
+            purchase_models.Purchase.items.any(
+                purchase_models.PurchaseItem.product_id == product_id
+            )
+        )  # ✅ EXISTS → no duplicate purchases, no DISTINCT
 
     # -------------------- GROSS TOTAL --------------------
     gross_total = (
@@ -258,16 +252,19 @@ def list_purchases(
         ).scalar()
     )
 
-    # -------------------- PAGINATION --------------------
-    purchases = (
-        query
-        .order_by(purchase_models.Purchase.purchase_date.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    # -------------------- TOTAL COUNT (only when asked) --------------------
+    total_count, total_count_estimated = count_rows(db, query, count)
+
+    # -------------------- PAGINATION (keyset on purchase_date, id) --------------------
+    purchases, next_cursor = keyset_paginate(
+        query,
+        purchase_models.Purchase.purchase_date,
+        purchase_models.Purchase.id,
+        cursor=cursor,
+        limit=limit
     )
 
-    return purchases, gross_total
+    return purchases, gross_total, next_cursor, total_count, total_count_estimated
 
 
 
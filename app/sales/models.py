@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Identity, Index
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, DateTime, Identity, Index, JSON, Text
+from sqlalchemy import event, select
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -10,7 +11,7 @@ class Sale(Base):
 
     # ✅ Composite indexes for multi-tenant performance
     __table_args__ = (
-        Index("idx_sales_business_soldat", "business_id", "sold_at"),
+        Index("idx_sales_business_soldat_id", "business_id", "sold_at", "id"),   # date ranges + keyset pages
         Index("idx_sales_business_invoice", "business_id", "invoice_no"),
         Index("idx_sales_business_date", "business_id", "invoice_date"),
     )
@@ -116,6 +117,90 @@ class SaleItem(Base):
 
     net_amount = Column(Float, nullable=False)
 
+    # Copy of the sale's sold_at: partition key of sale_items (app/core/partitions.py)
+    sold_at = Column(DateTime(timezone=True), nullable=True)
+
     sale = relationship("Sale", back_populates="items")
 
     product = relationship("Product")
+
+
+@event.listens_for(SaleItem, "before_insert")
+def _copy_sale_sold_at(mapper, connection, item):
+    if item.sold_at is not None:
+        return
+    if item.sale is not None and item.sale.sold_at is not None:
+        item.sold_at = item.sale.sold_at
+    else:
+        item.sold_at = connection.execute(
+            select(Sale.sold_at).where(Sale.invoice_no == item.sale_invoice_no)
+        ).scalar()
+
+
+class SaleReceipt(Base):
+    """
+    Pre-rendered receipt of a sale (see app/sales/receipts.py).
+
+    Rendered on first print, then reprints are a primary-key lookup.
+    Deleted whenever the sale, its items or its payments change.
+    """
+    __tablename__ = "sale_receipts"
+
+    invoice_no = Column(
+        Integer,
+        ForeignKey("sales.invoice_no", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    business_id = Column(
+        Integer,
+        ForeignKey("businesses.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    receipt = Column(JSON, nullable=False)    # GET /sales/receipt/{invoice_no} (SaleOut2)
+    reprint = Column(JSON, nullable=False)    # GET /sales/invoice/{invoice_no} (SaleReprintOut)
+    text = Column(Text, nullable=False)       # fixed-width text for thermal / ESC/POS printers
+
+    rendered_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+
+class SaleRollup(Base):
+    """
+    Daily per-product sales totals of archived sales (see app/core/archive.py).
+
+    Archived sales leave the hot tables; their figures stay here so the P&L
+    and sales analysis of archived years still add up. A (business, day,
+    product) can have several rows (one per archive run) → always sum.
+    """
+    __tablename__ = "sale_rollups"
+
+    __table_args__ = (
+        Index("idx_sale_rollups_business_day", "business_id", "day"),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    business_id = Column(
+        Integer,
+        ForeignKey("businesses.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    day = Column(Date, nullable=False)   # Lagos date of sold_at
+
+    product_id = Column(
+        Integer,
+        ForeignKey("products.id", ondelete="SET NULL"),
+        nullable=True
+    )
+
+    quantity = Column(Integer, nullable=False, default=0)
+    gross_sales = Column(Float, nullable=False, default=0)   # Σ quantity × selling_price
+    discount = Column(Float, nullable=False, default=0)
+    cost = Column(Float, nullable=False, default=0)          # Σ quantity × historical cost_price
@@ -0,0 +1,276 @@
+# app/sales/receipts.py
+"""
+Receipt rendering + storage.
+
+A sale's receipt documents (the /sales/receipt JSON, the /sales/invoice
+reprint JSON and a fixed-width text version for thermal printers) are
+rendered once, on first print, into `sale_receipts`. Every reprint after
+that is a primary-key lookup.
+
+Any write to the sale, its items or its payments (update_sale,
+create_sale_item, update_sale_item, payment create/update/delete, bulk
+payments, delete_sale) deletes the stored receipt in the same transaction
+(session event, like the P&L cache), so the next print re-renders it.
+Those writes lock the sale row first, which keeps a concurrent first print
+from storing a receipt rendered from the old rows (see _render).
+"""
+import os
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, event, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.business.models import Business
+from app.payments.models import Payment
+from app.users.schemas import UserDisplaySchema
+from . import models, schemas
+
+from zoneinfo import ZoneInfo
+LAGOS_TZ = ZoneInfo("Africa/Lagos")
+
+
+RECEIPT_WIDTH = int(os.getenv("RECEIPT_WIDTH", 42))   # 42 cols = 80mm paper, 32 = 58mm
+
+ESC_POS_INIT = b"\x1b@"
+ESC_POS_CUT = b"\n\n\n\x1dV\x00"
+
+
+# ============================================================
+# 🧾 Documents
+# ============================================================
+def build_receipt(sale: models.Sale) -> schemas.SaleOut2:
+    """Receipt payload (GET /sales/receipt/{invoice_no})."""
+    # Totals recalculated from items (using net_amount)
+    total_amount = sum(float(item.net_amount or 0) for item in sale.items)
+
+    payments = sale.payments or []
+    total_paid = sum(float(p.amount_paid or 0) for p in payments)
+    balance_due = total_amount - total_paid
+
+    if total_paid == 0:
+        payment_status = "pending"
+    elif balance_due > 0:
+        payment_status = "part_paid"
+    else:
+        payment_status = "completed"
+
+    return schemas.SaleOut2(
+        id=sale.id,
+        invoice_no=sale.invoice_no,
+        invoice_date=sale.invoice_date,
+        customer_name=sale.customer_name or "Walk-in",
+        customer_phone=sale.customer_phone or None,
+        ref_no=sale.ref_no or None,
+        total_amount=total_amount,
+        total_paid=total_paid,
+        balance_due=balance_due,
+        payment_status=payment_status,
+        sold_at=sale.sold_at,
+        sold_by=sale.sold_by,
+        items=[
+            schemas.SaleItemOut2(
+                id=item.id,
+                sale_invoice_no=item.sale_invoice_no,
+                product_id=item.product_id,
+                product_name=item.product.name if item.product else None,
+                sku=item.product.sku if item.product else None,
+                barcode=item.product.barcode if item.product else None,
+                quantity=item.quantity or 0,
+                selling_price=float(item.selling_price or 0),
+                gross_amount=float(item.gross_amount or 0),
+                discount=float(item.discount or 0),
+                net_amount=float(item.net_amount or 0),
+            )
+            for item in sale.items
+        ]
+    )
+
+
+def build_reprint(sale: models.Sale) -> schemas.SaleReprintOut:
+    """Reprint / view payload (GET /sales/invoice/{invoice_no})."""
+    payments = sale.payments or []
+    total_paid = sum(float(p.amount_paid or 0) for p in payments)
+    balance_due = float(sale.total_amount or 0) - total_paid
+
+    # Last payment (used for receipt display)
+    last_payment = payments[-1] if payments else None
+
+    if balance_due <= 0:
+        payment_status = "paid"
+    elif total_paid > 0:
+        payment_status = "partial"
+    else:
+        payment_status = "unpaid"
+
+    return schemas.SaleReprintOut(
+        invoice_no=sale.invoice_no,
+        invoice_date=sale.invoice_date.date() if sale.invoice_date else None,
+        customer_name=sale.customer_name,
+        customer_phone=sale.customer_phone,
+        ref_no=sale.ref_no,
+        total_amount=float(sale.total_amount or 0),
+        amount_paid=total_paid,
+        balance_due=balance_due,
+        payment_method=last_payment.payment_method if last_payment else None,
+        bank_id=last_payment.bank_id if last_payment else None,
+        payment_status=payment_status,
+        items=[
+            schemas.SaleReprintItemOut(
+                product_id=item.product_id,
+                product_name=item.product.name if item.product else None,
+                quantity=item.quantity,
+                selling_price=float(item.selling_price or 0),
+                discount=float(item.discount or 0),
+                gross_amount=float(item.gross_amount or 0),
+                net_amount=float(item.net_amount or 0),
+            )
+            for item in sale.items
+        ]
+    )
+
+
+def _line(left: str, right: str = "", width: int = RECEIPT_WIDTH) -> str:
+    space = max(width - len(left) - len(right), 1)
+    return f"{left}{' ' * space}{right}"[:width] if right else left[:width]
+
+
+def render_text(receipt: schemas.SaleOut2, business: Optional[Business], width: int = RECEIPT_WIDTH) -> str:
+    """Fixed-width text receipt (thermal printers, ESC/POS)."""
+    rule = "-" * width
+    lines = []
+
+    if business:
+        lines.append(business.name.upper().center(width))
+        for extra in (business.address, business.phone):
+            if extra:
+                lines.append(extra.center(width))
+        lines.append(rule)
+
+    sold_at = receipt.sold_at.astimezone(LAGOS_TZ) if receipt.sold_at.tzinfo else receipt.sold_at
+    lines.append(_line(f"Invoice: {receipt.invoice_no}", sold_at.strftime("%Y-%m-%d %H:%M"), width))
+    lines.append(_line(f"Customer: {receipt.customer_name or 'Walk-in'}", width=width))
+    if receipt.customer_phone:
+        lines.append(_line(f"Phone: {receipt.customer_phone}", width=width))
+    if receipt.ref_no:
+        lines.append(_line(f"Ref: {receipt.ref_no}", width=width))
+    lines.append(rule)
+
+    for item in receipt.items:
+        lines.append(_line(item.product_name or f"Product #{item.product_id}", width=width))
+        lines.append(_line(f"  {item.quantity} x {item.selling_price:,.2f}", f"{item.gross_amount:,.2f}", width))
+        if item.discount:
+            lines.append(_line("  Discount", f"-{item.discount:,.2f}", width))
+
+    lines.append(rule)
+    lines.append(_line("TOTAL", f"{receipt.total_amount:,.2f}", width))
+    lines.append(_line("PAID", f"{receipt.total_paid:,.2f}", width))
+    lines.append(_line("BALANCE", f"{receipt.balance_due:,.2f}", width))
+    lines.append(_line(f"Status: {receipt.payment_status}", width=width))
+    lines.append(rule)
+    lines.append("Thank you for your patronage".center(width))
+
+    return "\n".join(line.rstrip() for line in lines) + "\n"
+
+
+def to_escpos(text: str) -> bytes:
+    """Wrap a text receipt with ESC/POS init + paper cut."""
+    return ESC_POS_INIT + text.encode("cp437", errors="replace") + ESC_POS_CUT
+
+
+# ============================================================
+# 🗄️ Store
+# ============================================================
+def _render(db: Session, invoice_no: int, business_id: Optional[int]) -> Optional[models.SaleReceipt]:
+    # FOR SHARE on the sale: every sale/item/payment write locks the sale row
+    # first (queries.sale_for_update, or its own UPDATE/DELETE of the row), so
+    # a write in flight finishes before we read, and one that starts after
+    # waits for our commit; its receipt delete then runs after our insert
+    query = (
+        db.query(models.Sale)
+        .options(
+            joinedload(models.Sale.items).joinedload(models.SaleItem.product),
+            joinedload(models.Sale.business),
+            selectinload(models.Sale.payments)
+        )
+        .filter(models.Sale.invoice_no == invoice_no)
+    )
+    if business_id is not None:
+        query = query.filter(models.Sale.business_id == business_id)
+
+    sale = query.with_for_update(read=True, of=models.Sale).one_or_none()
+    if not sale:
+        db.rollback()
+        return None
+
+    receipt = build_receipt(sale)
+    values = {
+        "invoice_no": sale.invoice_no,
+        "business_id": sale.business_id,
+        "receipt": receipt.model_dump(mode="json"),
+        "reprint": build_reprint(sale).model_dump(mode="json"),
+        "text": render_text(receipt, sale.business),
+    }
+
+    db.execute(
+        pg_insert(models.SaleReceipt)
+        .values(**values)
+        .on_conflict_do_update(index_elements=["invoice_no"], set_=values)
+    )
+    db.commit()
+
+    return models.SaleReceipt(**values)
+
+
+def get_receipt(
+    db: Session,
+    invoice_no: int,
+    current_user: UserDisplaySchema
+) -> Optional[models.SaleReceipt]:
+    """Stored receipt of a sale (rendered on first use), tenant-checked; None if not found."""
+    business_id = None
+    if "super_admin" not in current_user.roles:
+        if not current_user.business_id:
+            raise HTTPException(
+                status_code=403,
+                detail="Current user does not belong to any business"
+            )
+        business_id = current_user.business_id
+
+    query = db.query(models.SaleReceipt).filter(models.SaleReceipt.invoice_no == invoice_no)
+    if business_id is not None:
+        query = query.filter(models.SaleReceipt.business_id == business_id)
+
+    stored = query.first()
+    if stored is not None:
+        return stored
+
+    return _render(db, invoice_no, business_id)
+
+
+# ============================================================
+# 🔔 Invalidation on writes
+# ============================================================
+def _invoice_values(instance, attribute: str) -> set:
+    history = inspect(instance).attrs[attribute].history
+    values = list(history.added or ()) + list(history.deleted or ()) + list(history.unchanged or ())
+    return {v for v in values if v is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_receipts(session, flush_context):
+    invoices = set()
+
+    for instance in list(session.dirty) + list(session.deleted):
+        if isinstance(instance, models.Sale):
+            invoices |= _invoice_values(instance, "invoice_no")
+
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(instance, (models.SaleItem, Payment)):
+            invoices |= _invoice_values(instance, "sale_invoice_no")
+
+    if invoices:
+        session.connection().execute(
+            delete(models.SaleReceipt).where(models.SaleReceipt.invoice_no.in_(invoices))
+        )
@@ -9,10 +9,13 @@ from app.sales.schemas import SaleOut,  SaleOut2, SaleFullCreate, OutstandingSal
 from app.sales import models as sales_models
 from app.payments.models import Payment
 
-from app.database import get_db
-from . import schemas, service
+from app.database import get_db, get_read_db
+from . import schemas, service, receipts
 from app.users.schemas import UserDisplaySchema
 from app.users.permissions import role_required
+from app.core.responses import FastJSONResponse
+from app.core.pagination import COUNT_MODE_PATTERN, COUNT_MODE_DESCRIPTION
+from fastapi.responses import PlainTextResponse, Response
 import uuid
 
 from app.sales.service import get_sales_by_customer
@@ -128,7 +131,7 @@ def add_sale_item(
 
 @router.get("/", response_model=schemas.SalesListResponse)
 def list_sales(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(100, ge=1, le=500),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
@@ -137,6 +140,7 @@ def list_sales(
         None,
         description="Filter by specific business (super admin only)"
     ),
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN, description=COUNT_MODE_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user: UserDisplaySchema = Depends(
         role_required(["user", "manager", "admin", "super_admin"])
@@ -146,23 +150,36 @@ def list_sales(
     List sales with full tenant isolation.
     Normal users see only their business.
     Super admin can see everything or filter by business_id.
+    Newest first; follow `next_cursor` for older pages.
+    `total_count` only with ?count= (exact, estimate or auto).
     """
     sales_data = service.list_sales(
         db=db,
         current_user=current_user,
-        skip=skip,
+        cursor=cursor,
         limit=limit,
         start_date=start_date,
         end_date=end_date,
         business_id=business_id,
+        count=count,
     )
 
-    return sales_data
+    # Service already builds SalesListResponse → skip response_model re-validation
+    return FastJSONResponse(sales_data)
 
 
 
-@router.get("/invoices", response_model=List[int])
+@router.get("/invoices", response_model=schemas.InvoiceLookupResponse)
 def list_invoice_numbers(
+    q: Optional[str] = Query(
+        None,
+        pattern=r"^[1-9][0-9]{0,9}$",
+        description="Invoice number prefix (typeahead)"
+    ),
+    start_date: Optional[date] = Query(None, description="Sold on/after (default: last 90 days)"),
+    end_date: Optional[date] = Query(None, description="Sold on/before (inclusive)"),
+    before: Optional[int] = Query(None, description="next_before from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
     business_id: Optional[int] = Query(
         None,
         description="Filter by specific business (super admin only)"
@@ -173,17 +190,23 @@ def list_invoice_numbers(
     )
 ):
     """
-    Returns a list of all invoice numbers (sale.invoice_no).
+    Invoice number lookup for the reprint screen (newest first).
     
     - Regular users/managers/admins → only their own business
     - Super admin → all businesses, or filtered by ?business_id=xxx
+    - ?q=12 → invoices 12, 120–129, 1200–1299, ... within the date range
+    - Page with ?before=<next_before>
     """
-    invoice_nos = service.get_all_invoice_numbers(
+    return service.search_invoice_numbers(
         db=db,
         current_user=current_user,
+        q=q,
+        start_date=start_date,
+        end_date=end_date,
+        before=before,
+        limit=limit,
         business_id=business_id
     )
-    return invoice_nos
 
 
 # router.py
@@ -214,7 +237,8 @@ def get_sale_by_invoice(
                    f"or does not belong to your business"
         )
 
-    return sale_data
+    # Stored payload, already shaped as SaleReprintOut
+    return FastJSONResponse(sale_data)
 
 
 
@@ -233,7 +257,7 @@ def staff_sales_report(
         None,
         description="Filter by business (super admin only)"
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: UserDisplaySchema = Depends(
         role_required(["manager", "admin", "super_admin"])
     )
@@ -423,7 +447,7 @@ def sales_analysis(
         None,
         description="Filter by specific business (super admin only)"
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: UserDisplaySchema = Depends(
         role_required(["manager", "admin", "super_admin"])
     )
@@ -527,7 +551,38 @@ def get_sale_invoice_reprint(
                    f"or does not belong to your business"
         )
 
-    return receipt_data
+    # Stored payload, already shaped as SaleOut2
+    return FastJSONResponse(receipt_data)
+
+
+@router.get("/receipt/{invoice_no}/text")
+def get_sale_receipt_text(
+    invoice_no: int,
+    format: str = Query("text", pattern="^(text|escpos)$"),
+    db: Session = Depends(get_db),
+    current_user: UserDisplaySchema = Depends(
+        role_required(["user", "manager", "admin", "super_admin"])
+    )
+):
+    """
+    Fixed-width text receipt for thermal printers.
+
+    - format=text → plain text (RECEIPT_WIDTH columns)
+    - format=escpos → raw ESC/POS bytes (init + text + paper cut)
+    """
+    stored = receipts.get_receipt(db, invoice_no, current_user)
+
+    if not stored:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Receipt with invoice_no {invoice_no} not found "
+                   f"or does not belong to your business"
+        )
+
+    if format == "escpos":
+        return Response(content=receipts.to_escpos(stored.text), media_type="application/octet-stream")
+
+    return PlainTextResponse(stored.text)
 
 
 
@@ -236,6 +236,21 @@ class SaleSummary(BaseModel):
 class SalesListResponse(BaseModel):
     sales: List[SaleOut2]
     summary: SaleSummary
+    next_cursor: Optional[str] = None   # pass back as ?cursor= for the next page
+    total_count: Optional[int] = None   # only with ?count=
+    total_count_estimated: bool = False
+
+
+class InvoiceLookupItem(BaseModel):
+    invoice_no: int
+    customer_name: Optional[str] = None
+    total_amount: float
+    sold_at: datetime
+
+
+class InvoiceLookupResponse(BaseModel):
+    invoices: List[InvoiceLookupItem]
+    next_before: Optional[int] = None   # pass back as ?before= for the next page
 
 
 
@@ -6,7 +6,7 @@ from datetime import datetime, time
 from datetime import date
 from sqlalchemy.orm import joinedload
 from sqlalchemy.orm import selectinload
-from sqlalchemy import and_
+from sqlalchemy import and_, select, union_all
 from sqlalchemy.exc import IntegrityError
 from app.users import models as users_models
 
@@ -15,7 +15,9 @@ from app.users.schemas import UserDisplaySchema
 from app.users.auth import get_current_user
 
 
-from . import models, schemas
+from . import models, schemas, receipts
+from app.core import queries
+from app.core.pagination import keyset_paginate, count_rows
 from app.stock.inventory import service as inventory_service
 from app.stock.products import models as product_models
 
@@ -33,7 +35,7 @@ from sqlalchemy import text
 from app.purchase.models import Purchase
 from app.purchase import  models as purchase_models
 
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo
 
 LAGOS_TZ = ZoneInfo("Africa/Lagos")
@@ -123,11 +125,7 @@ def create_sale_full(
         # -------------------------------------
         if item_data.product_id:
 
-            product = db.query(product_models.Product).filter(
-                product_models.Product.id == item_data.product_id,
-                product_models.Product.business_id == target_business_id,
-                product_models.Product.is_active == True
-            ).first()
+            product = queries.product_by_id(db, item_data.product_id, target_business_id)
 
             if not product:
                 raise HTTPException(
@@ -154,11 +152,7 @@ def create_sale_full(
         # -------------------------------------
         elif item_data.barcode:
 
-            product = db.query(product_models.Product).filter(
-                product_models.Product.barcode == item_data.barcode,
-                product_models.Product.business_id == target_business_id,
-                product_models.Product.is_active == True
-            ).first()
+            product = queries.product_by_barcode(db, item_data.barcode, target_business_id)
 
             if not product:
                 raise HTTPException(
@@ -171,11 +165,7 @@ def create_sale_full(
         # -------------------------------------
         elif item_data.sku:
 
-            product = db.query(product_models.Product).filter(
-                product_models.Product.sku == item_data.sku,
-                product_models.Product.business_id == target_business_id,
-                product_models.Product.is_active == True
-            ).first()
+            product = queries.product_by_sku(db, item_data.sku, target_business_id)
 
             if not product:
                 raise HTTPException(
@@ -193,20 +183,7 @@ def create_sale_full(
         # Historical Cost Price
         # ─────────────────────────────────────
 
-        latest_purchase_item = (
-            db.query(purchase_models.PurchaseItem)
-            .join(purchase_models.Purchase)
-            .filter(
-                purchase_models.PurchaseItem.product_id == product.id,
-                purchase_models.Purchase.business_id == target_business_id
-            )
-            .order_by(purchase_models.PurchaseItem.id.desc())
-            .first()
-        )
-
-        historical_cost = (
-            latest_purchase_item.cost_price if latest_purchase_item else 0.0
-        )
+        historical_cost = queries.latest_purchase_cost(db, product.id, target_business_id)
 
         # ─────────────────────────────────────
         # Inventory Check
@@ -256,6 +233,7 @@ def create_sale_full(
             gross_amount=gross,
             discount=discount,
             net_amount=net,
+            sold_at=sale.sold_at,
         )
 
         db.add(sale_item)
@@ -315,7 +293,7 @@ def create_sale_item(
     """
 
     # ─── 1️⃣ Find the sale + enforce tenant ───────────────────────────
-    sale_query = db.query(models.Sale)
+    business_id = None
 
     # Non-super-admins can only touch their own business
     if "super_admin" not in current_user.roles:
@@ -324,9 +302,9 @@ def create_sale_item(
                 status_code=403,
                 detail="User does not belong to any business"
             )
-        sale_query = sale_query.filter(models.Sale.business_id == current_user.business_id)
+        business_id = current_user.business_id
 
-    sale = sale_query.filter(models.Sale.invoice_no == item.sale_invoice_no).first()
+    sale = queries.sale_for_update(db, item.sale_invoice_no, business_id)
 
     if not sale:
         raise HTTPException(
@@ -338,10 +316,7 @@ def create_sale_item(
     target_business_id = sale.business_id
 
     # ─── 2️⃣ Validate product belongs to same business ────────────────
-    product = db.query(product_models.Product).filter(
-        product_models.Product.id == item.product_id,
-        product_models.Product.business_id == target_business_id,
-    ).first()
+    product = queries.product_by_id(db, item.product_id, target_business_id, active_only=False)
 
     if not product:
         raise HTTPException(
@@ -350,18 +325,7 @@ def create_sale_item(
         )
 
     # ─── 3️⃣ Capture historical cost price (tenant scoped) ────────────
-    latest_purchase_item = (
-        db.query(purchase_models.PurchaseItem)
-        .join(purchase_models.Purchase)
-        .filter(
-            purchase_models.PurchaseItem.product_id == item.product_id,
-            purchase_models.Purchase.business_id == target_business_id
-        )
-        .order_by(purchase_models.PurchaseItem.id.desc())
-        .first()
-    )
-
-    historical_cost = latest_purchase_item.cost_price if latest_purchase_item else 0.0
+    historical_cost = queries.latest_purchase_cost(db, item.product_id, target_business_id)
 
     # ─── 4️⃣ Stock validation ────────────────────────────────────────
     stock_entry = inventory_service.get_inventory_orm_by_product(
@@ -401,6 +365,7 @@ def create_sale_item(
         discount=discount,
         net_amount=net_amount,
         total_amount=net_amount,  # net by default
+        sold_at=sale.sold_at,
     )
 
     db.add(sale_item)
@@ -556,22 +521,53 @@ def list_item_sold(
 
 
 
-def get_all_invoice_numbers(
+INVOICE_LOOKUP_DEFAULT_DAYS = 90
+INVOICE_NO_MAX = 2**31 - 1   # invoice_no is a 32-bit integer
+
+
+def _invoice_prefix_ranges(prefix: str) -> list:
+    """
+    "12" → invoice_no = 12, 120–129, 1200–1299, ... as range conditions,
+    so a prefix search is a handful of idx_sales_business_invoice range
+    scans instead of cast(invoice_no, String) LIKE '12%' over every row.
+    """
+    value = int(prefix)
+    conditions = []
+    scale = 1
+
+    while value * scale <= INVOICE_NO_MAX:
+        high = min((value + 1) * scale - 1, INVOICE_NO_MAX)
+        conditions.append(models.Sale.invoice_no.between(value * scale, high))
+        scale *= 10
+
+    return conditions
+
+
+def search_invoice_numbers(
     db: Session,
     current_user: UserDisplaySchema,
+    q: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    before: Optional[int] = None,
+    limit: int = 20,
     business_id: Optional[int] = None
-) -> List[int]:
+) -> schemas.InvoiceLookupResponse:
     """
-    Tenant-aware retrieval of sale invoice numbers.
-    Super admin can see everything or filter by business.
+    Typeahead lookup of invoice numbers (reprint screen).
+
+    - `q` → invoice numbers starting with those digits (one range scan of
+      idx_sales_business_invoice per digit length)
+    - Date-bounded: defaults to the last INVOICE_LOOKUP_DEFAULT_DAYS days
+    - Newest first, `limit` per page, keyset on invoice_no (`before`)
     """
-    query = db.query(models.Sale.invoice_no)
+    filters = []
 
     # ─── Apply tenant isolation ──────────────────────────────────────
     if "super_admin" in current_user.roles:
         # Super admin sees everything, unless filtered
         if business_id is not None:
-            query = query.filter(models.Sale.business_id == business_id)
+            filters.append(models.Sale.business_id == business_id)
     else:
         # Normal users → only their business
         if not current_user.business_id:
@@ -579,17 +575,64 @@ def get_all_invoice_numbers(
                 status_code=403,
                 detail="Current user does not belong to any business"
             )
-        query = query.filter(models.Sale.business_id == current_user.business_id)
+        filters.append(models.Sale.business_id == current_user.business_id)
 
-    # ─── Ordering + execution ────────────────────────────────────────
-    result = (
-        query
-        .order_by(models.Sale.invoice_no.asc())   # or .desc() if you prefer recent first
-        .all()
+    # ─── Date bounds + keyset position ───────────────────────────────
+    if start_date is None:
+        start_date = datetime.now(LAGOS_TZ).date() - timedelta(days=INVOICE_LOOKUP_DEFAULT_DAYS)
+    filters.append(models.Sale.sold_at >= datetime.combine(start_date, time.min, tzinfo=LAGOS_TZ))
+
+    if end_date:
+        filters.append(
+            models.Sale.sold_at < datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=LAGOS_TZ)
+        )
+
+    if before is not None:
+        filters.append(models.Sale.invoice_no < before)
+
+    columns = (
+        models.Sale.invoice_no,
+        models.Sale.customer_name,
+        models.Sale.total_amount,
+        models.Sale.sold_at
     )
 
-    # Extract scalar values
-    return [row[0] for row in result]
+    # ─── Newest first ────────────────────────────────────────────────
+    if q:
+        prefix_ranges = _invoice_prefix_ranges(q)
+        if not prefix_ranges:
+            # Prefix above INVOICE_NO_MAX → no invoice can match
+            return schemas.InvoiceLookupResponse(invoices=[])
+
+        # One index range scan per prefix range, merged
+        branches = [
+            select(*columns)
+            .where(*filters, prefix_range)
+            .order_by(models.Sale.invoice_no.desc())
+            .limit(limit + 1)
+            for prefix_range in prefix_ranges
+        ]
+        merged = union_all(*branches).subquery()
+        stmt = select(merged).order_by(merged.c.invoice_no.desc()).limit(limit + 1)
+    else:
+        stmt = select(*columns).where(*filters).order_by(models.Sale.invoice_no.desc()).limit(limit + 1)
+
+    rows = db.execute(stmt).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return schemas.InvoiceLookupResponse(
+        invoices=[
+            schemas.InvoiceLookupItem(
+                invoice_no=row.invoice_no,
+                customer_name=row.customer_name,
+                total_amount=float(row.total_amount or 0),
+                sold_at=row.sold_at
+            )
+            for row in rows
+        ],
+        next_before=rows[-1].invoice_no if has_more else None
+    )
 
 
 
@@ -601,85 +644,11 @@ def get_sale_by_invoice_no(
 ) -> Optional[dict]:
     """
     Fetch a single sale by invoice_no with tenant isolation.
-    Returns enriched dict matching SaleReprintOut or None if not found.
+    Returns the stored SaleReprintOut payload (rendered on first print,
+    see app/sales/receipts.py) or None if not found.
     """
-    # ─── 1. Build query with eager loading ───────────────────────────
-    query = (
-        db.query(models.Sale)
-        .options(
-            joinedload(models.Sale.items).joinedload(models.SaleItem.product),
-            joinedload(models.Sale.payments)
-        )
-        .filter(models.Sale.invoice_no == invoice_no)
-    )
-
-    # ─── 2. Apply tenant isolation ───────────────────────────────────
-    if "super_admin" not in current_user.roles:
-        if not current_user.business_id:
-            raise HTTPException(
-                status_code=403,
-                detail="Current user does not belong to any business"
-            )
-        query = query.filter(
-            models.Sale.business_id == current_user.business_id
-        )
-
-    sale = query.first()
-
-    if not sale:
-        return None
-
-    # ─── 3. Payment calculations ─────────────────────────────────────
-    payments = sale.payments or []
-    total_paid = sum(float(p.amount_paid or 0) for p in payments)
-    balance_due = float(sale.total_amount or 0) - total_paid
-
-    # Last payment (used for receipt display)
-    last_payment = payments[-1] if payments else None
-
-    # Payment status logic
-    if balance_due <= 0:
-        payment_status = "paid"
-    elif total_paid > 0:
-        payment_status = "partial"
-    else:
-        payment_status = "unpaid"
-
-    # ─── 4. Build enriched response dict ─────────────────────────────
-    return {
-        "id": sale.id,
-        "invoice_no": sale.invoice_no,
-        "invoice_date": sale.invoice_date.date() if sale.invoice_date else None,
-        "customer_name": sale.customer_name,
-        "customer_phone": sale.customer_phone,
-        "ref_no": sale.ref_no,
-
-        "total_amount": float(sale.total_amount or 0),
-        "amount_paid": total_paid,
-        "balance_due": balance_due,
-
-        # ─── FIXED ────────────────────────────────────────────────────
-        "payment_method": last_payment.payment_method if last_payment else None,
-        "bank_id": last_payment.bank_id if last_payment else None,
-        # ──────────────────────────────────────────────────────────────
-
-        "payment_status": payment_status,
-
-        "sold_at": sale.sold_at,
-
-        "items": [
-            {
-                "product_id": item.product_id,
-                "product_name": item.product.name if item.product else None,
-                "quantity": item.quantity,
-                "selling_price": float(item.selling_price or 0),
-                "discount": float(item.discount or 0),
-                "gross_amount": float(item.gross_amount or 0),
-                "net_amount": float(item.net_amount or 0),
-            }
-            for item in sale.items
-        ]
-    }
+    stored = receipts.get_receipt(db, invoice_no, current_user)
+    return stored.reprint if stored else None
 
 
 
@@ -690,11 +659,12 @@ LAGOS_TZ = ZoneInfo("Africa/Lagos")
 def list_sales(
     db: Session,
     current_user: UserDisplaySchema,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     business_id: Optional[int] = None,
+    count: Optional[str] = None,
 ) -> schemas.SalesListResponse:
 
     # ─── Base Query ──────────────────────────────────
@@ -735,10 +705,13 @@ def list_sales(
         end_datetime = datetime.combine(end_date, time.max, tzinfo=LAGOS_TZ)
         query = query.filter(models.Sale.sold_at <= end_datetime)
 
-    # ─── Order + Pagination ──────────────────────────
-    query = query.order_by(models.Sale.sold_at.desc())
+    # ─── Total (only when asked: exact / estimate / auto) ───
+    total_count, total_count_estimated = count_rows(db, query, count)
 
-    sales = query.offset(skip).limit(limit).all()
+    # ─── Order + Pagination (newest first, keyset on sold_at, id) ───
+    sales, next_cursor = keyset_paginate(
+        query, models.Sale.sold_at, models.Sale.id, cursor=cursor, limit=limit
+    )
 
     # ─── Build Response ──────────────────────────────
     sales_list: List[schemas.SaleOut2] = []
@@ -811,7 +784,10 @@ def list_sales(
 
     return schemas.SalesListResponse(
         sales=sales_list,
-        summary=summary
+        summary=summary,
+        next_cursor=next_cursor,
+        total_count=total_count,
+        total_count_estimated=total_count_estimated
     )
 
 
@@ -828,8 +804,8 @@ def update_sale(
     Tenant-safe update of sale header fields.
     Recalculates total_amount from items and balance from payments.
     """
-    # ─── 1. Build query with tenant isolation ────────────────────────
-    query = db.query(models.Sale)
+    # ─── 1. Fetch sale with tenant isolation ─────────────────────────
+    business_id = None
 
     if "super_admin" not in current_user.roles:
         if not current_user.business_id:
@@ -837,9 +813,9 @@ def update_sale(
                 status_code=403,
                 detail="Current user does not belong to any business"
             )
-        query = query.filter(models.Sale.business_id == current_user.business_id)
+        business_id = current_user.business_id
 
-    sale = query.filter(models.Sale.invoice_no == invoice_no).first()
+    sale = queries.sale_for_update(db, invoice_no, business_id, load_payments=True)
 
     if not sale:
         return None
@@ -904,7 +880,7 @@ def update_sale_item(
     Handles product change, stock adjustment, historical cost, totals recalculation.
     """
     # ─── 1. Fetch sale with tenant isolation ─────────────────────────
-    sale_query = db.query(models.Sale)
+    business_id = None
 
     if "super_admin" not in current_user.roles:
         if not current_user.business_id:
@@ -912,13 +888,9 @@ def update_sale_item(
                 status_code=403,
                 detail="Current user does not belong to any business"
             )
-        sale_query = sale_query.filter(
-            models.Sale.business_id == current_user.business_id
-        )
+        business_id = current_user.business_id
 
-    sale = sale_query.filter(
-        models.Sale.invoice_no == invoice_no
-    ).first()
+    sale = queries.sale_for_update(db, invoice_no, business_id, load_payments=True)
 
     if not sale:
         return None
@@ -948,10 +920,7 @@ def update_sale_item(
     new_product_id = item_update.product_id or item.product_id
 
     # Validate new/existing product belongs to business
-    product = db.query(product_models.Product).filter(
-        product_models.Product.id == new_product_id,
-        product_models.Product.business_id == target_business_id,
-    ).first()
+    product = queries.product_by_id(db, new_product_id, target_business_id, active_only=False)
 
     if not product:
         raise HTTPException(
@@ -984,11 +953,7 @@ def update_sale_item(
 
     # ─── 5. Freeze new historical cost price (if product changed) ─────
     if new_product_id != old_product_id:
-        latest_purchase = db.query(purchase_models.Purchase).filter(
-            purchase_models.Purchase.product_id == new_product_id,
-            purchase_models.Purchase.business_id == target_business_id,
-        ).order_by(purchase_models.Purchase.id.desc()).first()
-        item.cost_price = latest_purchase.cost_price if latest_purchase else 0.0
+        item.cost_price = queries.latest_purchase_cost(db, new_product_id, target_business_id)
 
     # ─── 6. Recalculate item amounts ─────────────────────────────────
     item.gross_amount = item.quantity * item.selling_price
@@ -1366,6 +1331,44 @@ def sales_analysis(
 
     results = query.all()
 
+    # ─── 5b. Archived years (daily rollups, app/core/archive.py) ──────
+    rollup_query = (
+        db.query(
+            models.SaleRollup.product_id,
+            product_models.Product.name.label("product_name"),
+            func.sum(models.SaleRollup.quantity).label("quantity_sold"),
+            func.sum(models.SaleRollup.gross_sales).label("gross_sales"),
+            func.sum(models.SaleRollup.discount).label("total_discount"),
+            func.sum(models.SaleRollup.cost).label("total_cost"),
+        )
+        .join(
+            product_models.Product,
+            product_models.Product.id == models.SaleRollup.product_id
+        )
+    )
+    if "super_admin" in current_user.roles:
+        if business_id is not None:
+            rollup_query = rollup_query.filter(models.SaleRollup.business_id == business_id)
+    else:
+        rollup_query = rollup_query.filter(models.SaleRollup.business_id == current_user.business_id)
+    if start_date:
+        rollup_query = rollup_query.filter(models.SaleRollup.day >= start_date)
+    if end_date:
+        rollup_query = rollup_query.filter(models.SaleRollup.day <= end_date)
+    if product_id:
+        rollup_query = rollup_query.filter(models.SaleRollup.product_id == product_id)
+
+    rolled = rollup_query.group_by(models.SaleRollup.product_id, product_models.Product.name).all()
+
+    # product_id → [name, quantity, gross, discount, cost] (live + archived)
+    per_product = {}
+    for row in list(results) + list(rolled):
+        totals = per_product.setdefault(row.product_id, [row.product_name, 0, 0.0, 0.0, 0.0])
+        totals[1] += int(row.quantity_sold or 0)
+        totals[2] += float(row.gross_sales or 0.0)
+        totals[3] += float(row.total_discount or 0.0)
+        totals[4] += float(row.total_cost or 0.0)
+
     # ─── 6. Build response items ──────────────────────────────────────
     items = []
     total_sales = 0.0
@@ -1373,15 +1376,10 @@ def sales_analysis(
     total_cost_sum = 0.0
     total_margin = 0.0
 
-    for row in results:
-        quantity = int(row.quantity_sold or 0)
+    for row_product_id, (product_name, quantity, gross_sales, total_discount, cost_of_sales) in per_product.items():
         if quantity == 0:
             continue  # skip zero-activity products
 
-        gross_sales = float(row.gross_sales or 0.0)
-        total_discount = float(row.total_discount or 0.0)
-        cost_of_sales = float(row.total_cost or 0.0)
-
         net_sales = gross_sales - total_discount
         avg_selling_price = gross_sales / quantity if quantity else 0.0
         avg_cost_price = cost_of_sales / quantity if quantity else 0.0
@@ -1395,8 +1393,8 @@ def sales_analysis(
 
         items.append(
             schemas.SaleAnalysisItem(
-                product_id=row.product_id,
-                product_name=row.product_name,
+                product_id=row_product_id,
+                product_name=product_name,
                 quantity_sold=quantity,
                 cost_price=avg_cost_price,
                 selling_price=avg_selling_price,
@@ -1552,86 +1550,14 @@ def get_receipt_data(
     db: Session,
     invoice_no: int,
     current_user: UserDisplaySchema
-) -> Optional[schemas.SaleOut2]:
+) -> Optional[dict]:
     """
     Tenant-safe retrieval of sale data for receipt printing.
-    Returns enriched SaleOut2 object or None if not found / not authorized.
+    Returns the stored SaleOut2 payload (rendered on first print,
+    see app/sales/receipts.py) or None if not found / not authorized.
     """
-    # ─── 1. Build query with necessary eager loading ─────────────────
-    query = (
-        db.query(models.Sale)
-        .options(
-            joinedload(models.Sale.items)
-                .joinedload(models.SaleItem.product),
-            joinedload(models.Sale.payments)
-        )
-        .filter(models.Sale.invoice_no == invoice_no)
-    )
-
-    # ─── 2. Apply tenant isolation ───────────────────────────────────
-    if "super_admin" not in current_user.roles:
-        if not current_user.business_id:
-            raise HTTPException(
-                status_code=403,
-                detail="Current user does not belong to any business"
-            )
-        query = query.filter(
-            models.Sale.business_id == current_user.business_id
-        )
-
-    # ─── 3. Fetch sale ───────────────────────────────────────────────
-    sale = query.first()
-
-    if not sale:
-        return None
-
-    # ─── 4. Recalculate totals from items (using net_amount) ─────────
-    total_amount = sum(float(item.net_amount or 0) for item in sale.items)
-
-    # Payments
-    payments = sale.payments or []
-    total_paid = sum(float(p.amount_paid or 0) for p in payments)
-    balance_due = total_amount - total_paid
-
-    # ─── 5. Determine payment status ─────────────────────────────────
-    if total_paid == 0:
-        payment_status = "pending"
-    elif balance_due > 0:
-        payment_status = "part_paid"
-    else:
-        payment_status = "completed"
-
-    # ─── 6. Build enriched SaleOut2 object ───────────────────────────
-    return schemas.SaleOut2(
-        id=sale.id,
-        invoice_no=sale.invoice_no,
-        invoice_date=sale.invoice_date,
-        customer_name=sale.customer_name or "Walk-in",
-        customer_phone=sale.customer_phone or None,
-        ref_no=sale.ref_no or None,
-        total_amount=total_amount,
-        total_paid=total_paid,
-        balance_due=balance_due,
-        payment_status=payment_status,
-        sold_at=sale.sold_at,
-        sold_by=sale.sold_by,
-        items=[
-            schemas.SaleItemOut2(
-                id=item.id,
-                sale_invoice_no=item.sale_invoice_no,
-                product_id=item.product_id,
-                product_name=item.product.name if item.product else None,
-                sku=item.product.sku if item.product else None,          # ✅ ADD
-                barcode=item.product.barcode if item.product else None,  # ✅ ADD
-                quantity=item.quantity or 0,
-                selling_price=float(item.selling_price or 0),
-                gross_amount=float(item.gross_amount or 0),
-                discount=float(item.discount or 0),
-                net_amount=float(item.net_amount or 0),
-            )
-            for item in sale.items
-        ]
-    )
+    stored = receipts.get_receipt(db, invoice_no, current_user)
+    return stored.receipt if stored else None
 
 
 
@@ -1646,7 +1572,7 @@ def delete_sale(
     Returns True if deleted, False if not found / not authorized.
     """
     # ─── 1. Fetch sale with tenant isolation ─────────────────────────
-    sale_query = db.query(models.Sale)
+    business_id = None
 
     if "super_admin" not in current_user.roles:
         if not current_user.business_id:
@@ -1654,13 +1580,9 @@ def delete_sale(
                 status_code=403,
                 detail="Current user does not belong to any business"
             )
-        sale_query = sale_query.filter(
-            models.Sale.business_id == current_user.business_id
-        )
+        business_id = current_user.business_id
 
-    sale = sale_query.filter(
-        models.Sale.invoice_no == invoice_no
-    ).first()
+    sale = queries.sale_for_update(db, invoice_no, business_id)
 
     if not sale:
         return False
@@ -57,4 +57,5 @@ class StockAdjustment(Base):
     # ✅ Optional composite index to speed up common queries
     __table_args__ = (
         Index("idx_stock_adjustment_business_product", "business_id", "product_id"),
+        Index("idx_stock_adjustment_business_adjusted", "business_id", "adjusted_at", "id"),   # keyset pages
     )
@@ -5,6 +5,8 @@ from sqlalchemy.exc import IntegrityError
 
 
 from app.database import get_db
+from app.core.responses import FastJSONResponse
+from app.core.pagination import COUNT_MODE_PATTERN, COUNT_MODE_DESCRIPTION
 from . import schemas, service
 from app.users.permissions import role_required
 from app.users.schemas import UserDisplaySchema
@@ -47,9 +49,9 @@ def create_adjustment(
 
 
 
-@router.get("/", response_model=List[schemas.StockAdjustmentOut])
+@router.get("/", response_model=schemas.StockAdjustmentListResponse)
 def list_adjustments(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(100, ge=1, le=500),
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
@@ -57,6 +59,7 @@ def list_adjustments(
         None,
         description="Filter by specific business (super admin only)"
     ),
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN, description=COUNT_MODE_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user: UserDisplaySchema = Depends(
         role_required(["user", "manager", "admin", "super_admin"])
@@ -68,18 +71,46 @@ def list_adjustments(
     - Regular users → only adjustments from their own business
     - Super admin → all adjustments or filtered by ?business_id=
     - Includes product_name and adjusted_by_name
+    - Newest first; follow `next_cursor` for older pages
     """
     adjustments = service.list_adjustments(
         db=db,
         current_user=current_user,
-        skip=skip,
+        cursor=cursor,
         limit=limit,
         start_date=start_date,
         end_date=end_date,
-        business_id=business_id
+        business_id=business_id,
+        count=count
     )
 
-    return adjustments
+    # Service already builds the response → skip response_model re-validation
+    return FastJSONResponse(adjustments)
+
+
+
+
+@router.post("/stock-take", response_model=schemas.StockTakeResult)
+def post_stock_take(
+    data: schemas.StockTakeCreate,
+    db: Session = Depends(get_db),
+    current_user: UserDisplaySchema = Depends(
+        role_required(["manager", "admin", "super_admin"])
+    )
+):
+    """
+    Post a stock-take (counted quantity per product) and get the variance report.
+
+    - Every product whose count differs from current stock gets one
+      adjustment (counted - current), all in a single transaction
+    - dry_run=true → variance report only, nothing is written
+    - Super admin → business_id is required
+    """
+    return FastJSONResponse(service.stock_take(
+        db=db,
+        data=data,
+        current_user=current_user
+    ))
 
 
 
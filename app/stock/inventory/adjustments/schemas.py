@@ -1,6 +1,6 @@
 # app/stock/inventory/adjustments/schemas.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -31,3 +31,55 @@ class StockAdjustmentOut(BaseModel):
     class Config:
         from_attributes = True
 
+
+class StockAdjustmentListResponse(BaseModel):
+    adjustments: List[StockAdjustmentOut]
+    next_cursor: Optional[str] = None   # pass back as ?cursor= for the next page
+    total_count: Optional[int] = None   # only with ?count=
+    total_count_estimated: bool = False
+
+
+
+# ============================================================
+# 📋 Stock-take
+# ============================================================
+class StockTakeCount(BaseModel):
+    product_id: int
+    counted_quantity: float = Field(..., ge=0)
+
+
+class StockTakeCreate(BaseModel):
+    counts: List[StockTakeCount] = Field(..., min_length=1, max_length=20000)
+    reason: str = "Stock take"
+    business_id: Optional[int] = None   # super admin only
+    dry_run: bool = False               # variance report only, nothing written
+
+
+class StockTakeLine(BaseModel):
+    product_id: int
+    product_name: Optional[str] = None
+    inventory_id: int
+    system_stock: float
+    counted_quantity: float
+    variance: float                     # counted - system (+ve surplus, -ve shrinkage)
+    variance_value: float               # variance x product cost price
+    adjustment_id: Optional[int] = None
+
+
+class StockTakeError(BaseModel):
+    product_id: int
+    error: str
+
+
+class StockTakeResult(BaseModel):
+    business_id: int
+    reason: str
+    dry_run: bool
+    counted: int
+    adjusted: int
+    unchanged: int
+    surplus_value: float
+    shrinkage_value: float
+    net_variance_value: float
+    lines: List[StockTakeLine]
+    errors: List[StockTakeError]
@@ -3,11 +3,12 @@ from datetime import datetime, timedelta
 from sqlalchemy.exc import IntegrityError
 
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy import func, and_, update, values, column, Integer, Float
 from datetime import datetime, date, time
 from typing import Optional, List
 
 from . import models, schemas
+from app.core.pagination import keyset_paginate, count_rows
 from app.stock.inventory import service as inventory_service
 from app.stock.inventory import models as inventory_models
 
@@ -129,14 +130,16 @@ def create_adjustment(
 def list_adjustments(
     db: Session,
     current_user,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    business_id: Optional[int] = None
-) -> List[schemas.StockAdjustmentOut]:
+    business_id: Optional[int] = None,
+    count: Optional[str] = None
+) -> schemas.StockAdjustmentListResponse:
     """
-    Tenant-aware list of stock adjustments.
+    Tenant-aware list of stock adjustments, newest first, keyset-paginated
+    on (adjusted_at, id) → pass back `next_cursor`.
     Enriches with product_name and adjusted_by_name.
     """
 
@@ -181,17 +184,20 @@ def list_adjustments(
         end_dt = datetime.combine(end_date, time.max).replace(tzinfo=LAGOS_TZ)
         query = query.filter(models.StockAdjustment.adjusted_at <= end_dt)
 
-    # ─── 4. Execute with ordering + pagination ──────────────
-    # Use column itself; SQLAlchemy will handle datetime sorting
-    results = (
-        query
-        .order_by(models.StockAdjustment.adjusted_at)  # ascending order by default
-        .offset(skip)
-        .limit(limit)
-        .all()
+    # ─── 4. Total (only when asked: exact / estimate / auto) ─
+    total_count, total_count_estimated = count_rows(db, query, count)
+
+    # ─── 5. Execute with ordering + pagination ──────────────
+    results, next_cursor = keyset_paginate(
+        query,
+        models.StockAdjustment.adjusted_at,
+        models.StockAdjustment.id,
+        cursor=cursor,
+        limit=limit,
+        row_key=lambda row: (row[0].adjusted_at, row[0].id)
     )
 
-    # ─── 5. Build enriched response ─────────────────────────
+    # ─── 6. Build enriched response ─────────────────────────
     adjustments = []
     for adj, product_name, adjusted_by_name in results:
         adjustments.append(
@@ -209,7 +215,12 @@ def list_adjustments(
             )
         )
 
-    return adjustments
+    return schemas.StockAdjustmentListResponse(
+        adjustments=adjustments,
+        next_cursor=next_cursor,
+        total_count=total_count,
+        total_count_estimated=total_count_estimated
+    )
 
 
 
@@ -291,4 +302,173 @@ def delete_adjustment(
         raise HTTPException(
             status_code=500,
             detail=f"Failed to delete stock adjustment: {str(e)}"
-        )   
+        )
+
+
+
+# ============================================================
+# 📋 Stock-take (batch adjustment)
+# ============================================================
+def stock_take(
+    db: Session,
+    data: schemas.StockTakeCreate,
+    current_user: UserDisplaySchema
+) -> schemas.StockTakeResult:
+    """
+    Post a stock-take: counted quantity per product → one adjustment per
+    product whose count differs from inventory.current_stock.
+
+    - Counts are sent to Postgres as a VALUES list and joined to inventory +
+      products in one query, which also computes the variances and locks
+      the inventory rows (FOR UPDATE, in id order → no deadlocks)
+    - Adjustment rows are inserted together, inventory is updated with one
+      UPDATE ... FROM (VALUES ...), then everything is committed once
+    - Several counts of the same product (e.g. two shelves) are added up
+    - Unknown products / products without inventory are reported, not fatal
+    - dry_run=True returns the variance report without writing anything
+    """
+    Inventory = inventory_models.Inventory
+    Product = product_models.Product
+
+    # 1. Resolve business
+    if "super_admin" in current_user.roles:
+        if not data.business_id:
+            raise HTTPException(status_code=400, detail="business_id is required")
+        business_id = data.business_id
+    else:
+        if not current_user.business_id:
+            raise HTTPException(status_code=403, detail="User does not belong to any business")
+        business_id = current_user.business_id
+
+    counted = {}
+    for count in data.counts:
+        counted[count.product_id] = counted.get(count.product_id, 0.0) + count.counted_quantity
+
+    # 2. Variances (one set-based query, inventory rows locked)
+    counts = values(
+        column("product_id", Integer),
+        column("counted_quantity", Float),
+        name="counts"
+    ).data(list(counted.items()))
+
+    system_stock = func.coalesce(Inventory.current_stock, 0)
+
+    rows = (
+        db.query(
+            Inventory.id.label("inventory_id"),
+            Inventory.product_id,
+            system_stock.label("system_stock"),
+            Product.name.label("product_name"),
+            func.coalesce(Product.cost_price, 0).label("cost_price"),
+            counts.c.counted_quantity,
+            (counts.c.counted_quantity - system_stock).label("variance")
+        )
+        .select_from(counts)
+        .join(Inventory, and_(
+            Inventory.product_id == counts.c.product_id,
+            Inventory.business_id == business_id
+        ))
+        .join(Product, and_(
+            Product.id == Inventory.product_id,
+            Product.business_id == business_id
+        ))
+        .order_by(Inventory.id)
+        .with_for_update(of=Inventory)
+        .all()
+    )
+
+    # One inventory row per product (the oldest one, like get_inventory_orm_by_product)
+    by_product = {}
+    for row in rows:
+        by_product.setdefault(row.product_id, row)
+
+    errors = [
+        schemas.StockTakeError(
+            product_id=product_id,
+            error="Product or inventory not found or does not belong to this business"
+        )
+        for product_id in counted if product_id not in by_product
+    ]
+
+    # 3. Adjustments for non-zero variances
+    now = datetime.now(LAGOS_TZ)
+    changed = [row for row in by_product.values() if round(row.variance, 6) != 0]
+
+    adjustment_ids = {}
+    if changed and not data.dry_run:
+        adjustments = {
+            row.inventory_id: models.StockAdjustment(
+                business_id=business_id,
+                product_id=row.product_id,
+                inventory_id=row.inventory_id,
+                quantity=row.variance,
+                reason=data.reason,
+                adjusted_by=current_user.id,
+                adjusted_at=now
+            )
+            for row in changed
+        }
+        db.add_all(adjustments.values())
+        db.flush()
+        adjustment_ids = {inventory_id: adj.id for inventory_id, adj in adjustments.items()}
+
+        variances = values(
+            column("inventory_id", Integer),
+            column("variance", Float),
+            name="variances"
+        ).data([(row.inventory_id, row.variance) for row in changed])
+
+        db.execute(
+            update(Inventory)
+            .where(Inventory.id == variances.c.inventory_id)
+            .values(
+                current_stock=func.coalesce(Inventory.current_stock, 0) + variances.c.variance,
+                adjustment_total=func.coalesce(Inventory.adjustment_total, 0) + variances.c.variance,
+                updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        try:
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Database error: {str(e.orig)}")
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Failed to post stock-take: {str(e)}")
+    else:
+        # Nothing to write → release the row locks
+        db.rollback()
+
+    # 4. Variance report
+    lines = []
+    for row in by_product.values():
+        variance = round(row.variance, 6)
+        lines.append(schemas.StockTakeLine(
+            product_id=row.product_id,
+            product_name=row.product_name,
+            inventory_id=row.inventory_id,
+            system_stock=float(row.system_stock),
+            counted_quantity=float(row.counted_quantity),
+            variance=variance,
+            variance_value=round(variance * float(row.cost_price), 2),
+            adjustment_id=adjustment_ids.get(row.inventory_id)
+        ))
+
+    surplus_value = sum(line.variance_value for line in lines if line.variance_value > 0)
+    shrinkage_value = sum(line.variance_value for line in lines if line.variance_value < 0)
+
+    return schemas.StockTakeResult(
+        business_id=business_id,
+        reason=data.reason,
+        dry_run=data.dry_run,
+        counted=len(counted),
+        adjusted=len(changed),
+        unchanged=len(by_product) - len(changed),
+        surplus_value=round(surplus_value, 2),
+        shrinkage_value=round(shrinkage_value, 2),
+        net_variance_value=round(surplus_value + shrinkage_value, 2),
+        lines=sorted(lines, key=lambda line: abs(line.variance_value), reverse=True),
+        errors=errors
+    )
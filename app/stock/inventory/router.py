@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List
 from typing import Optional
@@ -12,7 +12,8 @@ from app.users.auth import get_current_user
 
 
 
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.core.pagination import COUNT_MODE_PATTERN, COUNT_MODE_DESCRIPTION
 from app.stock.inventory import schemas, service
 
 router = APIRouter()
@@ -22,11 +23,12 @@ router = APIRouter()
 
 @router.get("/", response_model=dict)
 def list_inventory(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=500),
     product_id: Optional[int] = None,
     product_name: Optional[str] = None,
-    db: Session = Depends(get_db),
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN, description=COUNT_MODE_DESCRIPTION),
+    db: Session = Depends(get_read_db),
     current_user: UserDisplaySchema = Depends(
         role_required(["user","manager","admin","super_admin"])
     ),
@@ -39,8 +41,9 @@ def list_inventory(
     return service.list_inventory(
         db=db,
         current_user=current_user,
-        skip=skip,
+        cursor=cursor,
         limit=limit,
         product_id=product_id,
         product_name=product_name,
+        count=count,
     )
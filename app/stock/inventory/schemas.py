@@ -27,6 +27,9 @@ class InventoryOut(InventoryBase):
 class InventoryListOut(BaseModel):
     inventory: list[InventoryOut]
     grand_total: float  # ✅ Total valuation of all inventory
+    next_cursor: str | None = None  # pass back as ?cursor= for the next page
+    total_count: int | None = None  # only with ?count=
+    total_count_estimated: bool = False
 
     class Config:
         from_attributes = True
\ No newline at end of file
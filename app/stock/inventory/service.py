@@ -8,6 +8,8 @@ from app.stock.products.models import  Product
 
 from app.purchase.models import  Purchase, PurchaseItem
 from datetime import datetime, date, time
+from app.core import queries
+from app.core.pagination import keyset_paginate, count_rows
 from zoneinfo import ZoneInfo
 
 
@@ -18,12 +20,13 @@ LAGOS_TZ = ZoneInfo("Africa/Lagos")
 def list_inventory(
     db: Session,
     current_user,
-    skip: int = 0,
+    cursor: str | None = None,
     limit: int = 100,
     product_id: int | None = None,
     product_name: str | None = None,
     start_date: date | None = None,
     end_date: date | None = None,
+    count: str | None = None,
 ):
     # Base query: join inventory with product
     query = (
@@ -40,7 +43,6 @@ def list_inventory(
             Inventory.business_id
         )
         .join(Product, Product.id == Inventory.product_id)
-        .order_by(Inventory.id.asc())  # column.asc() is safe
     )
 
     # Tenant Filter
@@ -68,26 +70,24 @@ def list_inventory(
         end_dt = datetime.combine(end_date, time.max, tzinfo=LAGOS_TZ)
         query = query.filter(Inventory.created_at <= end_dt)
 
-    inventory_list = query.offset(skip).limit(limit).all()
+    # Total only when asked (exact / estimate / auto)
+    total_count, total_count_estimated = count_rows(db, query, count)
+
+    # Keyset on id (ascending, as before)
+    inventory_list, next_cursor = keyset_paginate(
+        query, Inventory.id, Inventory.id, cursor=cursor, limit=limit, descending=False
+    )
+
+    # Latest purchase cost for valuation (one query for the page, tenant safe)
+    latest_costs = queries.latest_purchase_costs(
+        db, [(item.business_id, item.product_id) for item in inventory_list]
+    )
 
     result = []
     grand_total = 0
 
     for item in inventory_list:
-        # Latest purchase cost for valuation
-        latest_purchase_item = (
-            db.query(PurchaseItem)
-            .join(Purchase)
-            .filter(
-                PurchaseItem.product_id == item.product_id,
-                Purchase.business_id == item.business_id  # tenant safety
-            )
-            .order_by(PurchaseItem.id.desc())
-            .first()
-        )
-
-        latest_cost = latest_purchase_item.cost_price if latest_purchase_item else 0
-
+        latest_cost = latest_costs.get((item.business_id, item.product_id), 0)
 
         inventory_value = item.current_stock * latest_cost
         grand_total += inventory_value
@@ -109,7 +109,10 @@ def list_inventory(
 
     return {
         "inventory": result,
-        "grand_total": grand_total
+        "grand_total": grand_total,
+        "next_cursor": next_cursor,
+        "total_count": total_count,
+        "total_count_estimated": total_count_estimated
     }
 
 
@@ -118,16 +121,15 @@ def list_inventory(
 # ORM helper: get inventory for a product in the current business
 # --------------------------
 def get_inventory_orm_by_product(db: Session, product_id: int, current_user=None):
-    query = db.query(Inventory).filter(Inventory.product_id == product_id)
+    business_id = None
 
     # Tenant isolation: restrict to current user's business if not super admin
     if current_user and "super_admin" not in getattr(current_user, "roles", []):
         business_id = getattr(current_user, "business_id", None)
         if not business_id:
             raise HTTPException(400, "User does not belong to any business")
-        query = query.filter(Inventory.business_id == business_id)
 
-    return query.first()
+    return queries.inventory_by_product(db, product_id, business_id)
 
 
 # --------------------------
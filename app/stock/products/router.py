@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
 from sqlalchemy.orm import Session
 from typing import List
-import pandas as pd
 from typing import List, Optional
 
 from app.users.permissions import role_required
@@ -18,6 +17,8 @@ from app.stock.products.models import Product
 from app.stock.products.schemas import ProductPriceUpdate, ProductOut, ProductSimpleSchema, ProductSimpleSchema1
 
 from app.core.db import db_dependency   # ⭐ import this
+from app.core import queries
+from app.core.responses import FastJSONResponse
 
 
 
@@ -85,7 +86,8 @@ def list_products(
         business_id=business_id,   # ✅ PASS IT
     )
 
-    return [
+    # ProductOut objects are built here → skip response_model re-validation
+    return FastJSONResponse([
         schemas.ProductOut(
             id=p.id,
             name=p.name,
@@ -100,7 +102,7 @@ def list_products(
             created_at=p.created_at,
         )
         for p in products
-    ]
+    ])
 
 
     
@@ -194,11 +196,7 @@ def scan_product(
         target_business_id = current_user.business_id
 
     # -------------------- Query Product --------------------
-    product = db.query(Product).filter(
-        Product.barcode == barcode,
-        Product.business_id == target_business_id,
-        Product.is_active == True
-    ).first()
+    product = queries.product_by_barcode(db, barcode, target_business_id)
 
     # -------------------- Handle Not Found --------------------
     if not product:
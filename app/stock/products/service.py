@@ -8,13 +8,13 @@ from sqlalchemy.orm import Session, joinedload
 from app.stock.products import models, schemas
 from app.stock.inventory import models as inventory_models
 from app.purchase import models as purchase_models
+from app.core import queries
 from app.stock.category import models as category_models
 from app.stock.category.models import Category
 from app.business.dependencies import get_current_business
 import re
 from sqlalchemy import or_
 
-import pandas as pd
 from fastapi import HTTPException, UploadFile
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
@@ -30,8 +30,6 @@ from app.stock.products.schemas import ProductOut, ProductPriceUpdate
 
 from fastapi import HTTPException, UploadFile
 
-import pandas as pd
-
 from .models import Product
 
 import logging
@@ -194,6 +192,10 @@ def import_products_from_excel(db: Session, file: UploadFile, current_user, busi
     # -----------------------------
     # 2️⃣ READ EXCEL
     # -----------------------------
+    # pandas/openpyxl are only needed here, so load them on first import
+    # instead of at worker startup.
+    import pandas as pd
+
     try:
         df = pd.read_excel(file.file)
     except Exception:
@@ -264,10 +266,7 @@ def import_products_from_excel(db: Session, file: UploadFile, current_user, busi
 
             # Optional barcode duplicate check
             if barcode:
-                barcode_exists = db.query(models.Product).filter(
-                    models.Product.barcode == barcode,
-                    models.Product.business_id == business_id
-                ).first()
+                barcode_exists = queries.product_by_barcode(db, barcode, business_id, active_only=False)
 
                 if barcode_exists:
                     skipped += 1
@@ -625,6 +624,8 @@ def clean_price(value):
     Accepts: int, float, str (₦1,200.50), or NaN
     Returns: float
     """
+    import pandas as pd
+
     if value is None or pd.isna(value):
         return 0.0
 
@@ -1,6 +1,7 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from typing import Optional
 from datetime import datetime, timedelta
@@ -8,7 +9,7 @@ from sqlalchemy import func
 
 
 from app.database import get_db
-from app.users import crud, schemas as user_schemas
+from app.users import crud, hashing, schemas as user_schemas
 from app.business.models import Business  # New import for business info
 from dotenv import load_dotenv
 import os
@@ -23,15 +24,11 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/token")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing.verify_password(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    return pwd_context.hash(password)
+    return hashing.hash_password(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -41,12 +38,37 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def _store_rehashed_password(db: Session, user, new_hash: Optional[str]):
+    # Transparent upgrade/downgrade to the configured bcrypt cost
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+
+
 def authenticate_user(db: Session, username: str, password: str):
     user = crud.get_user_by_username(db, username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = hashing.verify_and_update(password, user.hashed_password)
+    if not verified:
+        return None
+    _store_rehashed_password(db, user, new_hash)
+    return user
+
+
+async def authenticate_user_async(db: Session, username: str, password: str):
+    """
+    Same as authenticate_user, but bcrypt runs on the hashing executor and
+    DB work on the threadpool, so the event loop never blocks.
+    """
+    user = await run_in_threadpool(crud.get_user_by_username, db, username)
+    if not user:
+        return None
+    verified, new_hash = await hashing.verify_and_update_async(password, user.hashed_password)
+    if not verified:
         return None
+    if new_hash:
+        await run_in_threadpool(_store_rehashed_password, db, user, new_hash)
     return user
 
 
@@ -99,7 +121,7 @@ def get_current_user(
 
         # Confirm business exists and is active
         business = db.query(Business).filter(Business.id == effective_business_id).first()
-        if not business or not business.is_license_active:
+        if not business or not business.is_license_active(db):
             raise HTTPException(status_code=403, detail="Business not found or inactive")
 
     else:
@@ -33,68 +33,86 @@ def create_user(
 
 # ------------------- GET USER (CASE-SENSITIVE) -------------------
 def get_user_by_username(db: Session, username: str):
+    # Usernames are global (login, uniqueness checks) → not tenant-scoped
     return (
         db.query(User)
         .filter(User.username == username.strip())
+        .execution_options(all_tenants=True)
         .first()
     )
 
 
 
-def get_all_users(db: Session, skip: int = 0, limit: int = 50):
-    users = db.query(User).offset(skip).limit(limit).all()
-
-    result = []
-
-    for user in users:
-        roles = user.roles.split(",") if user.roles else ["user"]
+# ------------------- LIST USERS -------------------
+def _list_users(
+    db: Session,
+    business_id: Optional[int] = None,
+    role: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = 50,
+):
+    """
+    One joined query (users + business name), keyset-paginated on users.id.
+    Pass the last id of a page as `after_id` to get the next one.
+    """
+    query = (
+        db.query(
+            User.id,
+            User.username,
+            User.roles,
+            User.business_id,
+            Business.name.label("business_name"),
+        )
+        .outerjoin(Business, Business.id == User.business_id)
+    )
 
-        # 🔹 Fetch business name using business_id
-        business = None
-        if user.business_id:
-            business = db.query(Business).filter(Business.id == user.business_id).first()
+    if business_id is not None:
+        query = query.filter(User.business_id == business_id)
 
-        result.append(
-            user_schema.UserDisplaySchema(
-                id=user.id,
-                username=user.username,
-                roles=roles,
-                business_id=user.business_id,
-                business_name=business.name if business else None,  # ← NEW
-            )
+    if role:
+        # roles is stored comma-separated ("admin,manager"); LIKE wildcards
+        # in the filter value are matched literally
+        role = role.strip().lower()
+        role = role.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(
+            func.concat(",", func.replace(User.roles, " ", ""), ",").like(f"%,{role},%", escape="\\")
         )
 
-    return result
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
 
+    rows = query.order_by(User.id.asc()).limit(limit).all()
 
-def get_users_by_business(db: Session, business_id: int, skip: int = 0, limit: int = 50):
-    users = (
-        db.query(User)
-        .filter(User.business_id == business_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-
-    result = []
+    return [
+        user_schema.UserDisplaySchema(
+            id=row.id,
+            username=row.username,
+            roles=row.roles.split(",") if row.roles else ["user"],
+            business_id=row.business_id,
+            business_name=row.business_name,
+        )
+        for row in rows
+    ]
 
-    for user in users:
-        roles = user.roles.split(",") if user.roles else ["user"]
 
-        # Fetch business name
-        business = db.query(Business).filter(Business.id == user.business_id).first()
+def get_all_users(
+    db: Session,
+    business_id: Optional[int] = None,
+    role: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = 50,
+):
+    return _list_users(db, business_id=business_id, role=role, after_id=after_id, limit=limit)
 
-        result.append(
-            user_schema.UserDisplaySchema(
-                id=user.id,
-                username=user.username,
-                roles=roles,
-                business_id=user.business_id,
-                business_name=business.name if business else None,
-            )
-        )
 
-    return result
+def get_users_by_business(
+    db: Session,
+    business_id: int,
+    role: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = 50,
+):
+    return _list_users(db, business_id=business_id, role=role, after_id=after_id, limit=limit)
 
 
 # ------------------- UPDATE USER -------------------
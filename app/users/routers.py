@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, status, Query
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext  # ✅ Add this
 from fastapi import Body
-from app.users.auth import authenticate_user, create_access_token, get_current_user
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from app.users.auth import authenticate_user_async, create_access_token, get_current_user
+from app.users.hashing import hash_password
 from app.database import get_db
 from app.users import crud as user_crud, schemas # Correct import for user CRUD operations
 from app.users import models as user_models
 from app.business.models import Business
 from app.business import models as business_models
-from app.license.models import LicenseKey
+from app.license.state import license_state
 from sqlalchemy import func
 
 import os
@@ -40,8 +42,6 @@ logger.add("app.log", rotation="500 MB", level="DEBUG")
 
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # Store your admin password securely (e.g., environment variable)
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "supersecret")
 
@@ -90,13 +90,13 @@ def sign_up(
 
         if not business:
             raise HTTPException(status_code=404, detail="Business not found")
-        if not business.is_license_active:
+        if not business.is_license_active(db):
             raise HTTPException(status_code=403, detail="Business is inactive")
 
     # ------------------------------
     # Hash password and create user
     # ------------------------------
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = hash_password(user.password)
 
     new_user = user_crud.create_user(
         db=db,
@@ -118,18 +118,24 @@ def sign_up(
 
 
 @router.post("/token")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
     username = form_data.username.strip()  # STRICT
     password = form_data.password
 
-    user = authenticate_user(db, username, password)
+    # bcrypt runs on the hashing executor, not the request threadpool
+    user = await authenticate_user_async(db, username, password)
     if not user:
         logger.warning(f"Authentication denied for username: {username}")
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    return await run_in_threadpool(_issue_login_token, db, user)
+
+
+def _issue_login_token(db: Session, user: user_models.User) -> dict:
+    """Business/license checks + token for an already authenticated user."""
     roles = user.roles.split(",") if isinstance(user.roles, str) else user.roles
     roles = [r.strip().lower() for r in roles]
     is_super_admin = "super_admin" in roles
@@ -143,23 +149,16 @@ def login(
             raise HTTPException(status_code=403, detail="User must belong to a business")
 
         business = db.query(Business).filter(Business.id == user.business_id).first()
-        if not business or not business.is_license_active:
+        if not business:
             raise HTTPException(status_code=403, detail="Business is missing or inactive")
 
-        license_key = (
-            db.query(LicenseKey)
-            .filter(
-                LicenseKey.business_id == business.id,
-                LicenseKey.is_active == True
-            )
-            .order_by(LicenseKey.expiration_date.desc())
-            .first()
-        )
+        # In-memory license state (no license query on the login path)
+        license_key = license_state.get(db, business.id)
 
         if not license_key:
             raise HTTPException(status_code=403, detail="No active license for this business")
 
-        if license_key.expiration_date < now_lagos:
+        if not license_key.is_valid():
 
             raise HTTPException(status_code=403, detail="Business license expired")
 
@@ -187,7 +186,7 @@ def login(
         },
 
         "license": {
-            "expiration_date": license_key.expiration_date if license_key else None,
+            "expiration_date": license_key.expires_at if license_key else None,
             "is_active": license_key.is_active if license_key else None,
         },
         "access_token": access_token,
@@ -200,6 +199,10 @@ def login(
 # List users with tenant isolation
 @router.get("/", response_model=list[schemas.UserDisplaySchema])
 def list_all_users(
+    role: Optional[str] = Query(None, description="Only users having this role"),
+    business_id: Optional[int] = Query(None, description="Filter by business (super admin only)"),
+    after_id: Optional[int] = Query(None, description="Keyset cursor: last user id of the previous page"),
+    limit: int = Query(50, ge=1, le=500),
     db: Session = Depends(get_db),
     current_user: schemas.UserDisplaySchema = Depends(get_current_user),
 ):
@@ -209,12 +212,16 @@ def list_all_users(
     if not roles.intersection({"admin", "super_admin"}):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    # ✅ Super admin → see all users
+    # ✅ Super admin → see all users (optionally one business)
     if "super_admin" in roles:
-        return user_crud.get_all_users(db)
+        return user_crud.get_all_users(
+            db, business_id=business_id, role=role, after_id=after_id, limit=limit
+        )
 
     # ✅ Business admin → see only users in same business
-    return user_crud.get_users_by_business(db, current_user.business_id)
+    return user_crud.get_users_by_business(
+        db, current_user.business_id, role=role, after_id=after_id, limit=limit
+    )
 
 
 # Reset user password — admin OR super_admin with tenant isolation
@@ -253,7 +260,7 @@ def reset_password(
     # ===============================
     # UPDATE PASSWORD
     # ===============================
-    user.hashed_password = pwd_context.hash(new_password)
+    user.hashed_password = hash_password(new_password)
     db.commit()
     db.refresh(user)
 
@@ -293,20 +300,12 @@ def get_current_user_info(
             # ===============================
             # FETCH LICENSE
             # ===============================
-            license_key = (
-                db.query(LicenseKey)
-                .filter(
-                    LicenseKey.business_id == business.id,
-                    LicenseKey.is_active == True,
-                )
-                .order_by(LicenseKey.expiration_date.desc())
-                .first()
-            )
+            license_key = license_state.get(db, business.id)
             if license_key:
                 license_info = {
                     "key": license_key.key,
                     "is_active": license_key.is_active,
-                    "expiration_date": license_key.expiration_date,
+                    "expiration_date": license_key.expires_at,
                 }
 
     # ===============================
@@ -356,7 +355,7 @@ def update_user(
     # Update password if provided
     # -------------------------------
     if updated_user.password:
-        user.hashed_password = pwd_context.hash(updated_user.password)
+        user.hashed_password = hash_password(updated_user.password)
 
     # -------------------------------
     # Update roles
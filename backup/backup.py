@@ -3,13 +3,10 @@ from fastapi.responses import FileResponse
 import os
 import subprocess
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
+from functools import lru_cache
 
 from app.users.permissions import role_required
 
-# ---------------- LOAD ENV ----------------
-load_dotenv()
-
 # ---------------- ROUTER ----------------
 router = APIRouter(
     prefix="/backup",
@@ -18,12 +15,10 @@ router = APIRouter(
 )
 
 # ---------------- CONFIG ----------------
-RAW_DB_URL = os.getenv("DB_URL3") or os.getenv("DATABASE_URL")
+# Resolved on first backup rather than at import, so workers that never
+# back up don't pay for env parsing or directory creation at startup.
 PG_DUMP_PATH = os.getenv("PG_DUMP_PATH", "pg_dump")
 
-if not RAW_DB_URL:
-    raise ValueError("❌ DATABASE_URL / DB_URL3 is not set")
-
 # ---------------- CLEAN DATABASE URL ----------------
 def normalize_db_url(url: str) -> str:
     """
@@ -37,19 +32,29 @@ def normalize_db_url(url: str) -> str:
 
     return url
 
-DB_URL = normalize_db_url(RAW_DB_URL)
+@lru_cache(maxsize=1)
+def get_db_url() -> str:
+    raw_db_url = os.getenv("DB_URL3") or os.getenv("DATABASE_URL")
 
-print("🔥 FINAL DB_URL (for pg_dump):", DB_URL)
+    if not raw_db_url:
+        raise ValueError("❌ DATABASE_URL / DB_URL3 is not set")
+
+    db_url = normalize_db_url(raw_db_url)
+    print("🔥 FINAL DB_URL (for pg_dump):", db_url)
+    return db_url
 
 # ---------------- BACKUP DIR ----------------
 BACKUP_DIR = os.path.join(os.getcwd(), "backup_files")
-os.makedirs(BACKUP_DIR, exist_ok=True)
+
+def ensure_backup_dir() -> str:
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    return BACKUP_DIR
 
 # ---------------- CLEANUP OLD BACKUPS ----------------
 def cleanup_old_backups(days: int = 7):
     now = datetime.now()
 
-    for file in os.listdir(BACKUP_DIR):
+    for file in os.listdir(ensure_backup_dir()):
         path = os.path.join(BACKUP_DIR, file)
 
         if os.path.isfile(path):
@@ -82,9 +87,10 @@ def run_auto_backup():
         return None
 
     try:
+        db_url = get_db_url()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"backup_{timestamp}.backup"
-        filepath = os.path.join(BACKUP_DIR, filename)
+        filepath = os.path.join(ensure_backup_dir(), filename)
 
         env = os.environ.copy()
 
@@ -93,7 +99,7 @@ def run_auto_backup():
 
         pg_dump_cmd = [
             PG_DUMP_PATH,
-            "--dbname", DB_URL,
+            "--dbname", db_url,
             "-F", "c",
             "-f", filepath,
             "--no-owner",
@@ -121,7 +127,7 @@ def run_auto_backup():
             print("❌ pg_dump FAILED")
             print("STDOUT:\n", result.stdout)
             print("STDERR:\n", result.stderr)
-            print("DB_URL USED:\n", DB_URL)
+            print("DB_URL USED:\n", db_url)
             return None
 
 
@@ -143,7 +149,7 @@ def get_latest_backup():
     try:
         files = [
             os.path.join(BACKUP_DIR, f)
-            for f in os.listdir(BACKUP_DIR)
+            for f in os.listdir(ensure_backup_dir())
             if os.path.isfile(os.path.join(BACKUP_DIR, f))
         ]
 
@@ -5,29 +5,28 @@ from urllib.parse import urlparse
 
 router = APIRouter()
 
-DB_URL = os.getenv("DB_URL2")
-
 RESTORE_DIR = os.path.join(os.getcwd(), "restore_files")
-os.makedirs(RESTORE_DIR, exist_ok=True)
 
 
 @router.post("/restore/db")
 def restore_database(file: UploadFile = File(...)):
+    # Resolved per call so nothing touches env or disk at import time
+    db_url = os.getenv("DB_URL2")
 
-    if not DB_URL or not DB_URL.startswith("postgresql://"):
+    if not db_url or not db_url.startswith("postgresql://"):
         raise HTTPException(
             status_code=400,
             detail="Only PostgreSQL restores are supported."
         )
 
     try:
-
+        os.makedirs(RESTORE_DIR, exist_ok=True)
         filepath = os.path.join(RESTORE_DIR, file.filename)
 
         with open(filepath, "wb") as f:
             f.write(file.file.read())
 
-        parsed = urlparse(DB_URL)
+        parsed = urlparse(db_url)
 
         db_user = parsed.username or "postgres"
         db_password = parsed.password or ""
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Concurrent payment stress test.
+
+Creates a throw-away sale in an existing business, then lets many threads
+(each with its own DB session, like separate requests) post payments against
+it at the same time through app.payments.service.create_payment. Payments
+that would overpay must be rejected, so the sum actually stored can never
+exceed the sale total. Also reports accepted payments per second.
+
+The sale and its payments are deleted afterwards. Exits 1 on overpayment.
+
+Usage (against a scratch/dev database, DB_URL3 from .env):
+    python benchmarks/concurrent_payments.py --business-id 1 \\
+        --total 1000 --amount 100 --threads 32 --rounds 5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def run_round(business_id: int, total: float, amount: float, threads: int):
+    from fastapi import HTTPException
+    from sqlalchemy import func
+
+    import app.main  # noqa: F401  (registers every model/relationship)
+    from app.database import SessionLocal
+    from app.payments import models as payment_models, schemas, service
+    from app.sales.models import Sale
+
+    cashier = SimpleNamespace(id=None, username="stress", roles=["super_admin"], business_id=None)
+
+    db = SessionLocal()
+    sale = Sale(business_id=business_id, total_amount=total, customer_name="stress-test")
+    db.add(sale)
+    db.commit()
+    invoice_no = sale.invoice_no
+    db.close()
+
+    accepted, rejected, errors = 0, 0, []
+    counter_lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def cashier_thread():
+        nonlocal accepted, rejected
+        session = SessionLocal()
+        try:
+            barrier.wait()
+            service.create_payment(
+                db=session,
+                invoice_no=invoice_no,
+                payment=schemas.PaymentCreate(amount_paid=amount, payment_method="cash"),
+                current_user=cashier,
+            )
+            with counter_lock:
+                accepted += 1
+        except HTTPException as e:
+            with counter_lock:
+                if e.status_code == 400:
+                    rejected += 1
+                else:
+                    errors.append(e.detail)
+        except Exception as e:
+            with counter_lock:
+                errors.append(str(e))
+        finally:
+            session.close()
+
+    workers = [threading.Thread(target=cashier_thread) for _ in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    try:
+        paid = db.query(func.coalesce(func.sum(payment_models.Payment.amount_paid), 0)).filter(
+            payment_models.Payment.sale_invoice_no == invoice_no
+        ).scalar()
+        db.query(payment_models.Payment).filter(
+            payment_models.Payment.sale_invoice_no == invoice_no
+        ).delete(synchronize_session=False)
+        db.query(Sale).filter(Sale.invoice_no == invoice_no).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+    return float(paid), accepted, rejected, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent payment stress test")
+    parser.add_argument("--business-id", type=int, required=True)
+    parser.add_argument("--total", type=float, default=1000)
+    parser.add_argument("--amount", type=float, default=100)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    expected = int((args.total + 0.01) // args.amount)
+    overpaid = False
+
+    for i in range(1, args.rounds + 1):
+        paid, accepted, rejected, errors, elapsed = run_round(
+            args.business_id, args.total, args.amount, args.threads
+        )
+        status = "OK" if paid <= args.total + 0.01 else "OVERPAID"
+        overpaid = overpaid or status == "OVERPAID"
+        print(
+            f"round {i}: paid {paid:.2f} / {args.total:.2f} [{status}] "
+            f"accepted {accepted} (expected {min(expected, args.threads)}), rejected {rejected}, "
+            f"errors {len(errors)}, {accepted / elapsed:.1f} payments/s"
+        )
+        for error in errors[:3]:
+            print(f"  error: {error}")
+
+    sys.exit(1 if overpaid else 0)
+
+
+if __name__ == "__main__":
+    main()
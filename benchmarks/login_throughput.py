@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark.
+
+Two modes:
+
+  hashing  - no server needed; measures bcrypt verifications per second
+             through app.users.hashing at the configured BCRYPT_ROUNDS and
+             PASSWORD_HASH_WORKERS (i.e. the ceiling for one worker).
+
+  http     - hammers POST /users/token on a running worker and reports
+             successful logins per second and latency percentiles.
+
+Usage:
+    BCRYPT_ROUNDS=10 python benchmarks/login_throughput.py hashing --seconds 10
+    python benchmarks/login_throughput.py http --url http://127.0.0.1:8000 \\
+        --username cashier1 --password secret --concurrency 32 --seconds 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def _report(label, ok, failed, elapsed, latencies):
+    print(f"{label}: {ok} ok / {failed} failed in {elapsed:.1f}s")
+    print(f"  throughput : {ok / elapsed:.1f} logins/s")
+    if latencies:
+        latencies = sorted(latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+        print(f"  latency    : p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+
+
+async def bench_hashing(seconds: float, concurrency: int):
+    from app.users import hashing
+
+    stored = hashing.hash_password("benchmark-password")
+    deadline = time.perf_counter() + seconds
+    ok, latencies = 0, []
+
+    async def worker():
+        nonlocal ok
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            verified, _ = await hashing.verify_and_update_async("benchmark-password", stored)
+            latencies.append(time.perf_counter() - start)
+            ok += int(verified)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    print(f"bcrypt rounds={hashing.BCRYPT_ROUNDS}, executor workers={hashing.PASSWORD_HASH_WORKERS}")
+    _report("hashing", ok, 0, elapsed, latencies)
+    hashing.shutdown_executor()
+
+
+async def bench_http(url: str, username: str, password: str, seconds: float, concurrency: int):
+    import httpx
+
+    deadline = time.perf_counter() + seconds
+    ok, failed, latencies = 0, 0, []
+
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+
+        async def worker():
+            nonlocal ok, failed
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                resp = await client.post(
+                    "/users/token",
+                    data={"username": username, "password": password},
+                )
+                latencies.append(time.perf_counter() - start)
+                if resp.status_code == 200:
+                    ok += 1
+                else:
+                    failed += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    _report(f"POST {url}/users/token (concurrency {concurrency})", ok, failed, elapsed, latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput benchmark")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    h = sub.add_parser("hashing")
+    h.add_argument("--seconds", type=float, default=10)
+    h.add_argument("--concurrency", type=int, default=16)
+
+    w = sub.add_parser("http")
+    w.add_argument("--url", default="http://127.0.0.1:8000")
+    w.add_argument("--username", required=True)
+    w.add_argument("--password", required=True)
+    w.add_argument("--seconds", type=float, default=20)
+    w.add_argument("--concurrency", type=int, default=32)
+
+    args = parser.parse_args()
+
+    if args.mode == "hashing":
+        asyncio.run(bench_hashing(args.seconds, args.concurrency))
+    else:
+        asyncio.run(bench_http(args.url, args.username, args.password, args.seconds, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+List payload serialization benchmark.
+
+Builds synthetic /sales/, /payments/ and /stock/products/ payloads (the same
+schemas the services return) and compares, per request:
+
+  default   - FastAPI's path: validate against response_model, dump to JSON
+              mode, render with the stdlib json module (JSONResponse)
+  fast      - FastJSONResponse: hand the prebuilt schemas straight to orjson
+
+Reports wall time and CPU time per request. No database needed.
+
+Usage:
+    python benchmarks/payload_serialization.py --rows 2000 --repeat 50
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse
+from app.payments.schemas import PaymentOut
+from app.sales.schemas import SaleItemOut2, SaleOut2, SalesListResponse, SaleSummary
+from app.stock.products.schemas import ProductOut
+
+LAGOS_TZ = ZoneInfo("Africa/Lagos")
+
+
+def build_sales(rows: int) -> SalesListResponse:
+    now = datetime.now(LAGOS_TZ)
+    sales = [
+        SaleOut2(
+            id=i, invoice_no=100000 + i, invoice_date=now, customer_name="Walk-in",
+            customer_phone="08030000000", ref_no=f"REF{i}", total_amount=15000.0,
+            total_paid=10000.0, balance_due=5000.0, payment_status="part_paid", sold_at=now,
+            items=[
+                SaleItemOut2(
+                    id=i * 10 + j, sale_invoice_no=100000 + i, product_id=j,
+                    product_name=f"Product {j}", sku=f"SKU-{j}", barcode=f"BC{j:08d}",
+                    quantity=2, selling_price=2500.0, gross_amount=5000.0, discount=0.0,
+                    net_amount=5000.0,
+                )
+                for j in range(3)
+            ],
+        )
+        for i in range(rows)
+    ]
+    return SalesListResponse(
+        sales=sales,
+        summary=SaleSummary(total_sales=0.0, total_paid=0.0, total_balance=0.0),
+    )
+
+
+def build_payments(rows: int) -> List[PaymentOut]:
+    now = datetime.now(LAGOS_TZ)
+    return [
+        PaymentOut(
+            id=i, invoice_no=100000 + i, amount_paid=5000.0, payment_method="transfer",
+            bank_id=1, reference_no=f"TRX{i}", payment_date=now, created_by=1,
+            created_at=now, balance_due=0.0, status="completed", bank_name="Bank",
+            created_by_name="cashier", total_amount=5000.0, customer_name="Walk-in",
+        )
+        for i in range(rows)
+    ]
+
+
+def build_products(rows: int) -> List[ProductOut]:
+    now = datetime.now(LAGOS_TZ)
+    return [
+        ProductOut(
+            id=i, name=f"Product {i}", category="General", type="unit", sku=f"SKU-{i}",
+            barcode=f"BC{i:08d}", cost_price=1000.0, selling_price=1500.0,
+            is_active=True, business_id=1, created_at=now,
+        )
+        for i in range(rows)
+    ]
+
+
+def default_path(adapter: TypeAdapter, content) -> bytes:
+    validated = adapter.validate_python(content, from_attributes=True)
+    jsonable = adapter.dump_python(validated, mode="json", by_alias=True)
+    return JSONResponse(jsonable).body
+
+
+def fast_path(_adapter: TypeAdapter, content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def measure(fn, adapter, content, repeat: int):
+    fn(adapter, content)  # warm-up
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(repeat):
+        body = fn(adapter, content)
+    return (
+        (time.perf_counter() - wall) / repeat,
+        (time.process_time() - cpu) / repeat,
+        len(body),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare list payload serialization paths")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    cases = [
+        ("/sales/", TypeAdapter(SalesListResponse), build_sales(args.rows)),
+        ("/payments/", TypeAdapter(List[PaymentOut]), build_payments(args.rows)),
+        ("/stock/products/", TypeAdapter(List[ProductOut]), build_products(args.rows)),
+    ]
+
+    print(f"{args.rows} rows, {args.repeat} requests per case\n")
+    print(f"{'endpoint':<18}{'path':<9}{'wall ms':>10}{'cpu ms':>10}{'KiB':>9}")
+    for name, adapter, content in cases:
+        for label, fn in (("default", default_path), ("fast", fast_path)):
+            wall, cpu, size = measure(fn, adapter, content, args.repeat)
+            print(f"{name:<18}{label:<9}{wall * 1000:>10.2f}{cpu * 1000:>10.2f}{size / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Hot-lookup statement construction benchmark.
+
+For the checkout / purchase hot lookups (product by barcode, inventory by
+product, latest purchase cost, sale by invoice) compares three ways of
+issuing the same SELECT:
+
+  query chain  - a new db.query(...).filter(...).first() chain per call
+                 (what the services did before app/core/queries.py)
+  lambda_stmt  - sqlalchemy lambda_stmt, cached on the lambda's code
+  prebuilt     - app.core.queries: select() built once with bindparams
+
+Two numbers per variant:
+
+  build us   - Python time to construct the statement and compute its
+               cache key (what every call pays before the cache lookup)
+  call us    - full round trip through the session (tenant filter on),
+               including the database; tables may be empty
+
+The tenant filter (app.database._add_tenant_filter) only sees plain ORM
+selects, not lambda_stmt elements: the lambda_stmt call column runs
+unscoped, which is why app/core/queries.py uses prebuilt selects.
+
+Usage (against a scratch/dev database, DB_URL3 from .env):
+    python benchmarks/query_construction.py --repeat 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-call statement construction overhead")
+    parser.add_argument("--repeat", type=int, default=2000, help="calls per lookup and variant")
+    parser.add_argument("--business-id", type=int, default=1)
+    args = parser.parse_args()
+
+    from sqlalchemy import lambda_stmt, select
+
+    import app.main  # noqa: F401  (registers every model/relationship)
+    from app.core import queries
+    from app.core.tenant import set_current_business
+    from app.database import Base, SessionLocal, engine
+    from app.purchase.models import Purchase, PurchaseItem
+    from app.sales.models import Sale
+    from app.stock.inventory.models import Inventory
+    from app.stock.products.models import Product
+
+    Base.metadata.create_all(bind=engine)
+
+    bid = args.business_id
+    barcode, product_id, invoice_no = "0000000000", 1, 1
+
+    # name → {variant: (build() → statement, call(db))}
+    lookups = {
+        "product by barcode": {
+            "query chain": (
+                lambda db: db.query(Product).filter(
+                    Product.barcode == barcode, Product.business_id == bid, Product.is_active == True
+                ).limit(1).statement,
+                lambda db: db.query(Product).filter(
+                    Product.barcode == barcode, Product.business_id == bid, Product.is_active == True
+                ).first(),
+            ),
+            "lambda_stmt": (
+                lambda db: lambda_stmt(lambda: select(Product).where(
+                    Product.barcode == barcode, Product.business_id == bid, Product.is_active == True
+                ).limit(1)),
+                lambda db: db.execute(lambda_stmt(lambda: select(Product).where(
+                    Product.barcode == barcode, Product.business_id == bid, Product.is_active == True
+                ).limit(1))).scalars().first(),
+            ),
+            "prebuilt": (
+                lambda db: queries._PRODUCT_BY[("barcode", True)],
+                lambda db: queries.product_by_barcode(db, barcode, bid),
+            ),
+        },
+        "inventory by product": {
+            "query chain": (
+                lambda db: db.query(Inventory).filter(
+                    Inventory.product_id == product_id, Inventory.business_id == bid
+                ).limit(1).statement,
+                lambda db: db.query(Inventory).filter(
+                    Inventory.product_id == product_id, Inventory.business_id == bid
+                ).first(),
+            ),
+            "lambda_stmt": (
+                lambda db: lambda_stmt(lambda: select(Inventory).where(
+                    Inventory.product_id == product_id, Inventory.business_id == bid
+                ).limit(1)),
+                lambda db: db.execute(lambda_stmt(lambda: select(Inventory).where(
+                    Inventory.product_id == product_id, Inventory.business_id == bid
+                ).limit(1))).scalars().first(),
+            ),
+            "prebuilt": (
+                lambda db: queries._INVENTORY_BY_PRODUCT_IN_BUSINESS,
+                lambda db: queries.inventory_by_product(db, product_id, bid),
+            ),
+        },
+        "latest purchase cost": {
+            "query chain": (
+                lambda db: db.query(PurchaseItem).join(Purchase).filter(
+                    PurchaseItem.product_id == product_id, Purchase.business_id == bid
+                ).order_by(PurchaseItem.id.desc()).limit(1).statement,
+                lambda db: db.query(PurchaseItem).join(Purchase).filter(
+                    PurchaseItem.product_id == product_id, Purchase.business_id == bid
+                ).order_by(PurchaseItem.id.desc()).first(),
+            ),
+            "lambda_stmt": (
+                lambda db: lambda_stmt(lambda: select(PurchaseItem.cost_price).join(
+                    Purchase, Purchase.id == PurchaseItem.purchase_id
+                ).where(
+                    PurchaseItem.product_id == product_id, Purchase.business_id == bid
+                ).order_by(PurchaseItem.id.desc()).limit(1)),
+                lambda db: db.execute(lambda_stmt(lambda: select(PurchaseItem.cost_price).join(
+                    Purchase, Purchase.id == PurchaseItem.purchase_id
+                ).where(
+                    PurchaseItem.product_id == product_id, Purchase.business_id == bid
+                ).order_by(PurchaseItem.id.desc()).limit(1))).scalar(),
+            ),
+            "prebuilt": (
+                lambda db: queries._LATEST_PURCHASE_COST,
+                lambda db: queries.latest_purchase_cost(db, product_id, bid),
+            ),
+        },
+        "sale by invoice": {
+            "query chain": (
+                lambda db: db.query(Sale).filter(
+                    Sale.business_id == bid, Sale.invoice_no == invoice_no
+                ).limit(1).statement,
+                lambda db: db.query(Sale).filter(
+                    Sale.business_id == bid, Sale.invoice_no == invoice_no
+                ).first(),
+            ),
+            "lambda_stmt": (
+                lambda db: lambda_stmt(lambda: select(Sale).where(
+                    Sale.invoice_no == invoice_no, Sale.business_id == bid
+                ).limit(1)),
+                lambda db: db.execute(lambda_stmt(lambda: select(Sale).where(
+                    Sale.invoice_no == invoice_no, Sale.business_id == bid
+                ).limit(1))).scalars().first(),
+            ),
+            "prebuilt": (
+                lambda db: queries._SALE_BY_INVOICE_IN_BUSINESS,
+                lambda db: queries.sale_by_invoice(db, invoice_no, bid),
+            ),
+        },
+    }
+
+    def per_call(fn, db) -> float:
+        fn(db)   # warm-up: first compile / lambda analysis
+        wall = time.perf_counter()
+        for _ in range(args.repeat):
+            fn(db)
+        return (time.perf_counter() - wall) / args.repeat * 1e6
+
+    print(f"{args.repeat} calls per lookup and variant, business {bid}\n")
+    print(f"{'lookup':<22}{'variant':<14}{'build us':>10}{'call us':>10}")
+
+    set_current_business(bid)
+    db = SessionLocal()
+    try:
+        for name, variants in lookups.items():
+            for variant, (build, call) in variants.items():
+                build_us = per_call(lambda db: build(db)._generate_cache_key(), db)
+                call_us = per_call(call, db)
+                print(f"{name:<22}{variant:<14}{build_us:>10.1f}{call_us:>10.1f}")
+    finally:
+        set_current_business(None)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Worker cold-start profile.
+
+Imports `app.main` in a fresh interpreter under `python -X importtime` and
+reports:
+  - total import time of the app
+  - the slowest modules (cumulative, including their children)
+  - resident memory after import
+  - whether modules that should be lazy (pandas, openpyxl) leaked into startup
+
+Usage (from the repo root, with the usual .env in place):
+    python benchmarks/startup_importtime.py
+    python benchmarks/startup_importtime.py --top 40 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules that must NOT be imported just by booting a worker
+LAZY_MODULES = ["pandas", "openpyxl", "numpy"]
+
+PROBE = f"""
+import json, sys
+import app.main
+rss = None
+try:
+    import psutil
+    rss = psutil.Process().memory_info().rss
+except ImportError:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+print("__PROBE__" + json.dumps({{
+    "rss": rss,
+    "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+
+    if result.returncode != 0:
+        print(result.stderr[-4000:], file=sys.stderr)
+        raise SystemExit("❌ Importing app.main failed")
+
+    probe = None
+    for line in result.stdout.splitlines():
+        if line.startswith("__PROBE__"):
+            probe = json.loads(line[len("__PROBE__"):])
+
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, rest = line.split(":", 1)
+        self_us, cumulative_us, name = [p.strip() for p in rest.split("|", 2)]
+        modules.append((name, int(self_us), int(cumulative_us)))
+
+    return modules, probe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile app.main import time")
+    parser.add_argument("--top", type=int, default=25, help="Slowest modules to list")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to average over")
+    args = parser.parse_args()
+
+    totals, rss_values, last_modules, last_probe = [], [], [], None
+
+    for _ in range(args.runs):
+        modules, probe = run_once()
+        app_main = [m for m in modules if m[0] == "app.main"]
+        totals.append(app_main[-1][2] if app_main else sum(m[1] for m in modules))
+        if probe and probe["rss"]:
+            rss_values.append(probe["rss"])
+        last_modules, last_probe = modules, probe
+
+    print(f"app.main import time : {statistics.median(totals) / 1000:.1f} ms (median of {args.runs})")
+    if rss_values:
+        print(f"RSS after import     : {statistics.median(rss_values) / (1024 * 1024):.1f} MiB")
+
+    print(f"\nTop {args.top} modules by cumulative import time:")
+    for name, self_us, cumulative_us in sorted(last_modules, key=lambda m: m[2], reverse=True)[: args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f} ms)  {name.strip()}")
+
+    leaked = (last_probe or {}).get("loaded", [])
+    if leaked:
+        print(f"\n⚠️ Loaded at startup but should be lazy: {', '.join(leaked)}")
+        sys.exit(1)
+
+    print("\n✅ No lazy-only modules imported at startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tenant filter compile-overhead benchmark.
+
+Runs a few typical ORM selects as a business user (tenant context set,
+alternating between two businesses) and compares:
+
+  off            - no tenant scoping (super admin path)
+  per-execution  - the previous approach: a listener that builds new
+                   with_loader_criteria lambdas (closing over the business
+                   id) for every tenant model on every select
+  scoped         - app.database._add_tenant_filter: prebuilt module-level
+                   criteria bound to one execution-time parameter
+
+Reports time per query and the statement cache hit rate (cache misses mean
+the ORM compiled the statement again). Tables may be empty.
+
+Usage (against a scratch/dev database, DB_URL3 from .env):
+    python benchmarks/tenant_filter_compile.py --repeat 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def legacy_listener(execute_state):
+    """The old per-execution criteria (business models by id, the rest by business_id)."""
+    from sqlalchemy.orm import with_loader_criteria
+
+    from app.core.tenant import get_current_business
+    from app.database import Base
+
+    business_id = get_current_business()
+    if business_id is None or not execute_state.is_select:
+        return
+
+    for mapper in Base.registry.mappers:
+        if mapper.local_table.name == "businesses":
+            criteria = lambda cls: cls.id == business_id  # noqa: E731
+        elif "business_id" in mapper.columns:
+            criteria = lambda cls: cls.business_id == business_id  # noqa: E731
+        else:
+            continue
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(mapper.class_, criteria, include_aliases=True)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare tenant scoping compile overhead")
+    parser.add_argument("--repeat", type=int, default=1000, help="executions per query and mode")
+    parser.add_argument("--businesses", type=int, nargs=2, default=[1, 2])
+    args = parser.parse_args()
+
+    from sqlalchemy import event, func
+    from sqlalchemy.engine.default import DefaultExecutionContext
+    from sqlalchemy.engine.interfaces import CacheStats
+    from sqlalchemy.orm import Session, joinedload
+
+    import app.main  # noqa: F401  (registers every model/relationship)
+    from app import database
+    from app.core.tenant import set_current_business
+    from app.database import Base, SessionLocal, engine
+    from app.sales.models import Sale, SaleItem
+    from app.stock.inventory.models import Inventory
+    from app.stock.products.models import Product
+    from app.vendor.models import Vendor
+
+    Base.metadata.create_all(bind=engine)
+
+    queries = {
+        "product by barcode": lambda db, bid: db.query(Product).filter(
+            Product.barcode == "0000000000", Product.business_id == bid).first(),
+        "inventory page": lambda db, bid: db.query(Inventory).filter(
+            Inventory.business_id == bid).order_by(Inventory.id).limit(50).all(),
+        "sale + items": lambda db, bid: db.query(Sale).options(
+            joinedload(Sale.items).joinedload(SaleItem.product)).filter(
+            Sale.invoice_no == 1, Sale.business_id == bid).first(),
+        "vendor count": lambda db, bid: db.query(func.count(Vendor.id)).filter(
+            Vendor.business_id == bid).scalar(),
+    }
+
+    hits = {"hit": 0, "total": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if isinstance(context, DefaultExecutionContext) and context.compiled is not None:
+            hits["total"] += 1
+            hits["hit"] += context.cache_hit == CacheStats.CACHE_HIT
+
+    def run(mode: str, name: str, query):
+        scoped = event.contains(Session, "do_orm_execute", database._add_tenant_filter)
+        if mode != "scoped" and scoped:
+            event.remove(Session, "do_orm_execute", database._add_tenant_filter)
+        if mode == "per-execution":
+            event.listen(Session, "do_orm_execute", legacy_listener)
+
+        db = SessionLocal()
+        try:
+            for bid in args.businesses:   # warm-up: first compile of each shape
+                set_current_business(bid if mode != "off" else None)
+                query(db, bid)
+            hits.update(hit=0, total=0)
+
+            wall = time.perf_counter()
+            for i in range(args.repeat):
+                bid = args.businesses[i % 2]
+                set_current_business(bid if mode != "off" else None)
+                query(db, bid)
+            elapsed = (time.perf_counter() - wall) / args.repeat
+        finally:
+            set_current_business(None)
+            db.close()
+            if mode == "per-execution":
+                event.remove(Session, "do_orm_execute", legacy_listener)
+            if not event.contains(Session, "do_orm_execute", database._add_tenant_filter):
+                event.listen(Session, "do_orm_execute", database._add_tenant_filter)
+
+        rate = hits["hit"] / hits["total"] * 100 if hits["total"] else 0.0
+        print(f"{name:<20}{mode:<15}{elapsed * 1e6:>10.0f}{rate:>12.1f}")
+
+    print(f"{args.repeat} executions per query, tenants {args.businesses}\n")
+    print(f"{'query':<20}{'mode':<15}{'us/query':>10}{'cache hit %':>12}")
+    for name, query in queries.items():
+        for mode in ("off", "per-execution", "scoped"):
+            run(mode, name, query)
+
+
+if __name__ == "__main__":
+    main()